@@ -0,0 +1,122 @@
+"""
+실행 시점에 고를 수 있는 추론 백엔드.
+
+    torch : Ultralytics YOLO (.pt)
+    onnx  : ONNX Runtime CPU (.onnx, export_onnx.py 로 변환, INT8 양자화 모델 포함)
+
+두 백엔드 모두 predict_batch(images, conf, iou) 하나로 호출합니다. images 는 이미 letterbox 된
+같은 크기의 BGR uint8 이미지 목록이고, 결과는 입력 이미지 좌표의 (boxes xyxy, scores, classes) 입니다.
+letterbox 와 원본 좌표 복원은 호출하는 쪽(sliced_predict.py, serve.py)에서 합니다.
+"""
+
+import ast
+import numpy as np
+from boxes import batched_nms
+
+BACKENDS = ("torch", "onnx")
+
+# YOLO 모델의 최대 stride. 입력 크기는 이 값의 배수여야 함
+STRIDE = 32
+
+
+class TorchBackend:
+    """Ultralytics YOLO 모델 백엔드."""
+
+    name = "torch"
+
+    def __init__(self, weights, device="cpu"):
+        from ultralytics import YOLO  # 노트북에서 설치
+
+        self.model = YOLO(weights)
+        self.names = dict(self.model.names)
+        self.device = device
+
+    def predict_batch(self, images, conf=0.25, iou=0.5):
+        imgsz = list(images[0].shape[:2])
+        results = self.model.predict(list(images), imgsz=imgsz, conf=conf, iou=iou, device=self.device, verbose=False)
+        return [
+            (r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy(), r.boxes.cls.cpu().numpy().astype(np.int64))
+            for r in results
+        ]
+
+
+class OnnxBackend:
+    """
+    ONNX Runtime 백엔드. Ultralytics 가 내보낸 검출 모델 출력 (B, 4 + 클래스 수, N) 을
+    직접 디코딩하고 boxes.batched_nms 로 NMS 를 수행합니다.
+    """
+
+    name = "onnx"
+
+    def __init__(self, onnx_path, threads=None, max_det=300):
+        import onnxruntime as ort  # pip install onnxruntime
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0]
+        self.max_det = max_det
+
+        # 고정 크기로 내보낸 모델은 배치/입력 크기가 정수, dynamic 모델은 문자열
+        batch_dim, _, height, width = self.input.shape
+        self.fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+        self.input_size = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+    def _to_tensor(self, images):
+        """BGR uint8 이미지 목록을 (B, 3, H, W) float32 RGB 텐서로 변환합니다."""
+        h, w = images[0].shape[:2]
+        if self.input_size is not None:
+            target_h, target_w = self.input_size
+            if h > target_h or w > target_w:
+                raise ValueError(f"입력 {h}x{w} 가 모델 입력 크기 {target_h}x{target_w} 보다 큽니다.")
+        else:
+            target_h, target_w = -(-h // STRIDE) * STRIDE, -(-w // STRIDE) * STRIDE
+        # 오른쪽/아래만 패딩하므로 결과 좌표는 입력 이미지 좌표 그대로
+        batch = np.full((len(images), target_h, target_w, 3), 114, dtype=np.uint8)
+        for i, img in enumerate(images):
+            batch[i, :h, :w] = img
+        return np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255
+
+    def _decode(self, output, conf, iou):
+        """(4 + 클래스 수, N) 출력 하나를 (boxes, scores, classes) 로 변환합니다."""
+        preds = output.T
+        class_scores = preds[:, 4:]
+        classes = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(preds)), classes]
+        mask = scores > conf
+        cx, cy, w, h = preds[mask, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        scores, classes = scores[mask], classes[mask]
+        keep = batched_nms(boxes, scores, classes, iou)[:self.max_det]
+        return boxes[keep], scores[keep], classes[keep].astype(np.int64)
+
+    def predict_batch(self, images, conf=0.25, iou=0.5):
+        tensor = self._to_tensor(images)
+        step = self.fixed_batch or len(images)
+        remainder = len(images) % step
+        if remainder:
+            # 고정 배치 모델은 마지막 묶음도 step 개여야 하므로 빈 이미지로 채우고 그 출력은 버림
+            padding = np.zeros((step - remainder,) + tensor.shape[1:], dtype=tensor.dtype)
+            tensor = np.concatenate([tensor, padding])
+        outputs = []
+        for start in range(0, len(images), step):
+            outputs.append(self.session.run(None, {self.input.name: tensor[start:start + step]})[0])
+        output = np.concatenate(outputs)
+        return [self._decode(output[i], conf, iou) for i in range(len(images))]
+
+
+def load_backend(path, backend=None, device="cpu", threads=None):
+    """
+    가중치 파일로 백엔드를 만듭니다. backend 가 None 이면 확장자로 고릅니다 (.onnx -> onnx).
+    """
+    backend = backend or ("onnx" if path.lower().endswith(".onnx") else "torch")
+    if backend == "onnx":
+        return OnnxBackend(path, threads)
+    if backend == "torch":
+        return TorchBackend(path, device)
+    raise ValueError(f"지원하지 않는 백엔드입니다: {backend}")
@@ -0,0 +1,115 @@
+"""
+serve.py 부하 테스트.
+
+동시 접속 수(concurrency)만큼 스레드가 이미지를 계속 POST 하고, 요청별 지연 시간의
+p50/p90/p99 와 초당 처리 이미지 수를 출력합니다. max-batch/max-wait-ms 설정 비교용.
+
+사용 예시:
+    python bench_server.py ../datasets/images/val --url http://127.0.0.1:8000 --concurrency 8 --requests 400
+"""
+
+import os
+import time
+import json
+import argparse
+import threading
+import urllib.request
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def post_image(url, data, timeout=60):
+    """이미지 바이트를 /predict 로 보내고 응답 JSON 을 반환합니다."""
+    request = urllib.request.Request(url + "/predict", data=data, method="POST",
+                                     headers={"Content-Type": "application/octet-stream"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_benchmark(url, images, concurrency=8, total_requests=200, warmup=8):
+    """
+    부하를 걸고 결과를 집계합니다.
+
+    Args:
+        url (str): 서버 주소 (예: http://127.0.0.1:8000)
+        images (list): 보낼 이미지 바이트 목록 (순서대로 돌아가며 사용)
+        concurrency (int): 동시 요청 수
+        total_requests (int): 전체 요청 수 (워밍업 제외)
+        warmup (int): 측정 전에 보내는 요청 수 (모델 초기화 시간 제외)
+
+    Returns:
+        dict: 지연 시간 백분위(ms), 처리량, 오류 수
+    """
+    for i in range(warmup):
+        post_image(url, images[i % len(images)])
+
+    latencies = []
+    errors = []
+    counter = iter(range(total_requests))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                post_image(url, images[i % len(images)])
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    result = {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "images_per_s": round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+    }
+    for q in (50, 90, 99):
+        result[f"p{q}_ms"] = round(float(np.percentile(latencies_ms, q)), 2) if len(latencies_ms) else None
+    if errors:
+        print(f"[WARN] 오류 {len(errors)}개, 예: {errors[0]}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='추론 서버 부하 테스트')
+    parser.add_argument('source', help='보낼 이미지 파일 또는 폴더')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8],
+                        help='동시 요청 수 (여러 개 지정하면 차례로 측정, 기본: 1 8)')
+    parser.add_argument('--requests', type=int, default=200, help='측정할 요청 수 (기본: 200)')
+
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        paths = sorted(os.path.join(args.source, f) for f in os.listdir(args.source)
+                       if f.lower().endswith(IMAGE_EXTENSIONS))
+    else:
+        paths = [args.source]
+    images = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            images.append(f.read())
+
+    for concurrency in args.concurrency:
+        result = run_benchmark(args.url, images, concurrency, args.requests)
+        print(f"동시 {concurrency:>3}: p50 {result['p50_ms']}ms, p90 {result['p90_ms']}ms, p99 {result['p99_ms']}ms, "
+              f"{result['images_per_s']} images/s (요청 {result['requests']}, 오류 {result['errors']})")
@@ -0,0 +1,107 @@
+"""
+추론 결과 박스 후처리 (NumPy).
+
+    - box_iou      : (N, 4) x (M, 4) xyxy 박스의 IoU (또는 IoS) 행렬
+    - nms          : 점수 순 greedy NMS. 한 번에 남은 박스 전체와 겹침 정도를 계산
+    - batched_nms  : 클래스별 NMS 를 좌표 오프셋으로 한 번의 nms 호출로 처리
+    - batched_nmm  : 겹치는 박스를 지우는 대신 합치는 NMS (타일 경계에서 잘린 조각을 하나로)
+
+letterbox 좌표 변환(unletterbox_boxes)은 pre-processing/letterbox_ops.py 에 있습니다.
+"""
+
+import numpy as np
+
+
+def box_iou(boxes_a, boxes_b, metric="iou"):
+    """
+    두 xyxy 박스 배열의 겹침 행렬 (N, M) 을 계산합니다.
+
+    Args:
+        metric: "iou" (교집합 / 합집합) 또는 "ios" (교집합 / 작은 박스 면적).
+            타일 경계에서 잘린 박스는 전체 박스와 IoU 가 낮으므로 타일 결과 병합에는 "ios" 가 적합
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    if metric == "ios":
+        return inter / np.maximum(np.minimum(area_a[:, None], area_b[None, :]), 1e-9)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def nms(boxes, scores, iou_threshold=0.5, metric="iou"):
+    """
+    Greedy NMS. 남은 박스 중 점수가 가장 높은 박스를 고르고, 나머지 전체와의 IoU 를
+    한 번에 계산해서 겹치는 박스를 제거합니다.
+
+    Args:
+        boxes: (N, 4) xyxy
+        scores: (N,)
+        iou_threshold: 이 값보다 겹침이 크면 제거
+        metric: "iou" 또는 "ios" (box_iou 참고)
+
+    Returns:
+        np.ndarray: 남길 박스 인덱스 (점수 내림차순)
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    keep = []
+    while len(order):
+        best = order[0]
+        keep.append(best)
+        if len(order) == 1:
+            break
+        iou = box_iou(boxes[best:best + 1], boxes[order[1:]], metric)[0]
+        order = order[1:][iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def batched_nms(boxes, scores, classes, iou_threshold=0.5, metric="iou"):
+    """
+    클래스별 NMS. 클래스마다 박스를 서로 겹치지 않는 위치로 옮겨서 한 번의 nms 로 처리합니다.
+
+    Returns:
+        np.ndarray: 남길 박스 인덱스 (점수 내림차순)
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    offset = np.asarray(classes, dtype=np.float64)[:, None] * (boxes.max() + 1)
+    return nms(boxes + offset, scores, iou_threshold, metric)
+
+
+def batched_nmm(boxes, scores, classes, threshold=0.5, metric="ios"):
+    """
+    클래스별 greedy NMM (non-maximum merging). 점수가 가장 높은 박스를 남기고, 겹치는 같은 클래스
+    박스를 지우는 대신 그 영역까지 포함하도록 남긴 박스를 넓힙니다. 넓어진 박스로 다시 비교해서
+    더 겹치는 박스가 없을 때까지 반복하므로, 여러 타일 경계에서 잘린 조각들이 하나의 박스로 합쳐집니다.
+
+    Returns:
+        tuple: (남길 박스 인덱스, 합친 박스 (K, 4))
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    classes = np.asarray(classes)
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    keep = []
+    merged = []
+    while len(order):
+        best = order[0]
+        order = order[1:]
+        current = boxes[best].copy()
+        while len(order):
+            overlap = box_iou(current, boxes[order], metric)[0]
+            matched = (overlap > threshold) & (classes[order] == classes[best])
+            if not matched.any():
+                break
+            group = boxes[order[matched]]
+            current[:2] = np.minimum(current[:2], group[:, :2].min(axis=0))
+            current[2:] = np.maximum(current[2:], group[:, 2:].max(axis=0))
+            order = order[~matched]
+        keep.append(best)
+        merged.append(current)
+    return np.array(keep, dtype=np.int64), np.array(merged, dtype=np.float64).reshape(-1, 4)
+
@@ -0,0 +1,337 @@
+"""
+best.pt 를 CPU 배포용 ONNX 로 변환하고, INT8 양자화/정합성 확인/속도 측정을 합니다.
+
+    export   : Ultralytics export 로 best.pt -> best.onnx (dynamic 배치/입력 크기)
+    quantize : datasets/images/val 로 보정(calibration)한 정적 INT8 양자화 -> best_int8.onnx
+    parity   : test 이미지에서 PyTorch 결과와 ONNX 결과의 박스를 비교 (재현율, 평균 IoU, 점수 차이)
+    bench    : 백엔드별 이미지당 지연 시간, 초당 처리 이미지 수, 최대 메모리(RSS)
+
+parity/bench 는 serve.py, sliced_predict.py 와 같은 backends.py 백엔드와 같은 letterbox 입력을 사용하므로,
+여기서 확인한 결과가 서버에서도 그대로 나옵니다.
+
+사용 예시:
+    python export_onnx.py export ../runs/detect/train15/weights/best.pt --imgsz 320
+    python export_onnx.py quantize ../runs/detect/train15/weights/best.onnx --calib ../datasets/images/val --imgsz 320
+    python export_onnx.py parity ../runs/detect/train15/weights/best.pt ../runs/detect/train15/weights/best_int8.onnx \\
+        --images ../datasets/images/test --imgsz 320
+    python export_onnx.py bench ../runs/detect/train15/weights/best_int8.onnx --images ../datasets/images/test --imgsz 320
+"""
+
+import os
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+from boxes import box_iou
+from backends import BACKENDS, load_backend
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pre-processing"))
+from dataset_scan import IMAGE_EXTENSIONS, list_file_names
+from letterbox_ops import letterbox
+
+
+def export_onnx(weights, imgsz=640, dynamic=True, simplify=True, opset=None):
+    """
+    Ultralytics export 로 ONNX 파일을 만듭니다. NMS 는 포함하지 않고 backends.OnnxBackend 에서 처리합니다.
+
+    Returns:
+        str: 만들어진 .onnx 경로 (가중치와 같은 폴더)
+    """
+    from ultralytics import YOLO  # 노트북에서 설치
+
+    return YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=simplify, opset=opset)
+
+
+def load_images(images_dir, imgsz=640, limit=None, padding_color=(114, 114, 114)):
+    """
+    폴더의 이미지를 학습/추론과 같은 letterbox 로 imgsz 크기로 맞춰 불러옵니다.
+
+    Returns:
+        tuple: (파일 이름 목록, letterbox 이미지 (N, imgsz, imgsz, 3) uint8)
+    """
+    file_names = list_file_names(images_dir, IMAGE_EXTENSIONS, sort=True)
+    if limit:
+        file_names = file_names[:limit]
+    # 전체 이미지를 담을 배열을 한 번에 할당하고 각 행에 바로 letterbox
+    images = np.empty((len(file_names), imgsz, imgsz, 3), dtype=np.uint8)
+    names = []
+    for file_name in file_names:
+        img = cv2.imread(os.path.join(images_dir, file_name))
+        if img is None:
+            print(f"[WARN] 이미지를 읽을 수 없습니다: '{file_name}'")
+            continue
+        letterbox(img, (imgsz, imgsz), padding_color, out=images[len(names)])
+        names.append(file_name)
+    return names, images[:len(names)]
+
+
+class _CalibrationReader:
+    """onnxruntime.quantization.CalibrationDataReader 인터페이스 (get_next 가 None 이면 끝)."""
+
+    def __init__(self, input_name, images, batch=8):
+        self.input_name = input_name
+        self.images = images
+        self.batch = batch
+        self.position = 0
+
+    def get_next(self):
+        if self.position >= len(self.images):
+            return None
+        chunk = np.stack(self.images[self.position:self.position + self.batch])
+        self.position += self.batch
+        tensor = np.ascontiguousarray(chunk[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255
+        return {self.input_name: tensor}
+
+    def rewind(self):
+        self.position = 0
+
+
+def quantize_int8(onnx_path, calib_dir, output_path=None, imgsz=640, limit=300, batch=8, per_channel=True):
+    """
+    calib_dir 이미지로 활성값 범위를 보정해서 정적 INT8 (QDQ) 모델을 만듭니다.
+    가중치는 채널별 int8, 활성값은 uint8 로 양자화합니다.
+
+    Args:
+        onnx_path (str): export 로 만든 float32 .onnx
+        calib_dir (str): 보정 이미지 폴더 (datasets/images/val)
+        output_path (str): 저장 경로 (기본: <이름>_int8.onnx)
+        imgsz (int): 보정 입력 크기 (export 와 같게)
+        limit (int): 보정에 사용할 최대 이미지 수
+
+    Returns:
+        str: 저장한 경로
+    """
+    import onnxruntime as ort  # pip install onnxruntime
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    output_path = output_path or os.path.splitext(onnx_path)[0] + "_int8.onnx"
+    input_name = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    _, images = load_images(calib_dir, imgsz, limit)
+    if not len(images):
+        raise ValueError(f"보정 이미지가 없습니다: '{calib_dir}'")
+    print(f"보정 이미지 {len(images)}개 ({imgsz}x{imgsz})")
+
+    # 양자화 전에 shape 추론/그래프 정리를 해 두면 더 많은 연산이 양자화됨
+    preprocessed_path = os.path.splitext(output_path)[0] + "_pre.onnx"
+    quant_pre_process(onnx_path, preprocessed_path)
+    try:
+        quantize_static(
+            preprocessed_path, output_path, _CalibrationReader(input_name, images, batch),
+            quant_format=QuantFormat.QDQ, per_channel=per_channel,
+            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+    finally:
+        os.remove(preprocessed_path)
+    _copy_metadata(onnx_path, output_path)
+    return output_path
+
+
+def _copy_metadata(source_path, target_path):
+    """Ultralytics 가 넣은 메타데이터(names, imgsz 등)를 양자화 모델에도 복사합니다."""
+    import onnx  # ultralytics export 시 함께 설치됨
+
+    source = onnx.load(source_path, load_external_data=False)
+    target = onnx.load(target_path)
+    existing = {p.key for p in target.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            target.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(target, target_path)
+
+
+def _predict_all(backend, images, conf, iou, batch):
+    outputs = []
+    for start in range(0, len(images), batch):
+        outputs.extend(backend.predict_batch(images[start:start + batch], conf, iou))
+    return outputs
+
+
+def compare_detections(reference, candidate, iou_threshold=0.5):
+    """
+    이미지 하나의 두 결과를 클래스별 greedy 매칭으로 비교합니다 (기준 박스 점수 순).
+
+    Returns:
+        dict: reference/candidate 박스 수, 매칭 수, 매칭 IoU 목록, 매칭 점수 차이 목록
+    """
+    ref_boxes, ref_scores, ref_classes = reference
+    cand_boxes, cand_scores, cand_classes = candidate
+    ious, score_diffs = [], []
+    if len(ref_boxes) and len(cand_boxes):
+        overlap = box_iou(ref_boxes, cand_boxes)
+        overlap[ref_classes[:, None] != cand_classes[None, :]] = 0
+        used = np.zeros(len(cand_boxes), dtype=bool)
+        for i in np.argsort(-ref_scores, kind='stable'):
+            row = np.where(used, 0, overlap[i])
+            j = int(row.argmax())
+            if row[j] >= iou_threshold:
+                used[j] = True
+                ious.append(float(row[j]))
+                score_diffs.append(abs(float(ref_scores[i]) - float(cand_scores[j])))
+    return {"reference": len(ref_boxes), "candidate": len(cand_boxes), "matched": len(ious),
+            "ious": ious, "score_diffs": score_diffs}
+
+
+def parity_check(reference_weights, candidate_weights, images_dir, imgsz=640, conf=0.25, iou=0.5, batch=8,
+                 match_iou=0.5, limit=None):
+    """
+    같은 letterbox 입력에서 두 모델(보통 best.pt 와 .onnx)의 결과를 비교합니다.
+
+    Returns:
+        dict: 재현율(기준 박스 중 매칭 비율), 정밀도(후보 박스 중 매칭 비율), 평균/최소 IoU,
+            평균/최대 점수 차이, 박스 수가 다른 이미지 목록
+    """
+    names, images = load_images(images_dir, imgsz, limit)
+    reference = _predict_all(load_backend(reference_weights), images, conf, iou, batch)
+    candidate = _predict_all(load_backend(candidate_weights), images, conf, iou, batch)
+
+    totals = {"reference": 0, "candidate": 0, "matched": 0}
+    ious, score_diffs, mismatched = [], [], []
+    for name, ref, cand in zip(names, reference, candidate):
+        result = compare_detections(ref, cand, match_iou)
+        for key in totals:
+            totals[key] += result[key]
+        ious.extend(result["ious"])
+        score_diffs.extend(result["score_diffs"])
+        if not result["reference"] == result["candidate"] == result["matched"]:
+            mismatched.append(name)
+
+    return {
+        "images": len(names),
+        **totals,
+        "recall": totals["matched"] / totals["reference"] if totals["reference"] else 1.0,
+        "precision": totals["matched"] / totals["candidate"] if totals["candidate"] else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else None,
+        "min_iou": float(np.min(ious)) if ious else None,
+        "mean_score_diff": float(np.mean(score_diffs)) if score_diffs else None,
+        "max_score_diff": float(np.max(score_diffs)) if score_diffs else None,
+        "mismatched": mismatched,
+    }
+
+
+def peak_rss_mb():
+    """
+    현재 프로세스의 최대 RSS(MB). resource 모듈은 Unix 전용이라 Windows 에서는 psutil 을 사용하고,
+    둘 다 없으면 None.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil  # pip install psutil
+        except ImportError:
+            return None
+        memory = psutil.Process().memory_info()
+        # Windows 는 peak_wset 에 최대 사용량이 있음. 없으면 현재 RSS
+        return getattr(memory, "peak_wset", memory.rss) / 1024 / 1024
+    # ru_maxrss 는 Linux 에서 KB, macOS 에서 바이트 단위
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 1024 / 1024 if sys.platform == "darwin" else peak_rss / 1024
+
+
+def benchmark(weights, images_dir, backend=None, imgsz=640, batch=1, conf=0.25, iou=0.5, threads=None,
+              warmup=3, rounds=1, limit=100):
+    """
+    백엔드 하나의 추론 속도와 메모리를 측정합니다. 모델마다 별도 프로세스로 실행해야 메모리 값이 섞이지 않습니다.
+
+    Returns:
+        dict: 이미지당 지연 시간(ms), p90, 초당 이미지 수, 최대 RSS(MB, 측정할 수 없으면 None)
+    """
+    _, images = load_images(images_dir, imgsz, limit)
+    if not len(images):
+        raise ValueError(f"측정할 이미지가 없습니다: '{images_dir}'")
+    model = load_backend(weights, backend, threads=threads)
+    for i in range(warmup):
+        model.predict_batch(images[:batch], conf, iou)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i in range(0, len(images), batch):
+            chunk = images[i:i + batch]
+            t0 = time.perf_counter()
+            model.predict_batch(chunk, conf, iou)
+            latencies.append((time.perf_counter() - t0) / len(chunk))
+    wall = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    peak_rss = peak_rss_mb()
+    return {
+        "backend": model.name,
+        "images": len(images) * rounds,
+        "batch": batch,
+        "ms_per_image": round(float(latencies_ms.mean()), 2),
+        "p90_ms": round(float(np.percentile(latencies_ms, 90)), 2),
+        "images_per_s": round(len(images) * rounds / wall, 2),
+        "peak_rss_mb": None if peak_rss is None else round(peak_rss, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='ONNX 변환, INT8 양자화, 정합성 확인, 속도 측정')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='best.pt 를 ONNX 로 변환')
+    export_parser.add_argument('weights', help='모델 가중치 (예: runs/detect/train15/weights/best.pt)')
+    export_parser.add_argument('--imgsz', type=int, default=640, help='입력 크기 (기본: 640)')
+    export_parser.add_argument('--static', action='store_true', help='배치/입력 크기를 고정해서 내보냄')
+    export_parser.add_argument('--opset', type=int, default=None)
+
+    quantize_parser = subparsers.add_parser('quantize', help='정적 INT8 양자화')
+    quantize_parser.add_argument('onnx', help='export 로 만든 .onnx')
+    quantize_parser.add_argument('--calib', default='./datasets/images/val', help='보정 이미지 폴더')
+    quantize_parser.add_argument('--imgsz', type=int, default=640, help='보정 입력 크기 (기본: 640)')
+    quantize_parser.add_argument('--limit', type=int, default=300, help='보정 이미지 수 (기본: 300)')
+    quantize_parser.add_argument('--output', default=None, help='저장 경로 (기본: <이름>_int8.onnx)')
+    quantize_parser.add_argument('--per-tensor', action='store_true', help='채널별 대신 텐서 단위로 양자화')
+
+    parity_parser = subparsers.add_parser('parity', help='PyTorch 결과와 비교')
+    parity_parser.add_argument('reference', help='기준 모델 (best.pt)')
+    parity_parser.add_argument('candidate', help='비교할 모델 (.onnx)')
+    parity_parser.add_argument('--images', default='./datasets/images/test', help='비교 이미지 폴더')
+    parity_parser.add_argument('--imgsz', type=int, default=640)
+    parity_parser.add_argument('--conf', type=float, default=0.25)
+    parity_parser.add_argument('--iou', type=float, default=0.5)
+    parity_parser.add_argument('--match-iou', type=float, default=0.5, help='같은 박스로 볼 IoU 기준 (기본: 0.5)')
+    parity_parser.add_argument('--min-recall', type=float, default=0.95, help='이 값보다 낮으면 종료 코드 1')
+    parity_parser.add_argument('--limit', type=int, default=None)
+
+    bench_parser = subparsers.add_parser('bench', help='추론 속도/메모리 측정')
+    bench_parser.add_argument('weights', help='모델 (.pt 또는 .onnx)')
+    bench_parser.add_argument('--images', default='./datasets/images/test', help='측정 이미지 폴더')
+    bench_parser.add_argument('--backend', choices=BACKENDS, default=None, help='추론 백엔드 (기본: 확장자로 선택)')
+    bench_parser.add_argument('--imgsz', type=int, default=640)
+    bench_parser.add_argument('--batch', type=int, default=1)
+    bench_parser.add_argument('--threads', type=int, default=None, help='onnx 백엔드 스레드 수')
+    bench_parser.add_argument('--rounds', type=int, default=1, help='이미지 전체를 반복할 횟수')
+    bench_parser.add_argument('--limit', type=int, default=100)
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        path = export_onnx(args.weights, args.imgsz, dynamic=not args.static, opset=args.opset)
+        print(f"ONNX 저장: {path}")
+    elif args.command == 'quantize':
+        path = quantize_int8(args.onnx, args.calib, args.output, args.imgsz, args.limit,
+                             per_channel=not args.per_tensor)
+        print(f"INT8 모델 저장: {path} ({os.path.getsize(args.onnx) / 1e6:.1f}MB -> {os.path.getsize(path) / 1e6:.1f}MB)")
+    elif args.command == 'parity':
+        result = parity_check(args.reference, args.candidate, args.images, args.imgsz, args.conf, args.iou,
+                              match_iou=args.match_iou, limit=args.limit)
+        print(f"이미지 {result['images']}개, 박스 {result['reference']} -> {result['candidate']}, 매칭 {result['matched']}")
+        print(f"재현율 {result['recall']:.4f}, 정밀도 {result['precision']:.4f}, "
+              f"평균 IoU {result['mean_iou']}, 최소 IoU {result['min_iou']}, 최대 점수 차이 {result['max_score_diff']}")
+        for name in result['mismatched'][:20]:
+            print(f"  결과가 다른 이미지: {name}")
+        if result['recall'] < args.min_recall:
+            print(f"[WARN] 재현율이 기준 {args.min_recall} 보다 낮습니다.")
+            sys.exit(1)
+    elif args.command == 'bench':
+        result = benchmark(args.weights, args.images, args.backend, args.imgsz, args.batch, threads=args.threads,
+                           rounds=args.rounds, limit=args.limit)
+        rss = "측정 불가" if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']}MB"
+        print(f"[{result['backend']}] 배치 {result['batch']}: {result['ms_per_image']}ms/이미지 (p90 {result['p90_ms']}ms), "
+              f"{result['images_per_s']} images/s, 최대 RSS {rss}")
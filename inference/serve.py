@@ -0,0 +1,220 @@
+"""
+학습된 모델(best.pt 또는 export_onnx.py 로 변환한 .onnx)을 한 번만 불러 두고 HTTP 로 추론하는 로컬 서버.
+백엔드(torch / onnx)는 시작할 때 --backend 로 고릅니다.
+
+요청 하나마다 모델을 호출하면 호출 오버헤드가 대부분을 차지하므로, 동시에 들어온 요청을
+마이크로 배치로 묶어 한 번에 추론합니다.
+
+    - 디코딩 + letterbox : 스레드 풀 (cv2 는 GIL 을 풀기 때문에 병렬로 동작)
+    - 배치 추론          : 배치 스레드 하나가 첫 요청 후 max_wait_ms 동안 또는 max_batch 개가
+                           모일 때까지 기다렸다가 한 번에 추론
+    - 응답               : 원본 이미지 좌표 xyxy 박스 JSON
+
+API:
+    POST /predict   본문: 이미지 파일 바이트 (jpg/png)
+                    응답: {"detections": [{"class", "name", "confidence", "box": [x1, y1, x2, y2]}], "width", "height"}
+    GET  /health    {"status": "ok", "batches": 처리한 배치 수, "images": 처리한 이미지 수}
+
+사용 예시:
+    python serve.py ../runs/detect/train15/weights/best.pt --imgsz 320 --max-batch 8 --max-wait-ms 10 --port 8000
+    python serve.py ../runs/detect/train15/weights/best_int8.onnx --backend onnx --imgsz 320
+    curl --data-binary @../datasets/images/val/3b3451d8-00000025.jpg http://127.0.0.1:8000/predict
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from backends import BACKENDS, load_backend
+from sliced_predict import detections_to_json
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pre-processing"))
+from letterbox_ops import letterbox, unletterbox_boxes
+
+
+class MicroBatcher:
+    """
+    요청을 모아 batch_fn 을 한 번에 호출합니다.
+
+    submit(item) 은 Future 를 반환하고, 배치 스레드가 첫 항목을 받은 뒤 max_wait_ms 가 지나거나
+    max_batch 개가 모이면 batch_fn(items) 를 호출해서 결과를 각 Future 에 넣습니다.
+    """
+
+    def __init__(self, batch_fn, max_batch=8, max_wait_ms=10):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self.queue.put((item, future))
+        return future
+
+    def _collect(self):
+        """첫 항목을 기다린 뒤 마감 시각까지 최대 max_batch 개를 모읍니다."""
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class InferenceService:
+    """디코딩/letterbox 스레드 풀과 MicroBatcher 로 백엔드 하나를 공유합니다."""
+
+    def __init__(self, backend, imgsz=640, conf=0.25, iou=0.5, max_batch=8, max_wait_ms=10,
+                 preprocess_workers=4, padding_color=(114, 114, 114)):
+        self.backend = backend
+        self.names = backend.names
+        # 고정 입력 크기로 내보낸 ONNX 모델은 그 크기에 맞춤
+        self.target_size = getattr(backend, "input_size", None) or (imgsz, imgsz)
+        self.conf = conf
+        self.iou = iou
+        self.padding_color = padding_color
+        self.preprocess_pool = ThreadPoolExecutor(max_workers=preprocess_workers)
+        self.batcher = MicroBatcher(self._predict_batch, max_batch, max_wait_ms)
+
+    def _preprocess(self, data):
+        """이미지 바이트를 디코딩해서 letterbox 합니다."""
+        if not data:
+            raise ValueError("요청 본문이 비어 있습니다.")
+        try:
+            img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except cv2.error:
+            # 이미지가 아닌 바이트는 None 대신 cv2.error 가 나기도 함 (400 으로 응답하도록 변환)
+            img = None
+        if img is None:
+            raise ValueError("이미지를 디코딩할 수 없습니다.")
+        padded, scale, padding = letterbox(img, self.target_size, self.padding_color)
+        return padded, scale, padding, (img.shape[1], img.shape[0])
+
+    def _predict_batch(self, items):
+        """letterbox 된 이미지 배치를 추론하고 원본 좌표로 되돌립니다. 배치 스레드에서 실행됩니다."""
+        outputs = self.backend.predict_batch([item[0] for item in items], self.conf, self.iou)
+        results = []
+        for (_, scale, padding, original_size), (boxes, scores, classes) in zip(items, outputs):
+            boxes = unletterbox_boxes(boxes, scale, padding, original_size)
+            results.append({
+                "detections": detections_to_json(boxes, scores, classes, self.names),
+                "width": original_size[0],
+                "height": original_size[1],
+            })
+        return results
+
+    def predict(self, data):
+        """이미지 바이트 하나를 추론합니다 (요청 스레드에서 호출, 배치가 끝날 때까지 대기)."""
+        item = self.preprocess_pool.submit(self._preprocess, data).result()
+        return self.batcher.submit(item).result()
+
+
+def make_handler(service):
+    """service 를 사용하는 요청 핸들러 클래스를 만듭니다."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {"error": "not found"})
+                return
+            self._send_json(200, {"status": "ok", "batches": service.batcher.batches,
+                                  "images": service.batcher.items})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            if length <= 0:
+                self._send_json(400, {"error": "요청 본문이 비어 있습니다."})
+                return
+            data = self.rfile.read(length)
+            try:
+                self._send_json(200, service.predict(data))
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            # 요청마다 로그를 출력하면 부하 테스트 시 출력이 병목이 되므로 끔
+            pass
+
+    return Handler
+
+
+def serve(service, host="127.0.0.1", port=8000):
+    """서버를 시작합니다 (Ctrl+C 로 종료)."""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"추론 서버 시작: http://{host}:{port} (POST /predict, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='마이크로 배치 추론 HTTP 서버')
+    parser.add_argument('weights', help='모델 가중치 (예: runs/detect/train15/weights/best.pt 또는 best.onnx)')
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help='추론 백엔드 (기본: 확장자로 선택)')
+    parser.add_argument('--imgsz', type=int, default=640, help='모델 입력 크기 (기본: 640)')
+    parser.add_argument('--conf', type=float, default=0.25, help='신뢰도 기준 (기본: 0.25)')
+    parser.add_argument('--iou', type=float, default=0.5, help='NMS IoU 기준 (기본: 0.5)')
+    parser.add_argument('--device', default='cpu', help='torch 백엔드 장치 (기본: cpu)')
+    parser.add_argument('--threads', type=int, default=None, help='onnx 백엔드 스레드 수')
+    parser.add_argument('--max-batch', type=int, default=8, help='최대 배치 크기 (기본: 8)')
+    parser.add_argument('--max-wait-ms', type=float, default=10, help='배치를 모으는 최대 대기 시간 (기본: 10ms)')
+    parser.add_argument('--preprocess-workers', type=int, default=4, help='디코딩/letterbox 스레드 수 (기본: 4)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+
+    args = parser.parse_args()
+
+    backend = load_backend(args.weights, args.backend, args.device, args.threads)
+    service = InferenceService(backend, args.imgsz, args.conf, args.iou, args.max_batch, args.max_wait_ms,
+                               args.preprocess_workers)
+    serve(service, args.host, args.port)
@@ -0,0 +1,181 @@
+"""
+큰 이미지용 타일(슬라이스) 추론.
+
+고해상도 사진을 학습 imgsz(300, 640)로 한 번에 letterbox 하면 작은 컵/나무가 몇 픽셀로 줄어 놓칩니다.
+여기서는 이미지를 겹치는 타일로 나누고, 타일들을 letterbox_ops 로 미리 할당한 배치 버퍼에 imgsz 로
+letterbox 한 뒤 백엔드(backends.py)의 한 번의 배치로 추론합니다. 결과 박스는 letterbox 역변환과
+타일 위치로 원본 좌표로 되돌리고, 전체 이미지 추론 결과(큰 객체용)와 합쳐 클래스별 NMS 로 병합합니다.
+기본 병합 방식(nmm)은 타일 경계에서 잘린 같은 객체의 조각을 지우지 않고 하나의 박스로 합칩니다.
+
+사용 예시:
+    python sliced_predict.py ../runs/detect/train15/weights/best.pt ../datasets/images/val \\
+        --tile 640 --overlap 0.2 --imgsz 640 --batch 8 --save-dir sliced_out
+"""
+
+import os
+import sys
+import json
+import argparse
+import cv2
+import numpy as np
+from boxes import batched_nms, batched_nmm
+from backends import BACKENDS, load_backend
+
+# 전처리 스크립트와 같은 letterbox 변환을 사용 (학습 데이터와 같은 변환)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pre-processing"))
+from letterbox_ops import letterbox_batch, unletterbox_boxes
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+MATCH_METRICS = ("ios", "iou")
+MERGE_MODES = ("nmm", "nms")
+
+
+def make_tiles(width, height, tile_size=640, overlap=0.2):
+    """
+    이미지를 덮는 타일 좌표 (T, 4) [x0, y0, x1, y1] 을 만듭니다.
+    마지막 타일은 이미지 밖으로 나가지 않도록 안쪽으로 당겨서 모든 타일 크기를 같게 유지합니다.
+    """
+    def starts(length):
+        size = min(tile_size, length)
+        step = max(1, int(size * (1 - overlap)))
+        positions = list(range(0, length - size + 1, step))
+        if positions[-1] + size < length:
+            positions.append(length - size)
+        return positions, size
+
+    xs, tile_w = starts(width)
+    ys, tile_h = starts(height)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    x0, y0 = grid_x.ravel(), grid_y.ravel()
+    return np.stack([x0, y0, x0 + tile_w, y0 + tile_h], axis=1)
+
+
+def sliced_predict(backend, img, tile_size=640, overlap=0.2, imgsz=640, batch=8, conf=0.25, iou=0.5,
+                   match_metric="ios", match_threshold=0.5, merge="nmm", full_image=True,
+                   padding_color=(114, 114, 114)):
+    """
+    이미지 하나를 타일로 나눠 추론하고 원본 좌표의 결과를 반환합니다.
+
+    Args:
+        backend: backends.load_backend 로 만든 추론 백엔드
+        img: BGR 이미지
+        tile_size (int): 타일 한 변 (원본 픽셀)
+        overlap (float): 이웃 타일 겹침 비율
+        imgsz (int): 모델 입력 크기 (타일을 이 크기로 letterbox)
+        batch (int): 한 번에 추론할 타일 수
+        conf, iou: 신뢰도/NMS 기준 (타일 안에서 적용)
+        match_metric (str): 타일 결과 병합 기준 "ios" 또는 "iou"
+        match_threshold (float): 병합 NMS 기준값
+        merge (str): "nmm" (겹치는 박스를 합침) 또는 "nms" (겹치는 박스를 지움)
+        full_image (bool): 전체 이미지를 한 번 더 추론해서 타일보다 큰 객체도 찾음
+
+    Returns:
+        tuple: (boxes (N, 4) xyxy 원본 픽셀, scores (N,), classes (N,))
+    """
+    height, width = img.shape[:2]
+    target_size = (imgsz, imgsz)
+    tiles = make_tiles(width, height, tile_size, overlap)
+    # 타일이 하나면 전체 이미지 추론과 같음
+    regions = [tuple(t) for t in tiles]
+    if full_image and len(tiles) > 1:
+        regions.append((0, 0, width, height))
+
+    # 배치 버퍼는 한 번만 할당하고 배치마다 재사용
+    buffer = np.empty((min(batch, len(regions)), imgsz, imgsz, 3), dtype=np.uint8)
+    infos, all_boxes, all_scores, all_classes = [], [], [], []
+    for start in range(0, len(regions), batch):
+        chunk = regions[start:start + batch]
+        inputs, info = letterbox_batch([img[y0:y1, x0:x1] for x0, y0, x1, y1 in chunk], target_size,
+                                       padding_color, out=buffer)
+        infos.append(info)
+        for boxes, scores, classes in backend.predict_batch(inputs, conf, iou):
+            all_boxes.append(boxes)
+            all_scores.append(scores)
+            all_classes.append(classes)
+
+    boxes = np.concatenate(all_boxes).reshape(-1, 4)
+    scores = np.concatenate(all_scores)
+    classes = np.concatenate(all_classes).astype(np.int64)
+
+    # 모든 타일의 박스를 한 번에 원본 좌표로 변환 (박스마다 해당 타일의 letterbox 정보와 위치)
+    counts = [len(b) for b in all_boxes]
+    info = np.repeat(np.concatenate(infos), counts, axis=0)
+    origin = np.repeat(np.array(regions, dtype=np.float64)[:, :2], counts, axis=0)
+    boxes = unletterbox_boxes(boxes, info[:, 2], (info[:, 3], info[:, 4]), (info[:, 0], info[:, 1]))
+    boxes[:, [0, 2]] += origin[:, [0]]
+    boxes[:, [1, 3]] += origin[:, [1]]
+    if merge == "nmm":
+        keep, merged = batched_nmm(boxes, scores, classes, match_threshold, match_metric)
+        return merged, scores[keep], classes[keep]
+    keep = batched_nms(boxes, scores, classes, match_threshold, match_metric)
+    return boxes[keep], scores[keep], classes[keep]
+
+
+def draw_detections(img, boxes, scores, classes, names=None):
+    """원본 좌표 박스를 이미지에 그립니다 (제자리에서 수정)."""
+    names = names or {}
+    line_width = max(round(sum(img.shape[:2]) / 2 * 0.003), 2)
+    for (x0, y0, x1, y1), score, class_id in zip(boxes.round().astype(int), scores, classes):
+        color = (0, 255, 0) if class_id == 0 else (255, 128, 0)
+        cv2.rectangle(img, (x0, y0), (x1, y1), color, line_width, cv2.LINE_AA)
+        cv2.putText(img, f"{names.get(int(class_id), class_id)} {score:.2f}", (x0, max(y0 - 4, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, line_width / 3, color, 1, cv2.LINE_AA)
+    return img
+
+
+def detections_to_json(boxes, scores, classes, names=None):
+    """결과를 JSON 으로 쓸 수 있는 리스트로 변환합니다."""
+    names = names or {}
+    return [
+        {"class": int(c), "name": names.get(int(c), str(int(c))), "confidence": round(float(s), 4),
+         "box": [round(float(v), 1) for v in b]}
+        for b, s, c in zip(boxes, scores, classes)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='큰 이미지를 타일로 나눠 추론합니다.')
+    parser.add_argument('weights', help='모델 가중치 (예: runs/detect/train15/weights/best.pt 또는 best.onnx)')
+    parser.add_argument('source', help='이미지 파일 또는 폴더')
+    parser.add_argument('--tile', type=int, default=640, help='타일 크기 (원본 픽셀, 기본: 640)')
+    parser.add_argument('--overlap', type=float, default=0.2, help='타일 겹침 비율 (기본: 0.2)')
+    parser.add_argument('--imgsz', type=int, default=640, help='모델 입력 크기 (기본: 640)')
+    parser.add_argument('--batch', type=int, default=8, help='한 번에 추론할 타일 수 (기본: 8)')
+    parser.add_argument('--conf', type=float, default=0.25, help='신뢰도 기준 (기본: 0.25)')
+    parser.add_argument('--match-metric', choices=MATCH_METRICS, default='ios', help='타일 결과 병합 기준')
+    parser.add_argument('--match-threshold', type=float, default=0.5, help='병합 기준값 (기본: 0.5)')
+    parser.add_argument('--merge', choices=MERGE_MODES, default='nmm', help='타일 결과 병합 방식 (기본: nmm)')
+    parser.add_argument('--no-full', action='store_true', help='전체 이미지 추론을 추가하지 않음')
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help='추론 백엔드 (기본: 확장자로 선택)')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--save-dir', default=None, help='박스를 그린 이미지와 JSON 을 저장할 폴더')
+
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        paths = sorted(os.path.join(args.source, f) for f in os.listdir(args.source)
+                       if f.lower().endswith(IMAGE_EXTENSIONS))
+    else:
+        paths = [args.source]
+
+    backend = load_backend(args.weights, args.backend, args.device)
+    if args.save_dir:
+        os.makedirs(args.save_dir, exist_ok=True)
+
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            print(f"[WARN] 이미지를 읽을 수 없습니다: '{path}'")
+            continue
+        boxes, scores, classes = sliced_predict(
+            backend, img, args.tile, args.overlap, args.imgsz, args.batch, args.conf,
+            match_metric=args.match_metric, match_threshold=args.match_threshold, merge=args.merge,
+            full_image=not args.no_full,
+        )
+        print(f"{os.path.basename(path)}: 탐지된 객체 {len(boxes)}개")
+        if args.save_dir:
+            base_name = os.path.splitext(os.path.basename(path))[0]
+            cv2.imwrite(os.path.join(args.save_dir, os.path.basename(path)),
+                        draw_detections(img, boxes, scores, classes, backend.names))
+            with open(os.path.join(args.save_dir, base_name + ".json"), 'w', encoding='utf-8') as f:
+                json.dump(detections_to_json(boxes, scores, classes, backend.names), f, ensure_ascii=False)
@@ -0,0 +1,182 @@
+"""
+영상 프레임 간 객체 추적 (IoU 매칭 + 칼만 필터, SORT 방식의 가벼운 구현).
+
+video_stream.py 는 매 프레임 탐지하지 않고 몇 프레임마다 한 번만 탐지합니다. 탐지하지 않은 프레임에서는
+칼만 필터의 등속 모델로 박스 위치를 예측해서 결과를 이어 주고, 탐지한 프레임에서는 예측 박스와 새 탐지를
+클래스별 IoU 로 매칭해서 보정합니다. 확정된 트랙 ID 수로 컵/나무 개수를 셉니다.
+
+    상태: [cx, cy, w, h, vx, vy, vw, vh] (박스 중심/크기와 프레임당 변화량)
+    관측: [cx, cy, w, h]
+"""
+
+import numpy as np
+from boxes import box_iou
+
+
+def xyxy_to_cxcywh(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2,
+                     boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]], axis=1)
+
+
+def cxcywh_to_xyxy(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    half_w, half_h = boxes[:, 2] / 2, boxes[:, 3] / 2
+    return np.stack([boxes[:, 0] - half_w, boxes[:, 1] - half_h,
+                     boxes[:, 0] + half_w, boxes[:, 1] + half_h], axis=1)
+
+
+class KalmanBoxTrack:
+    """박스 하나의 등속 칼만 필터."""
+
+    # 모든 트랙이 같은 행렬을 사용
+    F = np.eye(8) + np.eye(8, k=4)
+    H = np.eye(4, 8)
+
+    def __init__(self, track_id, box, score, class_id, position_std=0.05, velocity_std=0.01):
+        self.id = track_id
+        self.class_id = int(class_id)
+        self.score = float(score)
+        self.hits = 1           # 매칭된 탐지 수
+        self.misses = 0         # 연속으로 매칭되지 않은 탐지 횟수 (탐지하지 않은 프레임은 세지 않음)
+        self.age = 0            # 생성 후 지난 프레임 수
+        self.position_std = position_std
+        self.velocity_std = velocity_std
+
+        measurement = xyxy_to_cxcywh(box)[0]
+        self.x = np.concatenate([measurement, np.zeros(4)])
+        # 속도는 처음에 모르므로 분산을 크게
+        scale = max(measurement[2], measurement[3], 1.0)
+        self.P = np.diag(np.r_[np.full(4, (2 * position_std * scale) ** 2),
+                               np.full(4, (10 * velocity_std * scale) ** 2)])
+
+    def _noise_scale(self):
+        return max(self.x[2], self.x[3], 1.0)
+
+    def predict(self):
+        """한 프레임만큼 상태를 진행합니다."""
+        # 크기가 음수가 되지 않도록 크기 변화량을 제한
+        for i in (2, 3):
+            if self.x[i] + self.x[i + 4] <= 1:
+                self.x[i + 4] = 0
+        scale = self._noise_scale()
+        Q = np.diag(np.r_[np.full(4, (self.position_std * scale) ** 2),
+                          np.full(4, (self.velocity_std * scale) ** 2)])
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + Q
+        self.age += 1
+
+    def update(self, box, score):
+        """매칭된 탐지 박스로 상태를 보정합니다."""
+        R = np.eye(4) * (self.position_std * self._noise_scale()) ** 2
+        residual = xyxy_to_cxcywh(box)[0] - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ residual
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+        self.score = float(score)
+        self.hits += 1
+        self.misses = 0
+
+    @property
+    def box(self):
+        return cxcywh_to_xyxy(self.x[:4])[0]
+
+
+def greedy_match(iou, threshold):
+    """
+    IoU 행렬 (T, D) 에서 IoU 가 큰 쌍부터 하나씩 매칭합니다 (트랙/탐지 수가 적어 헝가리안 없이 충분).
+
+    Returns:
+        list: (트랙 인덱스, 탐지 인덱스) 목록
+    """
+    if iou.size == 0:
+        return []
+    rows, cols = np.nonzero(iou > threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+    used_rows, used_cols, matches = set(), set(), []
+    for k in order:
+        r, c = int(rows[k]), int(cols[k])
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((r, c))
+    return matches
+
+
+class Tracker:
+    """
+    여러 객체 추적기. 매 프레임 step() 을 한 번 호출하고, 탐지한 프레임에서는 탐지 결과를 함께 넘깁니다.
+
+        tracker = Tracker()
+        for frame in frames:
+            if 탐지할 프레임:
+                tracks = tracker.step((boxes, scores, classes))
+            else:
+                tracks = tracker.step()   # 예측만
+
+    Args:
+        iou_threshold (float): 예측 박스와 탐지를 같은 객체로 볼 최소 IoU
+        max_misses (int): 이 횟수만큼 연속으로 탐지에서 놓치면 트랙 삭제
+        min_hits (int): 이 횟수 이상 매칭된 트랙만 결과/개수에 포함 (오탐 제거)
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=3, min_hits=2):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.tracks = []
+        self.next_id = 1
+        self.confirmed_ids = {}   # 클래스 -> 확정된 트랙 ID 집합
+
+    def step(self, detections=None):
+        """
+        모든 트랙을 한 프레임 진행하고, detections 가 있으면 매칭해서 보정/생성/삭제합니다.
+
+        Args:
+            detections: (boxes (N, 4) xyxy, scores (N,), classes (N,)) 또는 None (탐지하지 않은 프레임)
+
+        Returns:
+            list: 확정된 트랙 목록 (KalmanBoxTrack)
+        """
+        for track in self.tracks:
+            track.predict()
+
+        if detections is not None:
+            self._update(*detections)
+
+        active = [t for t in self.tracks if t.hits >= self.min_hits]
+        for track in active:
+            self.confirmed_ids.setdefault(track.class_id, set()).add(track.id)
+        return active
+
+    def _update(self, boxes, scores, classes):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        classes = np.asarray(classes).astype(np.int64)
+        if self.tracks and len(boxes):
+            predicted = np.array([t.box for t in self.tracks])
+            iou = box_iou(predicted, boxes)
+            # 다른 클래스끼리는 매칭하지 않음
+            iou[np.array([t.class_id for t in self.tracks])[:, None] != classes[None, :]] = 0
+            matches = greedy_match(iou, self.iou_threshold)
+        else:
+            matches = []
+
+        matched_tracks = {r for r, _ in matches}
+        matched_detections = {c for _, c in matches}
+        for r, c in matches:
+            self.tracks[r].update(boxes[c], scores[c])
+        for r, track in enumerate(self.tracks):
+            if r not in matched_tracks:
+                track.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for c in range(len(boxes)):
+            if c not in matched_detections:
+                self.tracks.append(KalmanBoxTrack(self.next_id, boxes[c], scores[c], classes[c]))
+                self.next_id += 1
+
+    def counts(self):
+        """지금까지 확정된 트랙 수 (클래스별 고유 객체 수)."""
+        return {class_id: len(ids) for class_id, ids in sorted(self.confirmed_ids.items())}
@@ -0,0 +1,282 @@
+"""
+영상(동영상 파일, RTSP/HTTP 스트림, 카메라)에서 컵/나무를 실시간으로 탐지하고 추적합니다.
+
+CPU 에서는 모든 프레임을 탐지할 수 없으므로
+
+    - 디코딩 스레드 : 프레임을 읽어 크기가 정해진 큐에 넣음. 실시간 소스에서 큐가 가득 차면
+                      가장 오래된 프레임을 버려서(dropped) 지연이 쌓이지 않게 함
+    - 적응형 건너뛰기: 측정한 탐지 프레임/추적만 하는 프레임의 처리 시간(지수 이동 평균)과 소스 FPS 로
+                      몇 프레임마다 탐지할지 정함 (30fps 에서 탐지 40ms, 추적 3ms 면 2 프레임마다 탐지)
+    - 추적          : tracker.py 의 칼만 필터가 탐지하지 않은 프레임의 박스를 예측해서 이어 주고,
+                      확정된 트랙 ID 수로 객체 수를 셈
+
+을 사용합니다. 동영상 파일은 기본적으로 모든 프레임을 순서대로 처리하고, --realtime 을 주면
+원래 FPS 속도로 프레임이 들어오는 카메라처럼 동작합니다 (처리가 늦으면 프레임이 버려짐).
+
+사용 예시:
+    python video_stream.py ../runs/detect/train15/weights/best.pt cafe.mp4 --imgsz 320 --realtime --save tracked.mp4
+    python video_stream.py ../runs/detect/train15/weights/best_int8.onnx rtsp://192.168.0.10/stream --imgsz 320
+"""
+
+import os
+import sys
+import math
+import time
+import queue
+import argparse
+import threading
+import cv2
+import numpy as np
+from backends import BACKENDS, load_backend
+from tracker import Tracker
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pre-processing"))
+from letterbox_ops import letterbox, unletterbox_boxes
+
+# FPS 를 알 수 없는 스트림의 기본값
+DEFAULT_FPS = 30.0
+
+
+class FrameReader:
+    """
+    디코딩 스레드. 프레임을 (프레임 번호, 이미지) 로 큐에 넣고, 끝나면 None 을 넣습니다.
+
+    Args:
+        source: 동영상 경로, 스트림 URL 또는 카메라 번호
+        queue_size (int): 큐 크기
+        realtime (bool): 동영상 파일을 원래 FPS 속도로 읽어 실시간 스트림을 흉내냄.
+            파일이 아닌 소스(스트림, 카메라)는 항상 실시간으로 처리
+    """
+
+    def __init__(self, source, queue_size=8, realtime=False):
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise ValueError(f"영상 소스를 열 수 없습니다: '{source}'")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+        self.is_file = isinstance(source, str) and os.path.isfile(source)
+        self.pace = realtime and self.is_file
+        self.live = realtime or not self.is_file
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.frames_read = 0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _put(self, item):
+        if self.live and item is not None:
+            # 실시간 소스: 기다리지 않고 가장 오래된 프레임을 버림
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self):
+        interval = 1 / self.fps
+        next_time = time.perf_counter()
+        index = 0
+        try:
+            while not self._stop.is_set():
+                ok, frame = self.capture.read()
+                if not ok:
+                    break
+                if self.pace:
+                    next_time += interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.frames_read += 1
+                self._put((index, frame))
+                index += 1
+        finally:
+            self.capture.release()
+            self._put(None)
+
+
+class AdaptiveSkipper:
+    """
+    프레임 처리 시간의 지수 이동 평균으로 탐지 간격(프레임 수) k 를 정합니다.
+
+    탐지 프레임 하나(D 초)와 추적만 하는 프레임 k - 1 개(T 초)를 k 프레임 시간 안에 처리해야
+    소스 속도를 따라가므로 D + (k - 1) T <= k / fps, 즉 k >= (D - T) / (1 / fps - T) 입니다.
+    """
+
+    def __init__(self, fps, max_interval=10, smoothing=0.2):
+        self.fps = fps
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.detect_time = None
+        self.track_time = 0.0
+
+    def _smooth(self, average, value):
+        return value if average is None else average + self.smoothing * (value - average)
+
+    def update(self, elapsed, detected):
+        """프레임 하나의 처리 시간을 기록합니다."""
+        if detected:
+            self.detect_time = self._smooth(self.detect_time, elapsed)
+        else:
+            self.track_time = self._smooth(self.track_time, elapsed)
+
+    @property
+    def interval(self):
+        if self.detect_time is None:
+            return 1
+        budget = 1 / self.fps - self.track_time
+        if budget <= 0:
+            return self.max_interval
+        return int(min(self.max_interval, max(1, math.ceil((self.detect_time - self.track_time) / budget))))
+
+
+def draw_tracks(img, tracks, names=None):
+    """트랙 박스와 ID 를 이미지에 그립니다 (제자리에서 수정)."""
+    names = names or {}
+    line_width = max(round(sum(img.shape[:2]) / 2 * 0.003), 2)
+    for track in tracks:
+        x0, y0, x1, y1 = track.box.round().astype(int)
+        color = (0, 255, 0) if track.class_id == 0 else (255, 128, 0)
+        cv2.rectangle(img, (x0, y0), (x1, y1), color, line_width, cv2.LINE_AA)
+        cv2.putText(img, f"#{track.id} {names.get(track.class_id, track.class_id)}", (x0, max(y0 - 4, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, line_width / 3, color, 1, cv2.LINE_AA)
+    return img
+
+
+def run_stream(backend, source, imgsz=640, conf=0.25, iou=0.5, queue_size=8, realtime=False, detect_every=0,
+               max_interval=10, tracker=None, save_path=None, max_frames=None, padding_color=(114, 114, 114)):
+    """
+    영상 소스를 끝까지(또는 max_frames 까지) 처리합니다.
+
+    Args:
+        backend: backends.load_backend 로 만든 추론 백엔드
+        source: 동영상 경로, 스트림 URL 또는 카메라 번호
+        detect_every (int): 탐지 간격 고정 (0 이면 추론 시간에 맞춰 자동)
+        max_interval (int): 자동 탐지 간격의 최댓값
+        tracker (Tracker): 추적기 (None 이면 기본 설정)
+        save_path (str): 트랙을 그린 영상을 저장할 경로
+
+    Returns:
+        dict: 처리/탐지/버린 프레임 수, 지속 FPS, 추론 시간, 클래스별 객체 수
+    """
+    tracker = tracker or Tracker()
+    reader = FrameReader(source, queue_size, realtime)
+    skipper = AdaptiveSkipper(reader.fps, max_interval)
+    target_size = (imgsz, imgsz)
+    buffer = np.empty((1, imgsz, imgsz, 3), dtype=np.uint8)
+    writer = None
+
+    processed = detected = 0
+    latencies = []
+    last_index = -1
+    since_detect = math.inf
+    start = time.perf_counter()
+    reader.start()
+    try:
+        while True:
+            item = reader.queue.get()
+            if item is None:
+                break
+            index, frame = item
+            frame_start = time.perf_counter()
+            # 버려진 프레임만큼 트랙을 진행해서 칼만 필터의 시간 간격을 맞춤
+            for _ in range(index - last_index - 1):
+                tracker.step()
+            since_detect += index - last_index - 1
+            last_index = index
+
+            if since_detect >= (detect_every or skipper.interval):
+                t0 = time.perf_counter()
+                _, scale, padding = letterbox(frame, target_size, padding_color, out=buffer[0])
+                boxes, scores, classes = backend.predict_batch(buffer, conf, iou)[0]
+                boxes = unletterbox_boxes(boxes, scale, padding, (frame.shape[1], frame.shape[0]))
+                latencies.append(time.perf_counter() - t0)
+                tracks = tracker.step((boxes, scores, classes))
+                detected += 1
+                since_detect = 1
+                is_detect_frame = True
+            else:
+                tracks = tracker.step()
+                since_detect += 1
+                is_detect_frame = False
+            processed += 1
+
+            if save_path:
+                if writer is None:
+                    writer = cv2.VideoWriter(save_path, cv2.VideoWriter_fourcc(*"mp4v"), reader.fps,
+                                             (frame.shape[1], frame.shape[0]))
+                writer.write(draw_tracks(frame, tracks, backend.names))
+            skipper.update(time.perf_counter() - frame_start, is_detect_frame)
+            if max_frames and processed >= max_frames:
+                break
+    finally:
+        reader.stop()
+        if writer is not None:
+            writer.release()
+    wall = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    names = backend.names or {}
+    return {
+        "source_fps": round(reader.fps, 2),
+        "frames_read": reader.frames_read,
+        "frames_processed": processed,
+        "frames_detected": detected,
+        "frames_dropped": reader.dropped,
+        "sustained_fps": round(processed / wall, 2) if wall > 0 else 0.0,
+        "inference_ms": round(float(latencies_ms.mean()), 2) if len(latencies_ms) else None,
+        "inference_p90_ms": round(float(np.percentile(latencies_ms, 90)), 2) if len(latencies_ms) else None,
+        "detect_interval": detect_every or skipper.interval,
+        "counts": {names.get(c, str(c)): n for c, n in tracker.counts().items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='영상 스트림 탐지 + 추적')
+    parser.add_argument('weights', help='모델 가중치 (예: runs/detect/train15/weights/best.pt 또는 best.onnx)')
+    parser.add_argument('source', help='동영상 파일, 스트림 URL 또는 카메라 번호 (예: 0)')
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help='추론 백엔드 (기본: 확장자로 선택)')
+    parser.add_argument('--device', default='cpu', help='torch 백엔드 장치 (기본: cpu)')
+    parser.add_argument('--threads', type=int, default=None, help='onnx 백엔드 스레드 수')
+    parser.add_argument('--imgsz', type=int, default=640, help='모델 입력 크기 (기본: 640)')
+    parser.add_argument('--conf', type=float, default=0.25, help='신뢰도 기준 (기본: 0.25)')
+    parser.add_argument('--iou', type=float, default=0.5, help='NMS IoU 기준 (기본: 0.5)')
+    parser.add_argument('--queue-size', type=int, default=8, help='프레임 큐 크기 (기본: 8)')
+    parser.add_argument('--realtime', action='store_true', help='동영상 파일을 원래 FPS 로 재생하는 스트림처럼 처리')
+    parser.add_argument('--detect-every', type=int, default=0, help='탐지 간격 고정 (기본: 0, 추론 시간에 맞춰 자동)')
+    parser.add_argument('--max-interval', type=int, default=10, help='자동 탐지 간격 최댓값 (기본: 10)')
+    parser.add_argument('--track-iou', type=float, default=0.3, help='트랙 매칭 IoU 기준 (기본: 0.3)')
+    parser.add_argument('--max-misses', type=int, default=3, help='연속으로 놓치면 트랙을 지울 탐지 횟수 (기본: 3)')
+    parser.add_argument('--min-hits', type=int, default=2, help='트랙 확정에 필요한 매칭 수 (기본: 2)')
+    parser.add_argument('--save', default=None, help='트랙을 그린 영상 저장 경로 (.mp4)')
+    parser.add_argument('--max-frames', type=int, default=None, help='처리할 최대 프레임 수')
+
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    backend = load_backend(args.weights, args.backend, args.device, args.threads)
+    result = run_stream(backend, source, args.imgsz, args.conf, args.iou, args.queue_size, args.realtime,
+                        args.detect_every, args.max_interval,
+                        Tracker(args.track_iou, args.max_misses, args.min_hits), args.save, args.max_frames)
+
+    print(f"프레임: 읽음 {result['frames_read']}, 처리 {result['frames_processed']}, "
+          f"탐지 {result['frames_detected']}, 버림 {result['frames_dropped']}")
+    print(f"지속 FPS {result['sustained_fps']} (소스 {result['source_fps']}), 추론 {result['inference_ms']}ms "
+          f"(p90 {result['inference_p90_ms']}ms), 탐지 간격 {result['detect_interval']} 프레임")
+    print(f"객체 수: {result['counts']}")
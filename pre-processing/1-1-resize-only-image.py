@@ -1,29 +1,31 @@
 import os
 import cv2
 import shutil
+from dataset_scan import iter_files
+from image_decode import imread_for_letterbox
+from letterbox_ops import letterbox
+from image_encode import output_path_for, needs_reencode, write_image, format_bytes
+from resize_manifest import (
+    MANIFEST_NAME, load_manifest, save_manifest, is_up_to_date, record_entry, prune_manifest
+)
 
-def letterbox(img, target_size=(640, 640), padding_color=(114, 114, 114)):
-    h, w = img.shape[:2]
-    scale = min(target_size[0] / h, target_size[1] / w)
-    new_w, new_h = int(w * scale), int(h * scale)
+def process_images(src_folder, target_size=(640, 640), padding_color=(114, 114, 114), incremental=False,
+                   reduced_decode=False, output_format=None, quality=None, jpeg_sampling=None):
+    """
+    폴더 내 이미지를 letterbox 방식으로 target_size에 맞춰 변환합니다.
 
-    resized_img = cv2.resize(img, (new_w, new_h))
-
-    # padding 계산
-    pad_w = target_size[1] - new_w
-    pad_h = target_size[0] - new_h
-    top, bottom = pad_h // 2, pad_h - pad_h // 2
-    left, right = pad_w // 2, pad_w - pad_w // 2
-
-    # padding 추가 (Letterbox 방식)
-    img_padded = cv2.copyMakeBorder(
-        resized_img, top, bottom, left, right,
-        cv2.BORDER_CONSTANT, value=padding_color
-    )
-
-    return img_padded
-
-def process_images(src_folder):
+    Args:
+        src_folder: 원본 이미지 폴더
+        target_size: 결과 이미지 크기 (height, width)
+        padding_color: 패딩 색상 (B, G, R)
+        incremental: True면 결과 폴더의 매니페스트를 이용해 바뀐 이미지만 처리하고,
+                     원본이 사라진 결과 이미지는 삭제합니다.
+        reduced_decode: True면 큰 JPEG를 1/2, 1/4, 1/8 해상도로 바로 디코딩한 뒤 리사이즈합니다.
+                        빠르고 메모리를 적게 쓰지만 전체 해상도 디코딩과 픽셀 값이 조금 다릅니다.
+        output_format: 저장 형식 (None=원본 확장자, "jpg", "png", "webp", "npy")
+        quality: JPEG/WebP 품질(0-100) 또는 PNG 압축 레벨(0-9), None이면 OpenCV 기본값
+        jpeg_sampling: JPEG 크로마 서브샘플링 ("444", "422", "420"), None이면 기본값
+    """
     supported_formats = (".jpg", ".jpeg", ".png", ".bmp")
     
     if not os.path.exists(src_folder):
@@ -34,30 +36,75 @@ def process_images(src_folder):
     dest_folder = f"{os.path.basename(src_folder)}_result"
     os.makedirs(dest_folder, exist_ok=True)
 
-    img_files = [f for f in os.listdir(src_folder) if f.lower().endswith(supported_formats)]
+    # 증분 처리용 매니페스트
+    manifest_path = os.path.join(dest_folder, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if incremental else None
+    params = {"target_size": list(target_size), "padding_color": list(padding_color),
+              "reduced_decode": reduced_decode, "output_format": output_format,
+              "quality": quality, "jpeg_sampling": jpeg_sampling}
+    unchanged_count = 0
+    bytes_written = 0
+    seen_files = set()
+
+    # 목록을 미리 만들지 않고 디렉토리를 읽으면서 바로 처리
+    for entry in iter_files(src_folder, supported_formats):
+        img_name = entry.name
+        img_path = entry.path
+        if incremental:
+            seen_files.add(img_name)
+        out_path = output_path_for(os.path.join(dest_folder, img_name), output_format)
 
-    for img_name in img_files:
-        img_path = os.path.join(src_folder, img_name)
-        img = cv2.imread(img_path)
+        if incremental and is_up_to_date(manifest, img_name, [img_path], params, [out_path]):
+            unchanged_count += 1
+            continue
+
+        if reduced_decode:
+            img, original_size, _ = imread_for_letterbox(img_path, target_size)
+        else:
+            img = cv2.imread(img_path)
 
         if img is None:
             print(f"[WARN] '{img_name}' 파일은 이미지가 아닙니다. 건너뜁니다.")
             continue
 
-        h, w = img.shape[:2]
+        if reduced_decode:
+            w, h = original_size
+        else:
+            h, w = img.shape[:2]
 
-        # 이미지가 이미 640×640이면 그냥 복사
-        if (w, h) == (640, 640):
-            shutil.copy(img_path, os.path.join(dest_folder, img_name))
+        # 이미지가 이미 target_size이고 저장 형식이 같으면 재인코딩 없이 그냥 복사
+        if (h, w) == tuple(target_size) and not needs_reencode(img_path, output_format, quality, jpeg_sampling):
+            shutil.copy(img_path, out_path)
+            bytes_written += os.path.getsize(out_path)
             print(f"[COPY] '{img_name}' 크기 동일, 복사 완료.")
         else:
-            img_processed = letterbox(img, (640, 640))
-            cv2.imwrite(os.path.join(dest_folder, img_name), img_processed)
+            img_processed, _, _ = letterbox(img, target_size, padding_color)
+            try:
+                out_path, size = write_image(out_path, img_processed, output_format, quality, jpeg_sampling)
+            except OSError as e:
+                print(f"[WARN] {e}")
+                continue
+            bytes_written += size
             print(f"[SAVE] '{img_name}' 변환 후 저장 완료 (원본: {w}×{h}).")
 
+        if incremental:
+            record_entry(manifest, img_name, [img_path], params, [out_path])
+
+    if incremental:
+        for removed_path in prune_manifest(manifest, seen_files):
+            print(f"[DELETE] 원본이 없는 결과 파일 삭제: '{removed_path}'")
+        save_manifest(manifest_path, manifest)
+        print(f"[INFO] 변경 없는 이미지 {unchanged_count}개를 건너뛰었습니다.")
+
     print(f"\n✅ 이미지 처리가 완료되었습니다. 결과 폴더: '{dest_folder}'")
+    print(f"저장된 용량: {format_bytes(bytes_written)}")
 
 # 사용 예시:
 if __name__ == "__main__":
     source_folder = "cups"  # << 폴더 이름을 지정하세요.
-    process_images(source_folder)
\ No newline at end of file
+    incremental = False  # True면 이전 실행 이후 바뀐 이미지만 다시 처리
+    reduced_decode = False  # True면 큰 JPEG를 축소 해상도로 디코딩 (속도/메모리 절약)
+    output_format = None  # 저장 형식: None(원본 확장자), "jpg", "png", "webp", "npy"
+    quality = None  # JPEG/WebP 품질(0-100) 또는 PNG 압축 레벨(0-9)
+    process_images(source_folder, incremental=incremental, reduced_decode=reduced_decode,
+                   output_format=output_format, quality=quality)
\ No newline at end of file
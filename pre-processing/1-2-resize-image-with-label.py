@@ -2,84 +2,187 @@ import os
 import cv2
 import shutil
 import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import list_file_names
+from image_decode import imread_for_letterbox
+from letterbox_ops import letterbox
+from label_store import parse_label_text
+from image_encode import output_path_for, needs_reencode, write_image, format_bytes
+from resize_manifest import (
+    MANIFEST_NAME, load_manifest, save_manifest, is_up_to_date, record_entry, drop_entry, prune_manifest
+)
 
-def letterbox(img, target_size=(640, 640), padding_color=(114, 114, 114)):
+def convert_yolo_coordinates_batch(labels, original_size, scale, padding, target_size=(640, 640)):
     """
-    Resize and pad image to target size using letterbox method
+    Convert YOLO label coordinates to match the letterboxed image, for an (N, 5) label array
+
+    original_size, scale and padding may be scalars (one image) or arrays of
+    shape (N,) (rows from many images), so a whole dataset can be converted
+    in a single call. Pixel coordinates are scaled, shifted by the padding,
+    normalized to target_size and clamped to 0-1.
+
+    Args:
+        labels: (N, 5) float array [class_id, center_x, center_y, width, height]
+        original_size: (width, height) of original image(s)
+        scale: scale factor(s) used in resizing
+        padding: (top, left) padding value(s)
+        target_size: (height, width) of letterboxed image
+
     Returns:
-        - padded image
-        - scale factor
-        - padding information (top, left)
+        New (N, 5) float array
     """
-    h, w = img.shape[:2]
-    scale = min(target_size[0] / h, target_size[1] / w)
-    new_w, new_h = int(w * scale), int(h * scale)
+    labels = np.asarray(labels, dtype=np.float64).reshape(-1, 5)
+    orig_w, orig_h = original_size
+    top, left = padding
+    target_h, target_w = target_size
 
-    resized_img = cv2.resize(img, (new_w, new_h))
+    out = np.empty_like(labels)
+    out[:, 0] = labels[:, 0]
+    out[:, 1] = (labels[:, 1] * orig_w * scale + left) / target_w
+    out[:, 2] = (labels[:, 2] * orig_h * scale + top) / target_h
+    out[:, 3] = labels[:, 3] * orig_w * scale / target_w
+    out[:, 4] = labels[:, 4] * orig_h * scale / target_h
 
-    # Calculate padding
-    pad_w = target_size[1] - new_w
-    pad_h = target_size[0] - new_h
-    top, bottom = pad_h // 2, pad_h - pad_h // 2
-    left, right = pad_w // 2, pad_w - pad_w // 2
+    # Clamp values to valid range (0-1); "+ 0.0" turns -0.0 into 0.0 like max(0, ...)
+    out[:, 1:] = np.clip(out[:, 1:], 0, 1) + 0.0
 
-    # Add padding (Letterbox method)
-    img_padded = cv2.copyMakeBorder(
-        resized_img, top, bottom, left, right,
-        cv2.BORDER_CONSTANT, value=padding_color
-    )
+    return out
 
-    return img_padded, scale, (top, left)
+def _bad_line_message(line):
+    """Warning message for a label line that parse_label_text skipped"""
+    try:
+        [float(v) for v in line.split()]
+    except ValueError:
+        return f"[WARN] 라벨 형식 오류 (숫자 변환 실패): {line}"
+    return f"[WARN] 라벨 형식 오류 (항목 수 불일치): {line}"
 
-def convert_yolo_coordinates(bbox, original_size, scale, padding):
+def load_yolo_labels(label_file):
     """
-    Convert YOLO format bounding box coordinates to match resized image
-    
-    Args:
-        bbox: YOLO format bounding box [class_id, center_x, center_y, width, height]
-        original_size: (width, height) of original image
-        scale: scale factor used in resizing
-        padding: (top, left) padding values
-    
+    Load a YOLO label file into an (N, 5) float array (label_store.parse_label_text)
+
     Returns:
-        Updated YOLO format bounding box
+        - (N, 5) float array
+        - list of warning messages for skipped lines
     """
-    class_id, center_x, center_y, width, height = bbox
-    
-    # Original pixel coordinates
-    orig_w, orig_h = original_size
-    x_center_px = center_x * orig_w
-    y_center_px = center_y * orig_h
-    width_px = width * orig_w
-    height_px = height * orig_h
-    
-    # Apply scaling
-    x_center_px *= scale
-    y_center_px *= scale
-    width_px *= scale
-    height_px *= scale
-    
-    # Apply padding
-    top, left = padding
-    x_center_px += left
-    y_center_px += top
-    
-    # Convert back to normalized coordinates (0-1) for 640x640
-    center_x_new = x_center_px / 640
-    center_y_new = y_center_px / 640
-    width_new = width_px / 640
-    height_new = height_px / 640
-    
-    # Clamp values to valid range (0-1)
-    center_x_new = max(0, min(1, center_x_new))
-    center_y_new = max(0, min(1, center_y_new))
-    width_new = max(0, min(1, width_new))
-    height_new = max(0, min(1, height_new))
-    
-    return [class_id, center_x_new, center_y_new, width_new, height_new]
+    with open(label_file, 'r') as f:
+        labels, bad_lines = parse_label_text(f.read())
+    return labels, [_bad_line_message(line) for line in bad_lines]
+
+def format_yolo_labels(labels):
+    """Format an (N, 5) label array as YOLO text (no trailing newline)"""
+    line_format = "%d %.6f %.6f %.6f %.6f"
+    return '\n'.join(map(line_format.__mod__, map(tuple, labels.tolist())))
+
+def save_yolo_labels(label_file, labels):
+    """Write an (N, 5) label array to a YOLO label file in one write"""
+    with open(label_file, 'w') as f:
+        f.write(format_yolo_labels(labels))
+
+def process_single_image(img_name, images_folder, labels_folder, images_result_folder, labels_result_folder,
+                         target_size=(640, 640), padding_color=(114, 114, 114), reduced_decode=False,
+                         output_format=None, quality=None, jpeg_sampling=None):
+    """
+    Process one image and its label file
+
+    Runs in a worker process when parallel mode is used, so it must not print
+    directly. Messages are returned and printed by the parent in input order.
+
+    Returns:
+        - status ('copy', 'save' or 'skip')
+        - list of log messages for this file
+        - number of image and label bytes written
+    """
+    messages = []
+
+    img_path = os.path.join(images_folder, img_name)
+    if reduced_decode:
+        # Decode large JPEGs directly at 1/2, 1/4 or 1/8 scale
+        img, original_size, _ = imread_for_letterbox(img_path, target_size)
+    else:
+        img = cv2.imread(img_path)
+
+    if img is None:
+        messages.append(f"[WARN] '{img_name}' 파일은 이미지가 아닙니다. 건너뜁니다.")
+        return 'skip', messages, 0
+
+    # Get base name without extension for finding label file
+    base_name = os.path.splitext(img_name)[0]
+    label_file = os.path.join(labels_folder, base_name + ".txt")
 
-def process_dataset(images_folder, labels_folder):
-    """Process both images and labels for YOLO dataset"""
+    # Check if label file exists
+    if not os.path.exists(label_file):
+        messages.append(f"[WARN] '{base_name}.txt' 라벨 파일이 없습니다. 건너뜁니다.")
+        return 'skip', messages, 0
+
+    if reduced_decode:
+        w, h = original_size
+    else:
+        h, w = img.shape[:2]
+
+    out_img_path = output_path_for(os.path.join(images_result_folder, img_name), output_format)
+    out_label_path = os.path.join(labels_result_folder, base_name + ".txt")
+
+    # If image is already target size and no re-encode is requested, just copy both files
+    if (h, w) == tuple(target_size) and not needs_reencode(img_path, output_format, quality, jpeg_sampling):
+        shutil.copy(img_path, out_img_path)
+        shutil.copy(label_file, out_label_path)
+        messages.append(f"[COPY] '{img_name}' 및 라벨 파일 크기 동일, 복사 완료.")
+        return 'copy', messages, os.path.getsize(out_img_path) + os.path.getsize(out_label_path)
+
+    # Process image with letterbox method
+    img_processed, scale, padding = letterbox(img, target_size, padding_color)
+
+    # Save processed image
+    try:
+        out_img_path, bytes_written = write_image(out_img_path, img_processed, output_format, quality, jpeg_sampling)
+    except OSError as e:
+        messages.append(f"[WARN] {e}")
+        return 'skip', messages, 0
+
+    # Process label file (whole file as one array)
+    labels, label_messages = load_yolo_labels(label_file)
+    messages.extend(label_messages)
+
+    # Convert coordinates for resized image. A reduced decode covers the same area as the
+    # original, so normalized labels map through the decoded size and its letterbox scale.
+    decoded_size = (img.shape[1], img.shape[0])
+    new_labels = convert_yolo_coordinates_batch(labels, decoded_size, scale, padding, target_size)
+
+    # Save new label file
+    save_yolo_labels(out_label_path, new_labels)
+    bytes_written += os.path.getsize(out_label_path)
+
+    messages.append(f"[SAVE] '{img_name}' 및 라벨 변환 후 저장 완료 (원본: {w}×{h}).")
+    return 'save', messages, bytes_written
+
+def _process_single_image_args(args):
+    """Unpack helper for executor.map (must be top-level to be picklable)"""
+    return process_single_image(*args)
+
+def process_dataset(images_folder, labels_folder, workers=1, chunksize=None, target_size=(640, 640),
+                    padding_color=(114, 114, 114), incremental=False, reduced_decode=False,
+                    output_format=None, quality=None, jpeg_sampling=None):
+    """
+    Process both images and labels for YOLO dataset
+
+    Args:
+        images_folder: source image folder
+        labels_folder: source label folder
+        workers: number of worker processes (1 = sequential, None = os.cpu_count())
+        chunksize: number of files sent to a worker at once (None = auto)
+        target_size: (height, width) of letterboxed output
+        padding_color: letterbox padding color (B, G, R)
+        incremental: only process new/changed image-label pairs using the manifest
+                     in the image result folder, and delete outputs whose source is gone
+                     or that were skipped this run (e.g. label file deleted)
+        reduced_decode: decode large JPEGs at reduced resolution (IMREAD_REDUCED_COLOR_2/4/8)
+                        before the final resize. Faster and lighter, but pixels differ
+                        slightly from a full-resolution decode.
+        output_format: None (keep source extension), "jpg", "png", "webp" or "npy" (raw uint8)
+        quality: JPEG/WebP quality (0-100) or PNG compression level (0-9), None = OpenCV default
+        jpeg_sampling: JPEG chroma subsampling ("444", "422", "420"), None = OpenCV default
+    """
     supported_formats = (".jpg", ".jpeg", ".png", ".bmp")
     
     # Check if folders exist
@@ -99,71 +202,84 @@ def process_dataset(images_folder, labels_folder):
     os.makedirs(labels_result_folder, exist_ok=True)
     
     # Get all image files
-    img_files = [f for f in os.listdir(images_folder) if f.lower().endswith(supported_formats)]
-    
-    for img_name in img_files:
-        img_path = os.path.join(images_folder, img_name)
-        img = cv2.imread(img_path)
-        
-        if img is None:
-            print(f"[WARN] '{img_name}' 파일은 이미지가 아닙니다. 건너뜁니다.")
-            continue
-        
-        # Get base name without extension for finding label file
+    img_files = list_file_names(images_folder, supported_formats)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Manifest for incremental mode (stored in the image result folder)
+    manifest_path = os.path.join(images_result_folder, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if incremental else None
+    params = {"target_size": list(target_size), "padding_color": list(padding_color),
+              "reduced_decode": reduced_decode, "output_format": output_format,
+              "quality": quality, "jpeg_sampling": jpeg_sampling}
+
+    def entry_paths(img_name):
         base_name = os.path.splitext(img_name)[0]
-        label_file = os.path.join(labels_folder, base_name + ".txt")
-        
-        # Check if label file exists
-        if not os.path.exists(label_file):
-            print(f"[WARN] '{base_name}.txt' 라벨 파일이 없습니다. 건너뜁니다.")
-            continue
-        
-        h, w = img.shape[:2]
-        
-        # If image is already 640x640, just copy both files
-        if (w, h) == (640, 640):
-            shutil.copy(img_path, os.path.join(images_result_folder, img_name))
-            shutil.copy(label_file, os.path.join(labels_result_folder, base_name + ".txt"))
-            print(f"[COPY] '{img_name}' 및 라벨 파일 크기 동일, 복사 완료.")
-        else:
-            # Process image with letterbox method
-            img_processed, scale, padding = letterbox(img, (640, 640))
-            
-            # Save processed image
-            cv2.imwrite(os.path.join(images_result_folder, img_name), img_processed)
-            
-            # Process label file
-            with open(label_file, 'r') as f:
-                label_lines = f.readlines()
-            
-            new_label_lines = []
-            for line in label_lines:
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                    
-                # Parse YOLO format: class_id center_x center_y width height
-                try:
-                    values = list(map(float, line.split()))
-                    if len(values) != 5:
-                        print(f"[WARN] 라벨 형식 오류 (항목 수 불일치): {line}")
-                        continue
-                        
-                    # Convert coordinates for resized image
-                    new_values = convert_yolo_coordinates(values, (w, h), scale, padding)
-                    new_line = f"{int(new_values[0])} {new_values[1]:.6f} {new_values[2]:.6f} {new_values[3]:.6f} {new_values[4]:.6f}"
-                    new_label_lines.append(new_line)
-                except ValueError:
-                    print(f"[WARN] 라벨 형식 오류 (숫자 변환 실패): {line}")
-                    continue
-            
-            # Save new label file
-            with open(os.path.join(labels_result_folder, base_name + ".txt"), 'w') as f:
-                f.write('\n'.join(new_label_lines))
-            
-            print(f"[SAVE] '{img_name}' 및 라벨 변환 후 저장 완료 (원본: {w}×{h}).")
+        sources = [os.path.join(images_folder, img_name), os.path.join(labels_folder, base_name + ".txt")]
+        outputs = [output_path_for(os.path.join(images_result_folder, img_name), output_format),
+                   os.path.join(labels_result_folder, base_name + ".txt")]
+        return sources, outputs
+
+    counts = Counter()
+    pending_files = []
+    for img_name in img_files:
+        if incremental:
+            sources, outputs = entry_paths(img_name)
+            if is_up_to_date(manifest, img_name, sources, params, outputs):
+                counts['unchanged'] += 1
+                continue
+        pending_files.append(img_name)
+
+    tasks = [
+        (img_name, images_folder, labels_folder, images_result_folder, labels_result_folder,
+         target_size, padding_color, reduced_decode, output_format, quality, jpeg_sampling)
+        for img_name in pending_files
+    ]
+
+    if workers > 1 and len(tasks) > 1:
+        # Large chunks amortize IPC overhead; keep ~4 chunks per worker for load balancing
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+        print(f"[INFO] {workers}개 프로세스로 병렬 처리합니다 (chunksize={chunksize}).")
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_process_single_image_args, tasks, chunksize=chunksize)
+    else:
+        executor = None
+        results = map(_process_single_image_args, tasks)
+
+    # executor.map yields results in input order, so logs stay deterministic
+    try:
+        for img_name, (status, messages, bytes_written) in zip(pending_files, results):
+            counts[status] += 1
+            counts['bytes'] += bytes_written
+            for message in messages:
+                print(message)
+            if not incremental:
+                continue
+            sources, outputs = entry_paths(img_name)
+            if status == 'skip':
+                # Outputs from an earlier run (e.g. the label was deleted since) must not stay in the dataset
+                for removed_path in drop_entry(manifest, img_name, outputs):
+                    print(f"[DELETE] 건너뛴 파일의 이전 결과 삭제: '{removed_path}'")
+            else:
+                record_entry(manifest, img_name, sources, params, outputs)
+
+        if incremental:
+            for removed_path in prune_manifest(manifest, set(img_files)):
+                print(f"[DELETE] 원본이 없는 결과 파일 삭제: '{removed_path}'")
+    finally:
+        # Save even when interrupted so finished entries are not reprocessed next time
+        try:
+            if executor is not None:
+                executor.shutdown()
+        finally:
+            if incremental:
+                save_manifest(manifest_path, manifest)
     
     print(f"\n✅ 데이터셋 처리가 완료되었습니다.")
+    print(f"변환: {counts['save']}개, 복사: {counts['copy']}개, 건너뜀: {counts['skip']}개, 변경 없음: {counts['unchanged']}개")
+    print(f"저장된 용량: {format_bytes(counts['bytes'])}")
     print(f"결과 이미지 폴더: '{images_result_folder}'")
     print(f"결과 라벨 폴더: '{labels_result_folder}'")
 
@@ -171,4 +287,10 @@ def process_dataset(images_folder, labels_folder):
 if __name__ == "__main__":
     images_folder = "images"  # 이미지 폴더 경로
     labels_folder = "labels"  # 라벨 폴더 경로
-    process_dataset(images_folder, labels_folder)
\ No newline at end of file
+    workers = os.cpu_count()  # 병렬 처리 프로세스 수 (1이면 순차 처리)
+    incremental = False  # True면 이전 실행 이후 바뀐 이미지/라벨만 다시 처리
+    reduced_decode = False  # True면 큰 JPEG를 축소 해상도로 디코딩 (속도/메모리 절약)
+    output_format = None  # 저장 형식: None(원본 확장자), "jpg", "png", "webp", "npy"
+    quality = None  # JPEG/WebP 품질(0-100) 또는 PNG 압축 레벨(0-9)
+    process_dataset(images_folder, labels_folder, workers=workers, incremental=incremental,
+                    reduced_decode=reduced_decode, output_format=output_format, quality=quality)
\ No newline at end of file
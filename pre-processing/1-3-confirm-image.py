@@ -1,12 +1,41 @@
 """
 1-2 코드사용해서 변환했을 때, 확인용으로 사용.
+
+visualize_bounding_boxes: matplotlib 으로 이미지마다 그림 저장 (느림, 소량 확인용)
+render_bounding_boxes: OpenCV 로 배열에 직접 그리고 여러 장을 모자이크로 묶음 (빠름, 대량 확인용)
 """
 
 import os
 import cv2
 import numpy as np
 import random
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import list_file_names
+
+# Ultralytics 기본 팔레트 (클래스 ID 순서로 고정 색상 사용)
+PALETTE_HEX = (
+    "FF3838", "FF9D97", "FF701F", "FFB21D", "CFD231", "48F90A", "92CC17", "3DDB86", "1A9334", "00D4BB",
+    "2C99A8", "00C2FF", "344593", "6473FF", "0018EC", "8438FF", "520085", "CB38FF", "FF95C8", "FF37C7",
+)
+
+def class_color(class_id):
+    """클래스 ID 에 대한 고정 BGR 색상을 반환합니다 (실행할 때마다 같은 색)."""
+    h = PALETTE_HEX[int(class_id) % len(PALETTE_HEX)]
+    return int(h[4:6], 16), int(h[2:4], 16), int(h[0:2], 16)
+
+def load_class_names(yaml_path="custom_data.yaml"):
+    """
+    데이터셋 YAML 의 names 항목을 {클래스 ID: 이름} 으로 읽습니다. 파일이 없으면 빈 딕셔너리.
+    """
+    if not os.path.exists(yaml_path):
+        return {}
+    import yaml  # ultralytics 설치 시 함께 설치됨
+
+    with open(yaml_path, 'r', encoding='utf-8') as f:
+        names = (yaml.safe_load(f) or {}).get('names', {})
+    if isinstance(names, list):
+        names = dict(enumerate(names))
+    return {int(k): str(v) for k, v in names.items()}
 
 def visualize_bounding_boxes(images_folder, labels_folder, output_folder, num_samples=10):
     """
@@ -18,6 +47,8 @@ def visualize_bounding_boxes(images_folder, labels_folder, output_folder, num_sa
         output_folder: 시각화 결과를 저장할 폴더 경로
         num_samples: 시각화할 이미지 샘플 수
     """
+    import matplotlib.pyplot as plt
+
     # 결과 폴더 생성
     os.makedirs(output_folder, exist_ok=True)
     
@@ -25,7 +56,7 @@ def visualize_bounding_boxes(images_folder, labels_folder, output_folder, num_sa
     supported_formats = (".jpg", ".jpeg", ".png", ".bmp")
     
     # 이미지 파일 목록 가져오기
-    img_files = [f for f in os.listdir(images_folder) if f.lower().endswith(supported_formats)]
+    img_files = list_file_names(images_folder, supported_formats)
     
     # 샘플 수 제한
     if len(img_files) > num_samples:
@@ -123,6 +154,182 @@ def visualize_bounding_boxes(images_folder, labels_folder, output_folder, num_sa
     
     return colors  # 클래스별 색상 정보 반환
 
+def draw_boxes(img, labels, class_names=None, line_width=None):
+    """
+    YOLO 라벨 배열 (N, 5) 의 바운딩 박스를 이미지 배열에 직접 그립니다.
+
+    Args:
+        img: BGR 이미지 (제자리에서 수정됨)
+        labels: (N, 5) [class_id, center_x, center_y, width, height] 정규화 좌표
+        class_names: {클래스 ID: 이름}
+        line_width: 선 두께 (None이면 이미지 크기에 비례)
+    """
+    class_names = class_names or {}
+    height, width = img.shape[:2]
+    line_width = line_width or max(round((height + width) / 2 * 0.003), 2)
+    font_scale = line_width / 3
+
+    # 정규화 좌표 -> 픽셀 좌표 (한 번에 계산)
+    boxes = np.asarray(labels, dtype=np.float64).reshape(-1, 5)
+    x1 = (boxes[:, 1] - boxes[:, 3] / 2) * width
+    y1 = (boxes[:, 2] - boxes[:, 4] / 2) * height
+    x2 = (boxes[:, 1] + boxes[:, 3] / 2) * width
+    y2 = (boxes[:, 2] + boxes[:, 4] / 2) * height
+    corners = np.stack([x1, y1, x2, y2], axis=1).round().astype(int)
+
+    for class_id, (left, top, right, bottom) in zip(boxes[:, 0].astype(int), corners):
+        color = class_color(class_id)
+        cv2.rectangle(img, (left, top), (right, bottom), color, line_width, cv2.LINE_AA)
+
+        # 클래스 이름 표시
+        text = class_names.get(class_id, f"Class {class_id}")
+        (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1)
+        text_top = top - text_h - 4 if top - text_h - 4 >= 0 else top
+        cv2.rectangle(img, (left, text_top), (left + text_w + 2, text_top + text_h + 4), color, -1)
+        cv2.putText(img, text, (left + 1, text_top + text_h + 1), cv2.FONT_HERSHEY_SIMPLEX,
+                    font_scale, (255, 255, 255), 1, cv2.LINE_AA)
+    return img
+
+def render_sample(img_path, label_path, class_names=None, output_path=None, tile_size=None):
+    """
+    이미지 하나에 바운딩 박스를 그려 저장하고, 모자이크용 타일을 반환합니다.
+    병렬 실행 시 워커 프로세스에서 실행되므로 출력 대신 메시지를 반환합니다.
+
+    Returns:
+        tuple: (성공 여부, 타일 이미지 또는 None, 메시지 리스트)
+    """
+    img_name = os.path.basename(img_path)
+    img = cv2.imread(img_path)
+    if img is None:
+        return False, None, [f"[WARN] '{img_name}' 이미지를 읽을 수 없습니다. 건너뜁니다."]
+    if not os.path.exists(label_path):
+        return False, None, [f"[WARN] '{os.path.basename(label_path)}' 라벨 파일이 없습니다. 건너뜁니다."]
+
+    messages = []
+    rows = []
+    with open(label_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = [float(v) for v in line.split()]
+            except ValueError:
+                values = []
+            if len(values) != 5:
+                messages.append(f"[WARN] '{os.path.basename(label_path)}'의 라벨 형식이 잘못되었습니다: {line}")
+                continue
+            rows.append(values)
+
+    draw_boxes(img, rows, class_names)
+    cv2.putText(img, img_name, (5, img.shape[0] - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+
+    if output_path:
+        cv2.imwrite(output_path, img)
+
+    tile = None
+    if tile_size:
+        # 비율을 유지하며 타일 크기에 맞춤
+        scale = tile_size / max(img.shape[:2])
+        tile = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+    return True, tile, messages
+
+def _render_sample_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return render_sample(*args)
+
+def make_mosaic(tiles, grid, tile_size, background=(114, 114, 114)):
+    """타일 이미지들을 grid (rows, cols) 격자 하나로 붙입니다."""
+    rows, cols = grid
+    mosaic = np.full((rows * tile_size, cols * tile_size, 3), background, dtype=np.uint8)
+    for i, tile in enumerate(tiles[:rows * cols]):
+        r, c = divmod(i, cols)
+        h, w = tile.shape[:2]
+        mosaic[r * tile_size:r * tile_size + h, c * tile_size:c * tile_size + w] = tile
+    return mosaic
+
+def render_bounding_boxes(images_folder, labels_folder, output_folder, num_samples=None, class_names=None,
+                          workers=1, save_individual=True, mosaic_grid=(4, 4), tile_size=320, seed=0):
+    """
+    OpenCV 로 바운딩 박스를 빠르게 그리고, 여러 장을 모자이크 이미지로 묶어 저장합니다.
+    (Ultralytics 의 val_batch0_labels.jpg 와 비슷한 형태)
+
+    Args:
+        images_folder: 변환된 이미지가 있는 폴더 경로
+        labels_folder: 변환된 라벨이 있는 폴더 경로
+        output_folder: 시각화 결과를 저장할 폴더 경로
+        num_samples: 시각화할 이미지 샘플 수 (None이면 전체)
+        class_names: {클래스 ID: 이름} (None이면 custom_data.yaml 에서 읽음)
+        workers: 병렬 처리 프로세스 수
+        save_individual: 이미지별 결과도 저장할지 여부
+        mosaic_grid: 모자이크 한 장의 (행, 열) 수. None이면 모자이크를 만들지 않음
+        tile_size: 모자이크 타일 한 칸의 크기
+        seed: 샘플링 시드 (같은 시드면 같은 샘플)
+
+    Returns:
+        int: 시각화한 이미지 수
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    if class_names is None:
+        class_names = load_class_names()
+
+    supported_formats = (".jpg", ".jpeg", ".png", ".bmp")
+    img_files = list_file_names(images_folder, supported_formats, sort=True)
+    if num_samples is not None and len(img_files) > num_samples:
+        img_files = sorted(random.Random(seed).sample(img_files, num_samples))
+
+    print(f"총 {len(img_files)}개 이미지에 대한 바운딩 박스를 시각화합니다.")
+
+    tasks = []
+    for img_name in img_files:
+        base_name = os.path.splitext(img_name)[0]
+        tasks.append((
+            os.path.join(images_folder, img_name),
+            os.path.join(labels_folder, base_name + ".txt"),
+            class_names,
+            os.path.join(output_folder, f"bbox_{base_name}.jpg") if save_individual else None,
+            tile_size if mosaic_grid else None,
+        ))
+
+    if workers > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_render_sample_args, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    else:
+        executor = None
+        results = map(_render_sample_args, tasks)
+
+    rendered = 0
+    tiles = []
+    mosaic_count = 0
+    per_mosaic = mosaic_grid[0] * mosaic_grid[1] if mosaic_grid else 0
+    try:
+        for ok, tile, messages in results:
+            for message in messages:
+                print(message)
+            if not ok:
+                continue
+            rendered += 1
+            if tile is not None:
+                tiles.append(tile)
+                # 한 장이 채워지면 바로 저장해서 메모리를 일정하게 유지
+                if len(tiles) == per_mosaic:
+                    cv2.imwrite(os.path.join(output_folder, f"mosaic_{mosaic_count:04d}.jpg"),
+                                make_mosaic(tiles, mosaic_grid, tile_size))
+                    mosaic_count += 1
+                    tiles = []
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if tiles:
+        cv2.imwrite(os.path.join(output_folder, f"mosaic_{mosaic_count:04d}.jpg"),
+                    make_mosaic(tiles, mosaic_grid, tile_size))
+        mosaic_count += 1
+
+    print(f"\n✅ 바운딩 박스 시각화가 완료되었습니다. {rendered}개 이미지, 모자이크 {mosaic_count}장. "
+          f"결과 폴더: '{output_folder}'")
+    return rendered
+
 # 사용 예시
 if __name__ == "__main__":
     # 폴더 경로 설정
@@ -130,15 +337,27 @@ if __name__ == "__main__":
     labels_result_folder = "labels_result"  # 변환된 라벨 폴더
     visualization_folder = "bbox_visualization"  # 시각화 결과 저장 폴더
     
-    # 바운딩 박스 시각화 실행 (상위 10개 샘플)
-    class_colors = visualize_bounding_boxes(
-        images_result_folder, 
-        labels_result_folder, 
-        visualization_folder, 
-        num_samples=10
-    )
+    # True면 OpenCV 로 전체 이미지를 빠르게 그리고 모자이크로 묶음 (대량 확인용)
+    fast_mode = False
     
-    # 사용된 클래스 및 색상 정보 출력
-    print("\n사용된 클래스 ID와 색상 정보:")
-    for class_id, color in class_colors.items():
-        print(f"클래스 ID {class_id}: RGB{color}")
\ No newline at end of file
+    if fast_mode:
+        render_bounding_boxes(
+            images_result_folder,
+            labels_result_folder,
+            visualization_folder,
+            num_samples=None,
+            workers=os.cpu_count() or 1,
+        )
+    else:
+        # 바운딩 박스 시각화 실행 (상위 10개 샘플)
+        class_colors = visualize_bounding_boxes(
+            images_result_folder, 
+            labels_result_folder, 
+            visualization_folder, 
+            num_samples=10
+        )
+        
+        # 사용된 클래스 및 색상 정보 출력
+        print("\n사용된 클래스 ID와 색상 정보:")
+        for class_id, color in class_colors.items():
+            print(f"클래스 ID {class_id}: RGB{color}")
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+1-2 코드로 변환한 결과를 사람이 보지 않고 숫자로 검증.
+
+원본/결과 라벨 쌍마다 letterbox scale 과 padding 으로 기대 좌표를 다시 계산해서
+결과 라벨과 비교하고, 아래 항목을 찾아 보고합니다.
+
+    - mismatch   : 기대 좌표와 결과 좌표 차이가 tolerance 를 넘는 박스
+    - count      : 원본과 결과의 박스 수가 다른 파일
+    - size       : 결과 이미지 크기가 target_size 가 아닌 파일
+    - clamped    : convert_yolo_coordinates_batch 의 0~1 clamp 에 걸린 박스 (원본 라벨이 이미지 밖으로 나감)
+    - degenerate : 결과 박스 너비/높이가 min_box_px 픽셀 이하인 박스
+
+파일 읽기는 프로세스 풀에서 병렬로, 좌표 계산과 비교는 전체 데이터셋을 한 배열로 모아 한 번에 수행합니다.
+"""
+
+import os
+import csv
+import struct
+import importlib
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import list_file_names
+from image_decode import read_jpeg_size
+from image_encode import output_path_for
+from letterbox_ops import letterbox_params
+
+# 숫자로 시작하는 스크립트 파일은 일반 import 문으로 불러올 수 없어 importlib 사용
+_resize = importlib.import_module("1-2-resize-image-with-label")
+
+SUPPORTED_FORMATS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def image_size(path):
+    """
+    이미지 (width, height) 를 반환합니다. JPEG/PNG/npy 는 헤더만 읽고, 그 외 형식은 디코딩합니다.
+    JPEG 는 1-2 의 cv2.imread 와 같이 EXIF 회전을 적용한 크기입니다. 읽을 수 없으면 None.
+    """
+    lower = path.lower()
+    if lower.endswith((".jpg", ".jpeg")):
+        size = read_jpeg_size(path, apply_orientation=True)
+        if size is not None:
+            return size
+    elif lower.endswith(".npy"):
+        # 1-2 의 output_format="npy" 결과 (uint8 (H, W, 3))
+        try:
+            shape = np.load(path, mmap_mode='r').shape
+        except (OSError, ValueError):
+            return None
+        return shape[1], shape[0]
+    elif lower.endswith(".png"):
+        with open(path, 'rb') as f:
+            header = f.read(24)
+        if header[:8] == b'\x89PNG\r\n\x1a\n' and len(header) == 24:
+            return struct.unpack('>II', header[16:24])
+    img = cv2.imread(path)
+    return None if img is None else (img.shape[1], img.shape[0])
+
+
+def read_pair(img_name, images_folder, labels_folder, images_result_folder, labels_result_folder,
+              output_format=None):
+    """
+    원본/결과 이미지 크기와 라벨을 읽습니다. 워커 프로세스에서 실행됩니다.
+    결과 이미지 이름은 1-2 와 같이 output_format 확장자로 바꿔서 찾습니다.
+
+    Returns:
+        dict 또는 None (원본 라벨이 없어 1-2 가 건너뛴 파일)
+    """
+    base_name = os.path.splitext(img_name)[0]
+    label_file = os.path.join(labels_folder, base_name + ".txt")
+    if not os.path.exists(label_file):
+        return None
+
+    result_img = output_path_for(os.path.join(images_result_folder, img_name), output_format)
+    result_label = os.path.join(labels_result_folder, base_name + ".txt")
+    pair = {"name": img_name, "messages": [], "original_size": image_size(os.path.join(images_folder, img_name))}
+
+    if not os.path.exists(result_img) or not os.path.exists(result_label):
+        pair["messages"].append(f"[WARN] '{img_name}' 결과 이미지 또는 라벨이 없습니다.")
+        return pair
+
+    pair["result_size"] = image_size(result_img)
+    pair["labels"], _ = _resize.load_yolo_labels(label_file)
+    pair["result_labels"], _ = _resize.load_yolo_labels(result_label)
+    return pair
+
+
+def _read_pair_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return read_pair(*args)
+
+
+def verify_dataset(images_folder, labels_folder, images_result_folder=None, labels_result_folder=None,
+                   target_size=(640, 640), tolerance=1e-4, min_box_px=1.0, workers=1, report_path=None,
+                   output_format=None):
+    """
+    1-2 변환 결과의 라벨 좌표를 검증합니다.
+
+    Args:
+        images_folder, labels_folder: 원본 폴더
+        images_result_folder, labels_result_folder: 결과 폴더 (None이면 '<폴더 이름>_result')
+        target_size: 변환에 사용한 (height, width)
+        tolerance: 허용 오차 (정규화 좌표). reduced_decode 로 변환했다면 1e-3 정도로 늘려야 함
+        min_box_px: 이 픽셀 이하 너비/높이의 박스를 degenerate 로 표시
+        workers: 파일 읽기 병렬 프로세스 수
+        report_path: 지정하면 문제 목록을 CSV 로 저장
+        output_format: 1-2 변환에 사용한 저장 형식 (None 이면 원본 확장자)
+
+    Returns:
+        dict: 항목별 개수
+    """
+    images_result_folder = images_result_folder or f"{os.path.basename(images_folder)}_result"
+    labels_result_folder = labels_result_folder or f"{os.path.basename(labels_folder)}_result"
+
+    img_files = list_file_names(images_folder, SUPPORTED_FORMATS, sort=True)
+    tasks = [(f, images_folder, labels_folder, images_result_folder, labels_result_folder, output_format)
+             for f in img_files]
+
+    # 1. 파일 읽기 (병렬)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pairs = list(executor.map(_read_pair_args, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        pairs = [_read_pair_args(task) for task in tasks]
+    pairs = [p for p in pairs if p is not None]
+
+    issues = []  # (파일, 박스 번호, 항목, 값)
+    counts = {"files": len(pairs), "missing": 0, "size": 0, "count": 0,
+              "mismatch": 0, "clamped": 0, "degenerate": 0, "boxes": 0}
+
+    # 2. 비교 가능한 박스를 하나의 배열로 모음
+    rows, results, sizes, row_file, row_box = [], [], [], [], []
+    for i, pair in enumerate(pairs):
+        for message in pair["messages"]:
+            print(message)
+        if "result_size" not in pair or pair["original_size"] is None:
+            counts["missing"] += 1
+            issues.append((pair["name"], "", "missing", ""))
+            continue
+        if tuple(pair["result_size"]) != (target_size[1], target_size[0]):
+            counts["size"] += 1
+            issues.append((pair["name"], "", "size", "%dx%d" % tuple(pair["result_size"])))
+        if len(pair["labels"]) != len(pair["result_labels"]):
+            counts["count"] += 1
+            issues.append((pair["name"], "", "count", f"{len(pair['labels'])}->{len(pair['result_labels'])}"))
+            continue
+        n = len(pair["labels"])
+        rows.append(pair["labels"])
+        results.append(pair["result_labels"])
+        sizes.append(np.tile(pair["original_size"], (n, 1)))
+        row_file.extend([i] * n)
+        row_box.extend(range(n))
+
+    if rows:
+        labels = np.concatenate(rows)
+        result_labels = np.concatenate(results)
+        original_sizes = np.concatenate(sizes)
+        row_file = np.array(row_file)
+        row_box = np.array(row_box)
+        counts["boxes"] = len(labels)
+
+        # 3. 기대 좌표 계산 (clamp 전/후)
+        scale, top, left = letterbox_params(original_sizes, target_size)
+        target_h, target_w = target_size
+        raw = np.empty_like(labels)
+        raw[:, 0] = labels[:, 0]
+        raw[:, 1] = (labels[:, 1] * original_sizes[:, 0] * scale + left) / target_w
+        raw[:, 2] = (labels[:, 2] * original_sizes[:, 1] * scale + top) / target_h
+        raw[:, 3] = labels[:, 3] * original_sizes[:, 0] * scale / target_w
+        raw[:, 4] = labels[:, 4] * original_sizes[:, 1] * scale / target_h
+        expected = raw.copy()
+        expected[:, 1:] = np.clip(raw[:, 1:], 0, 1)
+
+        # 이미 target_size 인 이미지는 1-2 가 라벨을 그대로 복사함
+        copied = (original_sizes[:, 0] == target_w) & (original_sizes[:, 1] == target_h)
+        expected[copied] = labels[copied]
+        raw[copied] = labels[copied]
+
+        # 4. 항목별 검사
+        diff = np.abs(expected - result_labels).max(axis=1)
+        mismatch = (diff > tolerance) | (expected[:, 0] != result_labels[:, 0])
+        clamped = ((raw[:, 1:] < 0) | (raw[:, 1:] > 1)).any(axis=1)
+        degenerate = (result_labels[:, 3] * target_w <= min_box_px) | (result_labels[:, 4] * target_h <= min_box_px)
+
+        for key, mask, values in (("mismatch", mismatch, diff), ("clamped", clamped, None),
+                                  ("degenerate", degenerate, None)):
+            counts[key] = int(mask.sum())
+            for j in np.flatnonzero(mask):
+                value = f"{values[j]:.6f}" if values is not None else ""
+                issues.append((pairs[row_file[j]]["name"], int(row_box[j]), key, value))
+
+    if report_path:
+        with open(report_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "box", "issue", "value"])
+            writer.writerows(issues)
+
+    print(f"\n✅ 검증 완료: 파일 {counts['files']}개, 박스 {counts['boxes']}개")
+    print(f"  - 좌표 불일치 박스: {counts['mismatch']}개 (허용 오차 {tolerance})")
+    print(f"  - 박스 수 불일치 파일: {counts['count']}개, 크기 불일치 파일: {counts['size']}개, "
+          f"결과 없음: {counts['missing']}개")
+    print(f"  - clamp 된 박스: {counts['clamped']}개, degenerate 박스: {counts['degenerate']}개")
+    if report_path:
+        print(f"  - 상세 목록: '{report_path}'")
+    return counts
+
+
+# 사용 예시
+if __name__ == "__main__":
+    images_folder = "images"  # 원본 이미지 폴더
+    labels_folder = "labels"  # 원본 라벨 폴더
+    verify_dataset(images_folder, labels_folder, workers=os.cpu_count() or 1, report_path="verify_report.csv")
@@ -1,10 +1,12 @@
 import os
-import shutil
 import argparse
 from pathlib import Path
+from collections import Counter
+from dataset_scan import list_file_names
+from file_link import LINK_MODES, place_file, write_file_list
 
 
-def split_files_into_folders(source_folder, dest_folder_prefix, batch_size):
+def split_files_into_folders(source_folder, dest_folder_prefix, batch_size, link_mode="copy"):
     """
     특정 폴더에 있는 이미지 파일들을 지정된 단위로 나누어 새로운 폴더에 저장합니다.
     
@@ -12,6 +14,8 @@ def split_files_into_folders(source_folder, dest_folder_prefix, batch_size):
         source_folder (str): 원본 이미지 파일이 있는 폴더 경로
         dest_folder_prefix (str): 생성될 목적지 폴더의 접두사 
         batch_size (int): 각 폴더에 저장할 파일 단위 수
+        link_mode (str): 파일 배치 방식 ("copy", "hardlink", "reflink", "symlink", "list").
+            "list"면 폴더 대신 '<접두사>-N.txt' 파일 목록만 작성합니다.
     """
     # 소스 폴더가 존재하는지 확인
     if not os.path.exists(source_folder):
@@ -19,17 +23,10 @@ def split_files_into_folders(source_folder, dest_folder_prefix, batch_size):
         return
     
     # 이미지 파일 확장자 (필요에 따라 추가 가능)
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
+    image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
     
     # 소스 폴더에서 이미지 파일만 필터링하고 이름순으로 정렬
-    image_files = []
-    for file in os.listdir(source_folder):
-        file_path = os.path.join(source_folder, file)
-        if os.path.isfile(file_path) and any(file.lower().endswith(ext) for ext in image_extensions):
-            image_files.append(file)
-    
-    # 파일 이름순으로 정렬
-    image_files.sort()
+    image_files = list_file_names(source_folder, image_extensions, sort=True)
     
     total_files = len(image_files)
     
@@ -48,6 +45,17 @@ def split_files_into_folders(source_folder, dest_folder_prefix, batch_size):
         new_folder_name = f"{dest_folder_prefix}-{folder_index + 1}"
         new_folder_path = os.path.join(os.path.dirname(source_folder), new_folder_name)
         
+        # 현재 배치의 시작 및 끝 인덱스 계산
+        start_idx = folder_index * batch_size
+        end_idx = min((folder_index + 1) * batch_size, total_files)
+        
+        # 파일 목록만 작성하는 경우
+        if link_mode == "list":
+            write_file_list(new_folder_path + ".txt",
+                            [os.path.join(source_folder, f) for f in image_files[start_idx:end_idx]])
+            print(f"'{new_folder_name}.txt' 에 {end_idx - start_idx}개의 파일 목록을 작성했습니다.")
+            continue
+        
         # 폴더가 이미 존재하는 경우 처리
         if os.path.exists(new_folder_path):
             print(f"경고: '{new_folder_name}' 폴더가 이미 존재합니다. 기존 파일을 덮어쓸 수 있습니다.")
@@ -55,17 +63,15 @@ def split_files_into_folders(source_folder, dest_folder_prefix, batch_size):
             os.makedirs(new_folder_path)
             print(f"'{new_folder_name}' 폴더를 생성했습니다.")
         
-        # 현재 배치의 시작 및 끝 인덱스 계산
-        start_idx = folder_index * batch_size
-        end_idx = min((folder_index + 1) * batch_size, total_files)
-        
-        # 현재 배치의 파일 복사
+        # 현재 배치의 파일 복사 (또는 링크)
+        methods = Counter()
         for i in range(start_idx, end_idx):
             src_file = os.path.join(source_folder, image_files[i])
             dst_file = os.path.join(new_folder_path, image_files[i])
-            shutil.copy2(src_file, dst_file)
+            methods[place_file(src_file, dst_file, link_mode)] += 1
         
-        print(f"'{new_folder_name}' 폴더에 {end_idx - start_idx}개의 파일을 복사했습니다.")
+        method_summary = ", ".join(f"{method} {count}개" for method, count in methods.items())
+        print(f"'{new_folder_name}' 폴더에 {end_idx - start_idx}개의 파일을 배치했습니다. ({method_summary})")
 
 
 if __name__ == "__main__":
@@ -74,7 +80,9 @@ if __name__ == "__main__":
     parser.add_argument('source_folder', help='원본 이미지 파일이 있는 폴더 경로')
     parser.add_argument('dest_folder_prefix', help='목적지 폴더의 접두사 (예: "특정폴더")')
     parser.add_argument('batch_size', type=int, help='각 폴더에 저장할 파일 단위 수')
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='copy',
+                        help='파일 배치 방식 (기본: copy, list는 폴더 대신 파일 목록만 작성)')
     
     args = parser.parse_args()
     
-    split_files_into_folders(args.source_folder, args.dest_folder_prefix, args.batch_size)
\ No newline at end of file
+    split_files_into_folders(args.source_folder, args.dest_folder_prefix, args.batch_size, args.link_mode)
\ No newline at end of file
@@ -1,72 +1,202 @@
 import os
-import shutil
-from collections import defaultdict
-
-def sort_files():
-    # 1. 작업해야 할 폴더 목록
-    folders_to_process = [
-        'tree-1',
-        'tree-2',
-        'tree-3',
-        'tree-4'
-    ]
-    
-    # 2. images와 labels 폴더 생성
-    current_dir = os.getcwd()
-    images_dir = os.path.join(current_dir, 'images')
-    labels_dir = os.path.join(current_dir, 'labels')
-    
-    # 폴더가 없으면 생성
-    if not os.path.exists(images_dir):
-        os.makedirs(images_dir)
-    if not os.path.exists(labels_dir):
-        os.makedirs(labels_dir)
-    
-    # 파일 이름별 정보를 저장할 딕셔너리
-    files_by_basename = defaultdict(lambda: {'image': None, 'label': None})
-    
-    # 3 & 4. 모든 폴더를 검사하여 파일 목록 수집
-    for folder in folders_to_process:
-        if not os.path.exists(folder):
-            print(f"경고: '{folder}' 폴더가 존재하지 않습니다. 건너뜁니다.")
+import csv
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataset_scan import iter_files
+from file_link import LINK_MODES, place_file, write_file_list
+from resize_manifest import file_hash
+
+# 기본으로 모을 폴더 목록 (명령줄에서 폴더를 지정하지 않았을 때)
+DEFAULT_FOLDERS = ['tree-1', 'tree-2', 'tree-3', 'tree-4']
+
+# 같은 이름, 다른 내용의 쌍을 처리하는 방식
+#   rename : 나중 폴더의 쌍을 '<폴더 이름>_<파일 이름>' 으로 함께 배치 (이미 있는 이름이면 '_1', '_2' 를 붙임, 손실 없음)
+#   first  : 처음 폴더의 쌍만 배치
+#   skip   : 충돌한 이름은 모두 배치하지 않음
+CONFLICT_POLICIES = ("rename", "first", "skip")
+
+LABEL_EXTENSIONS = ('.txt', '.xml')
+
+
+def scan_folder(folder):
+    """
+    폴더 하나를 읽어 {확장자 제외 이름: {'image': 경로, 'label': 경로}} 와 경고 메시지를 반환합니다.
+    이미지와 라벨은 같은 폴더 안에서만 짝짓습니다. 스레드에서 실행되므로 출력 대신 메시지를 반환합니다.
+    """
+    pairs = {}
+    messages = []
+    if not os.path.isdir(folder):
+        return pairs, [f"경고: '{folder}' 폴더가 존재하지 않습니다. 건너뜁니다."]
+
+    # 이름순으로 읽어서 폴더 안에서 이름이 겹칠 때 항상 같은 파일이 선택되도록 함
+    for entry in sorted(iter_files(folder), key=lambda e: e.name):
+        basename, ext = os.path.splitext(entry.name)
+        kind = 'label' if ext.lower() in LABEL_EXTENSIONS else 'image'
+        files = pairs.setdefault(basename, {'image': None, 'label': None})
+        if files[kind] is not None:
+            messages.append(f"경고: '{folder}' 에 같은 이름의 {kind} 파일이 여러 개 있습니다: "
+                            f"'{os.path.basename(files[kind])}' 사용, '{entry.name}' 무시")
             continue
-            
-        for filename in os.listdir(folder):
-            file_path = os.path.join(folder, filename)
-            
-            # 디렉토리는 건너뛰기
-            if os.path.isdir(file_path):
-                continue
-                
-            # 파일 확장자 확인
-            _, ext = os.path.splitext(filename)
-            basename = os.path.splitext(filename)[0]  # 확장자를 제외한 파일 이름
-            
-            # 라벨 파일인지 이미지 파일인지 분류
-            if ext.lower() in ['.txt', '.xml']:
-                files_by_basename[basename]['label'] = file_path
+        files[kind] = entry.path
+    return pairs, messages
+
+
+def _pair_key(pair):
+    """쌍의 내용 비교용 키 (이미지, 라벨 SHA-1)."""
+    return tuple(file_hash(path) for path in (pair['image'], pair['label']))
+
+
+def merge_sources(folders, workers=8, conflict="rename"):
+    """
+    여러 폴더의 이미지/라벨 쌍을 이름 충돌을 확인하며 하나로 합칩니다.
+
+    같은 이름의 쌍이 여러 폴더에 있으면 먼저 파일 크기를, 크기가 같으면 내용 해시를 비교해
+    완전히 같으면 중복(duplicate)으로 하나만 남기고, 다르면 충돌(conflict)로 conflict 방식에 따라 처리합니다.
+    해시는 이름이 겹친 파일만 계산합니다.
+
+    Args:
+        folders (list): 원본 폴더 목록 (앞쪽 폴더가 우선)
+        workers (int): 폴더 스캔/해시 계산 스레드 수
+        conflict (str): "rename", "first", "skip" 중 하나
+
+    Returns:
+        tuple: ([(배치할 이름, 이미지 경로, 라벨 경로)], 충돌/중복 기록 리스트, 통계 Counter)
+    """
+    if conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"지원하지 않는 conflict 방식입니다: {conflict}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        scanned = list(executor.map(scan_folder, folders))
+
+    stats = Counter()
+    candidates = {}  # 이름 -> [(폴더, 쌍)], 폴더 순서 유지
+    for folder, (pairs, messages) in zip(folders, scanned):
+        for message in messages:
+            print(message)
+        for basename, files in pairs.items():
+            if files['image'] and files['label']:
+                candidates.setdefault(basename, []).append((folder, files))
             else:
-                files_by_basename[basename]['image'] = file_path
-    
-    # 5. 이미지와 라벨 파일이 모두 있는 경우만 복사
-    images_copied = 0
-    labels_copied = 0
-    
-    for basename, files in files_by_basename.items():
-        # 이미지와 라벨 파일이 모두 있는 경우만 처리
-        if files['image'] and files['label']:
-            # 이미지 파일 복사
-            image_file = os.path.basename(files['image'])
-            shutil.copy2(files['image'], os.path.join(images_dir, image_file))
-            images_copied += 1
-            
-            # 라벨 파일 복사
-            label_file = os.path.basename(files['label'])
-            shutil.copy2(files['label'], os.path.join(labels_dir, label_file))
-            labels_copied += 1
-    
-    # 6. 결과 출력
-    print(f"작업 완료: images 폴더에 {images_copied}개 파일, labels 폴더에 {labels_copied}개 파일이 복사되었습니다.")
+                stats['unpaired'] += 1
+
+    # 이름이 겹치고 크기까지 같은 쌍만 해시 계산
+    def sizes(files):
+        return os.path.getsize(files['image']), os.path.getsize(files['label'])
+
+    to_hash = []
+    for entries in candidates.values():
+        if len(entries) > 1:
+            size_counts = Counter(sizes(files) for _, files in entries)
+            to_hash.extend(files for _, files in entries if size_counts[sizes(files)] > 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hashes = dict(zip((id(files) for files in to_hash), executor.map(_pair_key, to_hash)))
+
+    merged = []
+    records = []  # (이름, 폴더, 상태)
+    # 원래 이름을 모두 미리 예약해서, 바꾼 이름이 다른 폴더의 실제 파일 이름(예: a_img1)과 겹치지 않게 함
+    used_names = set(candidates)
+    for basename, entries in candidates.items():
+        first_folder, first = entries[0]
+        merged.append((basename, first['image'], first['label']))
+        seen_keys = [hashes.get(id(first), ('size',) + sizes(first))]
+        conflicted = False
+        for folder, files in entries[1:]:
+            key = hashes.get(id(files), ('size',) + sizes(files))
+            if key in seen_keys:
+                stats['duplicate'] += 1
+                records.append((basename, folder, "duplicate"))
+                continue
+            seen_keys.append(key)
+            conflicted = True
+            stats['conflict'] += 1
+            records.append((basename, folder, "conflict"))
+            if conflict == "rename":
+                new_name = f"{os.path.basename(os.path.normpath(folder))}_{basename}"
+                candidate, counter = new_name, 1
+                while candidate in used_names:
+                    candidate = f"{new_name}_{counter}"
+                    counter += 1
+                used_names.add(candidate)
+                merged.append((candidate, files['image'], files['label']))
+        if conflicted and conflict == "skip":
+            merged.pop(-1)
+            records.append((basename, first_folder, "conflict"))
+
+    return merged, records, stats
+
+
+def _output_name(new_basename, path):
+    """배치할 이름에 원본 확장자를 붙입니다."""
+    return new_basename + os.path.splitext(path)[1]
+
+
+def sort_files(folders=None, link_mode="copy", workers=8, conflict="rename", output_dir=None, report_path=None):
+    """
+    여러 폴더의 이미지/라벨 쌍을 images, labels 폴더로 모읍니다.
+
+    Args:
+        folders (list): 원본 폴더 목록. None이면 DEFAULT_FOLDERS
+        link_mode (str): 파일 배치 방식 ("copy", "hardlink", "reflink", "symlink", "list").
+            "list"면 파일을 옮기지 않고 images.txt, labels.txt 목록만 작성합니다.
+        workers (int): 스캔, 해시 계산, 파일 배치 스레드 수
+        conflict (str): 같은 이름, 다른 내용의 쌍 처리 방식 ("rename", "first", "skip")
+        output_dir (str): images, labels 를 만들 폴더 (None이면 현재 폴더)
+        report_path (str): 지정하면 중복/충돌 목록을 CSV 로 저장
+    """
+    folders = folders or DEFAULT_FOLDERS
+    output_dir = output_dir or os.getcwd()
+    images_dir = os.path.join(output_dir, 'images')
+    labels_dir = os.path.join(output_dir, 'labels')
+
+    merged, records, stats = merge_sources(folders, workers, conflict)
+
+    if report_path:
+        with open(report_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["basename", "folder", "status"])
+            writer.writerows(records)
+
+    summary = (f"중복 {stats['duplicate']}개, 충돌 {stats['conflict']}개 ({conflict}), "
+               f"짝 없는 파일 {stats['unpaired']}개")
+
+    if link_mode == "list":
+        # 목록 모드는 이름을 바꿀 수 없으므로 원본 경로를 그대로 기록
+        write_file_list(os.path.join(output_dir, 'images.txt'), [image for _, image, _ in merged])
+        write_file_list(os.path.join(output_dir, 'labels.txt'), [label for _, _, label in merged])
+        print(f"작업 완료: images.txt, labels.txt 에 {len(merged)}개 쌍의 목록을 작성했습니다. ({summary})")
+        return
+
+    os.makedirs(images_dir, exist_ok=True)
+    os.makedirs(labels_dir, exist_ok=True)
+
+    tasks = []
+    for new_basename, image, label in merged:
+        tasks.append((image, os.path.join(images_dir, _output_name(new_basename, image))))
+        tasks.append((label, os.path.join(labels_dir, _output_name(new_basename, label))))
+
+    # 파일 배치는 I/O 대기 시간이 대부분이라 스레드로 병렬 처리
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        methods = Counter(executor.map(lambda task: place_file(task[0], task[1], link_mode), tasks))
+
+    method_summary = ", ".join(f"{method} {count}개" for method, count in methods.items())
+    print(f"작업 완료: images 폴더에 {len(merged)}개 파일, labels 폴더에 {len(merged)}개 파일이 배치되었습니다. "
+          f"({method_summary}) {summary}")
+    if report_path:
+        print(f"중복/충돌 목록: '{report_path}'")
+
 
 if __name__ == "__main__":
-    sort_files()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='여러 폴더의 이미지/라벨 쌍을 images, labels 폴더로 모읍니다.')
+    parser.add_argument('folders', nargs='*', default=DEFAULT_FOLDERS,
+                        help='원본 폴더 목록 (기본: tree-1 ~ tree-4, 앞쪽 폴더가 우선)')
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='copy',
+                        help='파일 배치 방식 (기본: copy, list는 파일 목록만 작성)')
+    parser.add_argument('--conflict', choices=CONFLICT_POLICIES, default='rename',
+                        help='같은 이름, 다른 내용의 쌍 처리 방식 (기본: rename)')
+    parser.add_argument('--workers', type=int, default=8, help='스레드 수')
+    parser.add_argument('--report', default=None, help='중복/충돌 목록 CSV 경로')
+
+    args = parser.parse_args()
+
+    sort_files(args.folders, args.link_mode, args.workers, args.conflict, report_path=args.report)
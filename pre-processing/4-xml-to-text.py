@@ -1,17 +1,53 @@
 import os
-import glob
+import json
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import iter_files
 
-def convert_annotation(xml_file, class_dict):
+# 클래스 정보 파일이 없을 때 사용하는 기본 클래스 딕셔너리
+DEFAULT_CLASS_DICT = {
+    "tree": 0,
+}
+
+def load_class_dict(classes_file=None, notes_file=None):
     """
-    XML 주석 파일을 YOLO 형식으로 변환합니다.
-    
+    Label Studio 내보내기의 classes.txt 또는 notes.json 에서 클래스 딕셔너리를 만듭니다.
+
     Args:
-        xml_file (str): XML 파일 경로
-        class_dict (dict): 클래스 이름과 ID 매핑 딕셔너리
-    
+        classes_file (str): 한 줄에 클래스 이름 하나씩 적힌 파일 (줄 번호가 ID)
+        notes_file (str): {"categories": [{"id": 0, "name": "..."}]} 형식의 JSON 파일
+
     Returns:
-        list: YOLO 형식의 주석 문자열 리스트
+        dict: 클래스 이름과 ID 매핑. 두 파일이 모두 없으면 DEFAULT_CLASS_DICT
+    """
+    if notes_file and os.path.exists(notes_file):
+        with open(notes_file, 'r', encoding='utf-8') as f:
+            notes = json.load(f)
+        return {category["name"]: int(category["id"]) for category in notes["categories"]}
+
+    if classes_file and os.path.exists(classes_file):
+        with open(classes_file, 'r', encoding='utf-8') as f:
+            names = [line.strip() for line in f if line.strip()]
+        return {name: class_id for class_id, name in enumerate(names)}
+
+    return dict(DEFAULT_CLASS_DICT)
+
+def _to_yolo(class_id, xmin, ymin, xmax, ymax, width, height):
+    """Pascal VOC 좌표를 YOLO 형식 문자열로 변환합니다."""
+    # YOLO 형식: [class_id center_x center_y width height]
+    # 여기서 모든 값은 0~1 사이로 정규화됨
+    center_x = (xmin + xmax) / 2.0 / width
+    center_y = (ymin + ymax) / 2.0 / height
+    bbox_width = (xmax - xmin) / width
+    bbox_height = (ymax - ymin) / height
+    return f"{class_id} {center_x:.6f} {center_y:.6f} {bbox_width:.6f} {bbox_height:.6f}"
+
+def _parse_annotation(xml_file, class_dict):
+    """
+    XML 전체를 트리로 읽어 변환합니다.
+
+    Returns:
+        tuple: (YOLO 형식 문자열 리스트, 클래스 딕셔너리에 없는 클래스 이름 리스트)
     """
     tree = ET.parse(xml_file)
     root = tree.getroot()
@@ -22,6 +58,7 @@ def convert_annotation(xml_file, class_dict):
     height = int(size.find('height').text)
     
     yolo_annotations = []
+    unknown_classes = []
     
     # 각 객체에 대해 처리
     for obj in root.findall('object'):
@@ -30,82 +67,159 @@ def convert_annotation(xml_file, class_dict):
         
         # 클래스 딕셔너리에 없는 클래스는 건너뜀
         if class_name not in class_dict:
-            print(f"경고: '{class_name}'은(는) 클래스 딕셔너리에 없습니다. 건너뜁니다.")
+            unknown_classes.append(class_name)
             continue
         
-        class_id = class_dict[class_name]
-        
         # 바운딩 박스 좌표 가져오기
         bbox = obj.find('bndbox')
-        xmin = float(bbox.find('xmin').text)
-        ymin = float(bbox.find('ymin').text)
-        xmax = float(bbox.find('xmax').text)
-        ymax = float(bbox.find('ymax').text)
-        
-        # YOLO 형식으로 변환
-        # YOLO 형식: [class_id center_x center_y width height]
-        # 여기서 모든 값은 0~1 사이로 정규화됨
-        
-        # 중심 좌표 계산
-        center_x = (xmin + xmax) / 2.0 / width
-        center_y = (ymin + ymax) / 2.0 / height
-        
-        # 너비와 높이 계산
-        bbox_width = (xmax - xmin) / width
-        bbox_height = (ymax - ymin) / height
-        
-        # YOLO 형식 문자열 생성
-        yolo_annotation = f"{class_id} {center_x:.6f} {center_y:.6f} {bbox_width:.6f} {bbox_height:.6f}"
-        yolo_annotations.append(yolo_annotation)
+        yolo_annotations.append(_to_yolo(
+            class_dict[class_name],
+            float(bbox.find('xmin').text), float(bbox.find('ymin').text),
+            float(bbox.find('xmax').text), float(bbox.find('ymax').text),
+            width, height,
+        ))
     
+    return yolo_annotations, unknown_classes
+
+def _iterparse_annotation(xml_file, class_dict):
+    """
+    iterparse 로 XML 을 순차적으로 읽으면서 변환합니다. 처리한 object 요소는 바로 지워서
+    객체가 매우 많은 큰 Pascal VOC 파일도 메모리를 적게 사용합니다.
+    <size> 가 <object> 뒤에 나올 수도 있어 좌표는 모아 두었다가 마지막에 정규화합니다.
+
+    Returns:
+        tuple: _parse_annotation 과 동일
+    """
+    width = height = None
+    boxes = []
+    unknown_classes = []
+
+    for _, elem in ET.iterparse(xml_file, events=('end',)):
+        if elem.tag == 'size':
+            width = int(elem.find('width').text)
+            height = int(elem.find('height').text)
+        elif elem.tag == 'object':
+            class_name = elem.find('name').text
+            if class_name not in class_dict:
+                unknown_classes.append(class_name)
+            else:
+                bbox = elem.find('bndbox')
+                boxes.append((
+                    class_dict[class_name],
+                    float(bbox.find('xmin').text), float(bbox.find('ymin').text),
+                    float(bbox.find('xmax').text), float(bbox.find('ymax').text),
+                ))
+            elem.clear()
+
+    if width is None:
+        raise ValueError("size 정보가 없습니다.")
+
+    return [_to_yolo(*box, width, height) for box in boxes], unknown_classes
+
+def convert_annotation(xml_file, class_dict, streaming=False, messages=None):
+    """
+    XML 주석 파일을 YOLO 형식으로 변환합니다.
+    
+    Args:
+        xml_file (str): XML 파일 경로
+        class_dict (dict): 클래스 이름과 ID 매핑 딕셔너리
+        streaming (bool): True면 iterparse 기반 스트리밍 파서 사용
+        messages (list): 주면 경고를 출력하지 않고 이 리스트에 추가 (워커 프로세스용)
+    
+    Returns:
+        list: YOLO 형식의 주석 문자열 리스트
+    """
+    parse = _iterparse_annotation if streaming else _parse_annotation
+    yolo_annotations, unknown_classes = parse(xml_file, class_dict)
+    for class_name in unknown_classes:
+        message = f"경고: '{class_name}'은(는) 클래스 딕셔너리에 없습니다. 건너뜁니다."
+        if messages is None:
+            print(message)
+        else:
+            messages.append(message)
     return yolo_annotations
 
-def process_directory():
+def convert_file(xml_file, class_dict, streaming=False):
+    """
+    XML 파일 하나를 같은 이름의 TXT 파일로 변환합니다.
+    병렬 실행 시 워커 프로세스에서 실행되므로 출력 대신 메시지를 반환합니다.
+
+    Returns:
+        tuple: (상태 'converted' | 'skipped' | 'error', 메시지 리스트)
+    """
+    # 동일한 이름의 TXT 파일이 이미 있는지 확인
+    txt_file_path = os.path.splitext(xml_file)[0] + '.txt'
+    if os.path.exists(txt_file_path):
+        return 'skipped', [f"경고: '{txt_file_path}' 파일이 이미 존재합니다. 건너뜁니다."]
+
+    try:
+        # XML을 YOLO 형식 TXT로 변환 (경고는 출력하지 않고 messages 에 모음)
+        messages = []
+        yolo_annotations = convert_annotation(xml_file, class_dict, streaming, messages)
+
+        # 변환 결과를 한 번에 저장
+        with open(txt_file_path, 'w') as f:
+            f.write(''.join(annotation + '\n' for annotation in yolo_annotations))
+
+        messages.append(f"변환 완료: {xml_file} -> {txt_file_path}")
+        return 'converted', messages
+
+    except Exception as e:
+        return 'error', [f"오류: '{xml_file}' 파일 변환 중 문제가 발생했습니다: {str(e)}"]
+
+def _convert_file_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return convert_file(*args)
+
+def process_directory(work_directory="./labels", class_dict=None, workers=1, streaming=False, chunksize=None):
     """
     지정된 디렉토리에서 파일들을 처리하여 필요한 경우 XML을 TXT로 변환합니다.
+
+    Args:
+        work_directory (str): 작업할 폴더 경로
+        class_dict (dict): 클래스 이름과 ID 매핑 (None이면 DEFAULT_CLASS_DICT)
+        workers (int): 병렬 처리 프로세스 수 (1이면 순차 처리)
+        streaming (bool): iterparse 기반 스트리밍 파서 사용
+        chunksize (int): 워커에 한 번에 보낼 파일 수 (None이면 자동)
     """
-    # 작업할 폴더 경로 
-    work_directory = "./labels"
+    if class_dict is None:
+        class_dict = dict(DEFAULT_CLASS_DICT)
+    
+    # XML 파일 목록
+    tasks = [(entry.path, class_dict, streaming) for entry in iter_files(work_directory, ('.xml',))]
     
-    # 클래스 딕셔너리
-    class_dict = {
-        "tree": 0,
-    }
+    if workers > 1 and len(tasks) > 1:
+        if chunksize is None:
+            chunksize = max(1, len(tasks) // (workers * 4))
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_convert_file_args, tasks, chunksize=chunksize)
+    else:
+        executor = None
+        results = map(_convert_file_args, tasks)
     
     # 변환된 파일 카운트
     converted_count = 0
     skipped_count = 0
+    error_count = 0
     
-    # 디렉토리 내 모든 파일 처리
-    for file_path in glob.glob(os.path.join(work_directory, "*.*")):
-        file_name, file_ext = os.path.splitext(file_path)
-        
-        # XML 파일인 경우만 변환
-        if file_ext.lower() == '.xml':
-            # 동일한 이름의 TXT 파일이 이미 있는지 확인
-            txt_file_path = file_name + '.txt'
-            if os.path.exists(txt_file_path):
-                print(f"경고: '{txt_file_path}' 파일이 이미 존재합니다. 건너뜁니다.")
-                skipped_count += 1
-                continue
-            
-            try:
-                # XML을 YOLO 형식 TXT로 변환
-                yolo_annotations = convert_annotation(file_path, class_dict)
-                
-                # 변환 결과 저장
-                with open(txt_file_path, 'w') as f:
-                    for annotation in yolo_annotations:
-                        f.write(annotation + '\n')
-                
-                print(f"변환 완료: {file_path} -> {txt_file_path}")
+    try:
+        for status, messages in results:
+            for message in messages:
+                print(message)
+            if status == 'converted':
                 converted_count += 1
-                
-            except Exception as e:
-                print(f"오류: '{file_path}' 파일 변환 중 문제가 발생했습니다: {str(e)}")
+            elif status == 'skipped':
+                skipped_count += 1
+            else:
+                error_count += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     # 결과 출력
-    print(f"\n처리 완료: {converted_count}개 파일 변환됨, {skipped_count}개 파일 건너뜀")
+    print(f"\n처리 완료: {converted_count}개 파일 변환됨, {skipped_count}개 파일 건너뜀, {error_count}개 파일 오류")
 
 if __name__ == "__main__":
-    process_directory()
\ No newline at end of file
+    # 클래스 정보: Label Studio 내보내기의 notes.json 또는 classes.txt (없으면 {"tree": 0})
+    class_dict = load_class_dict(classes_file="classes.txt", notes_file="notes.json")
+    process_directory("./labels", class_dict, workers=os.cpu_count() or 1)
\ No newline at end of file
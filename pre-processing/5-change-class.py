@@ -1,47 +1,231 @@
 import os
-import re
+import importlib
+import numpy as np
+from dataset_scan import iter_files
+
+# 하이픈이 들어간 파일 이름은 일반 import 문으로 불러올 수 없어 importlib 사용
+_box = importlib.import_module("box-pre-processing")
+
+# 매핑 값: 정수(새 클래스 번호) 또는 아래 문자열
+KEEP = "keep"      # 클래스 번호 유지
+DROP = "drop"      # 해당 박스만 삭제
+REJECT = "reject"  # 해당 박스가 있는 라벨 파일 전체를 제외 (box-pre-processing.py 규칙)
+
+_CODES = {KEEP: -1, DROP: -2, REJECT: -3}
+
+def load_mapping(mapping_file):
+    """
+    YAML 매핑 파일을 읽습니다.
+
+    예시 (0, 1 -> 0 으로 합치고, 5 는 박스 삭제, 그 외 클래스가 있으면 파일 제외):
+        map:
+          0: 0
+          1: 0
+          5: drop
+        default: reject
+
+    Returns:
+        tuple: (매핑 딕셔너리, 기본값)
+    """
+    import yaml  # ultralytics 설치 시 함께 설치됨
+
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    mapping = {int(k): v for k, v in (config.get('map') or {}).items()}
+    return mapping, config.get('default', KEEP)
+
+def mapping_from_class_names(src_classes_file, dst_classes_file, default=DROP):
+    """
+    두 classes.txt 파일의 클래스 이름을 기준으로 매핑을 만듭니다.
+    (예: 라벨링 도구마다 다른 클래스 순서를 하나로 맞출 때)
+    dst 에 없는 이름은 default 로 처리합니다.
+    """
+    def read_names(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    dst_ids = {name: i for i, name in enumerate(read_names(dst_classes_file))}
+    return {i: dst_ids.get(name, default) for i, name in enumerate(read_names(src_classes_file))}
+
+def build_lookup(mapping, default, max_class):
+    """
+    매핑을 배열 조회 테이블로 만듭니다. 값이 음수면 KEEP/DROP/REJECT 코드입니다.
+    """
+    size = max([max_class] + list(mapping)) + 1
+    lut = np.full(size, _CODES.get(default, default), dtype=np.int64)
+    for src, dst in mapping.items():
+        lut[src] = _CODES.get(dst, dst)
+    return lut
+
+def apply_lookup(classes, lut):
+    """
+    클래스 배열에 조회 테이블을 적용합니다.
+
+    Returns:
+        tuple: (새 클래스 배열, 박스 삭제 마스크, 파일 제외 마스크)
+    """
+    codes = lut[classes]
+    new_classes = np.where(codes == _CODES[KEEP], classes, codes)
+    return new_classes, codes == _CODES[DROP], codes == _CODES[REJECT]
+
+def _parse_class(token):
+    """클래스 토큰을 정수로 변환합니다. 숫자가 아니면 None."""
+    try:
+        value = float(token)
+    except ValueError:
+        return None
+    return int(value) if value.is_integer() and value >= 0 else None
+
+def _write_atomic(path, text):
+    """임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 라벨이 손상되지 않게 저장합니다."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def remap_classes(directory_path, mapping=None, default=KEEP, dry_run=False, images_dir=None, quarantine_dir=None):
+    """
+    폴더 내 모든 라벨의 클래스 번호를 매핑 테이블에 따라 한 번에 바꿉니다.
+
+    모든 라벨의 클래스를 하나의 배열로 모은 뒤 조회 테이블로 변환하고,
+    실제로 바뀐 파일만 원자적으로 다시 씁니다. 좌표 값은 원래 문자열 그대로 유지합니다.
+    "reject" 에 걸린 라벨과 같은 이름의 이미지는 box-pre-processing.py 와 같이 삭제하거나
+    quarantine_dir 로 옮깁니다.
+
+    Args:
+        directory_path (str): 라벨 폴더
+        mapping (dict): {원래 클래스: 새 클래스 | "keep" | "drop" | "reject"}
+        default: 매핑에 없는 클래스 처리 (정수 또는 "keep", "drop", "reject")
+        dry_run (bool): True면 파일을 쓰거나 지우지 않고 결과만 집계
+        images_dir (str): 이미지 폴더. 제외할 라벨이 있으면 필요 (없으면 ValueError)
+        quarantine_dir (str): 지정하면 제외 대상을 삭제하지 않고 이 폴더 아래 labels/, images/ 로 이동
+
+    Returns:
+        dict: {"changed": 바뀐 파일 리스트, "rejected": 제외한 라벨 리스트,
+               "rejected_images": 제외한 이미지 리스트, "dropped_boxes": 삭제된 박스 수}
+    """
+    mapping = mapping or {}
+
+    # 1. 모든 라벨을 읽어 클래스 배열로 모음
+    label_paths = sorted(entry.path for entry in iter_files(directory_path, ('.txt',)))
+    file_rows = []
+    classes = []
+    file_index = []
+    for i, label_path in enumerate(label_paths):
+        with open(label_path, 'r') as file:
+            rows = [line.split() for line in file if line.strip()]
+        file_rows.append(rows)
+        for row in rows:
+            class_id = _parse_class(row[0])
+            # 숫자가 아닌 클래스 토큰은 변경하지 않음
+            classes.append(-1 if class_id is None else class_id)
+            file_index.append(i)
+
+    classes = np.array(classes, dtype=np.int64)
+    file_index = np.array(file_index, dtype=np.int64)
+    valid = classes >= 0
+
+    # 2. 조회 테이블로 한 번에 변환
+    lut = build_lookup(mapping, default, int(classes.max()) if len(classes) else 0)
+    new_classes = classes.copy()
+    drop = np.zeros(len(classes), dtype=bool)
+    reject = np.zeros(len(classes), dtype=bool)
+    new_classes[valid], drop[valid], reject[valid] = apply_lookup(classes[valid], lut)
+
+    changed_box = (new_classes != classes) | drop
+    changed_files = np.bincount(file_index[changed_box], minlength=len(label_paths)) > 0
+    rejected_files = np.bincount(file_index[reject], minlength=len(label_paths)) > 0
+
+    # 3. 제외 대상 라벨과 같은 이름의 이미지 찾기 (이미지 폴더는 한 번만 읽음)
+    rejected = [label_paths[i] for i in np.flatnonzero(rejected_files)]
+    if rejected and images_dir is None:
+        # 라벨만 지우면 이미지가 배경 이미지로 학습에 남으므로 아무것도 바꾸기 전에 중단
+        raise ValueError(f"제외할 라벨 {len(rejected)}개의 이미지를 찾으려면 images_dir 가 필요합니다.")
+    image_index = _box.build_basename_index(images_dir) if rejected else {}
+    rejected_images = [
+        img_path
+        for label_path in rejected
+        for img_path in image_index.get(os.path.splitext(os.path.basename(label_path))[0], [])
+    ]
+
+    result = {
+        "changed": [],
+        "rejected": rejected,
+        "rejected_images": rejected_images,
+        "dropped_boxes": int(drop[~rejected_files[file_index]].sum()) if len(classes) else 0,
+    }
+
+    # 4. 제외 대상 삭제 또는 격리
+    if rejected and not dry_run:
+        label_quarantine = os.path.join(quarantine_dir, 'labels') if quarantine_dir else None
+        image_quarantine = os.path.join(quarantine_dir, 'images') if quarantine_dir else None
+        result["rejected"], label_errors = _box.remove_or_quarantine(rejected, label_quarantine)
+        result["rejected_images"], image_errors = _box.remove_or_quarantine(rejected_images, image_quarantine)
+        for message in label_errors + image_errors:
+            print(message)
+
+    # 5. 바뀐 파일만 다시 쓰기
+    starts = np.searchsorted(file_index, np.arange(len(label_paths)))
+    for i in np.flatnonzero(changed_files & ~rejected_files):
+        rows = file_rows[i]
+        start = starts[i]
+        lines = []
+        for j, row in enumerate(rows):
+            if drop[start + j]:
+                continue
+            if valid[start + j]:
+                row = [str(new_classes[start + j])] + row[1:]
+            lines.append(' '.join(row) + '\n')
+        if not dry_run:
+            _write_atomic(label_paths[i], ''.join(lines))
+        result["changed"].append(label_paths[i])
+
+    return result
+
+def remap_store(store, mapping=None, default=KEEP):
+    """
+    label_store.py 저장소의 클래스를 매핑 테이블로 바꿉니다. 파일을 전혀 읽지 않습니다.
+
+    Returns:
+        tuple: (새 저장소, 제외 대상 이미지 마스크)
+    """
+    from label_store import box_image_index, subset_store
+
+    classes = np.asarray(store["classes"], dtype=np.int64)
+    lut = build_lookup(mapping or {}, default, int(classes.max()) if len(classes) else 0)
+    new_classes, drop, reject = apply_lookup(classes, lut)
+
+    image_index = box_image_index(store)
+    rejected = np.bincount(image_index[reject], minlength=len(store["names"])) > 0
+
+    # 박스 삭제는 이미지별 박스 수가 바뀌므로 offsets 를 다시 계산
+    kept_counts = np.bincount(image_index[~drop], minlength=len(store["names"]))
+    offsets = np.zeros(len(kept_counts) + 1, dtype=np.int64)
+    np.cumsum(kept_counts, out=offsets[1:])
+    remapped = {
+        "names": list(store["names"]),
+        "offsets": offsets,
+        "classes": new_classes[~drop].astype(np.int32),
+        "boxes": np.asarray(store["boxes"])[~drop],
+    }
+    return subset_store(remapped, ~rejected), rejected
 
 def change_class_number(directory_path, target_class):
-    # 디렉토리 내의 모든 파일 확인
-    for filename in os.listdir(directory_path):
-        # txt 파일만 처리
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory_path, filename)
-            
-            # 파일 내용 읽기
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-            
-            # 수정된 내용을 저장할 리스트
-            modified_lines = []
-            
-            # 각 줄 처리
-            for line in lines:
-                # 공백으로 분리된 값들
-                values = line.strip().split()
-                
-                # 첫 번째 값이 클래스 번호
-                if values and values[0].isdigit():
-                    class_number = int(values[0])
-                    
-                    # 원하는 클래스 번호가 아니면 변경
-                    if class_number != target_class:
-                        values[0] = str(target_class)
-                
-                # 수정된 줄 다시 조합
-                modified_line = ' '.join(values) + '\n'
-                modified_lines.append(modified_line)
-            
-            # 수정된 내용을 파일에 쓰기
-            with open(file_path, 'w') as file:
-                file.writelines(modified_lines)
-            
-            print(f"파일 {filename} 처리 완료")
+    """모든 라벨의 클래스를 target_class 하나로 바꿉니다. 바뀐 파일만 다시 씁니다."""
+    result = remap_classes(directory_path, default=target_class)
+    for label_path in result["changed"]:
+        print(f"파일 {os.path.basename(label_path)} 처리 완료")
+    return result
 
 # 사용 예시
 if __name__ == "__main__":
-    # 매개변수 설정: 폴더 경로, 변경할 원래 클래스 번호, 새로 설정할 클래스 번호
+    # 매개변수 설정: 폴더 경로, 새로 설정할 클래스 번호
     folder_path = "labels"  # 실제 폴더 경로로 변경하세요
     target_class = 0  # 새로 설정할 클래스 번호
-    
-    change_class_number(folder_path, target_class)
\ No newline at end of file
+
+    change_class_number(folder_path, target_class)
+
+    # 여러 클래스를 합치거나 지울 때는 매핑 테이블 사용:
+    # mapping, default = load_mapping("class_map.yaml")
+    # result = remap_classes(folder_path, mapping, default, images_dir="images", quarantine_dir="quarantine")
+    # print(f"변경 {len(result['changed'])}개, 제외 {len(result['rejected'])}개")
@@ -1,79 +1,226 @@
 import os
 import random
-import shutil
 from pathlib import Path
-import sys
+from collections import Counter, defaultdict
+from dataset_scan import list_file_names, basename_index
+from file_link import place_file, write_file_list
 
-def split_data(images_dir='images', labels_dir='labels', split_ratio=(0.7, 0.2, 0.1)):
+# custom_data.yaml 은 'val' 을 읽으므로 검증 세트 폴더/목록 이름도 'val' 로 맞춤
+# (이전 버전은 'valid' 폴더를 만들어 YAML 경로와 맞지 않았음)
+SUBSET_NAMES = ('train', 'val', 'test')
+
+def read_label_classes(label_path):
+    """라벨 파일에 등장하는 클래스 ID 목록을 반환합니다."""
+    classes = []
+    with open(label_path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                try:
+                    classes.append(int(float(parts[0])))
+                except ValueError:
+                    continue
+    return classes
+
+def load_class_names(classes_file):
+    """classes.txt (한 줄에 클래스 이름 하나) 를 {ID: 이름} 으로 읽습니다."""
+    with open(classes_file, 'r', encoding='utf-8') as f:
+        names = [line.strip() for line in f if line.strip()]
+    return dict(enumerate(names))
+
+def split_indices(count, split_ratio):
+    """count 개를 split_ratio 로 나눌 때 (train 끝, val 끝) 인덱스를 계산합니다."""
+    train_end = int(count * split_ratio[0])
+    valid_end = train_end + int(count * split_ratio[1])
+    return train_end, valid_end
+
+def make_units(image_files, groups=None):
+    """
+    분할 단위를 만듭니다. groups ({파일: 그룹 번호}, dedup.py) 가 있으면 같은 그룹의
+    이미지를 한 단위로 묶어 근접 중복 이미지가 서로 다른 세트로 나뉘지 않게 합니다.
+    """
+    if groups is None:
+        return [[file] for file in image_files]
+    units = {}
+    for file in image_files:
+        units.setdefault(groups.get(file, file), []).append(file)
+    return list(units.values())
+
+def cut_units(units, split_ratio):
+    """정해진 순서의 단위를 이미지 수 누적으로 train/val/test 로 자릅니다."""
+    train_end, valid_end = split_indices(sum(len(unit) for unit in units), split_ratio)
+    subsets = ([], [], [])
+    count = 0
+    for unit in units:
+        index = 0 if count < train_end else 1 if count < valid_end else 2
+        subsets[index].extend(unit)
+        count += len(unit)
+    return subsets
+
+def split_units(units, split_ratio, rng):
+    """
+    단위를 섞은 뒤 이미지 수 누적으로 세트 경계를 정합니다.
+    단위가 모두 이미지 한 개면 파일 목록을 섞어서 자르는 것과 결과가 같습니다.
+    """
+    rng.shuffle(units)
+    return cut_units(units, split_ratio)
+
+def stratified_split(image_files, file_classes, split_ratio, rng, groups=None):
+    """
+    클래스 분포가 세트마다 비슷하도록 나눕니다.
+
+    각 단위(이미지 또는 중복 그룹)를 그 단위에 있는 클래스 중 전체에서 가장 드문 클래스
+    (박스가 없으면 -1)로 묶고, 묶음마다 섞은 뒤 묶음 안의 순서를 0~1 위치로 고르게 펼쳐서
+    모든 묶음을 한 줄로 엇갈려 놓고 전체 기준으로 한 번만 자릅니다. 묶음마다 따로 자르면
+    작은 묶음의 나머지가 매번 test 로 가서 드문 클래스가 test 에 몰리기 때문입니다.
+    위치의 시작점은 묶음마다 무작위라서 단위가 하나뿐인 묶음도 비율대로 세트가 정해집니다.
+    """
+    class_counts = Counter(c for classes in file_classes.values() for c in classes)
+
+    buckets = defaultdict(list)
+    for unit in make_units(image_files, groups):
+        classes = {c for file in unit for c in file_classes[file]}
+        key = min(classes, key=lambda c: (class_counts[c], c)) if classes else -1
+        buckets[key].append(unit)
+
+    order = []
+    for bucket_index, key in enumerate(sorted(buckets)):
+        units = buckets[key]
+        rng.shuffle(units)
+        offset = rng.random()
+        order.extend(((i + offset) / len(units), bucket_index, unit) for i, unit in enumerate(units))
+    order.sort(key=lambda item: item[:2])
+    return cut_units([unit for _, _, unit in order], split_ratio)
+
+def write_data_yaml(yaml_path, list_files, class_names):
+    """Ultralytics 데이터셋 YAML 을 작성합니다 (train/val/test 에 파일 목록 지정)."""
+    lines = [f"path: {os.path.abspath(os.path.dirname(yaml_path) or '.')} # root path"]
+    for subset in SUBSET_NAMES:
+        lines.append(f"{subset}: {os.path.basename(list_files[subset])}")
+    lines.append("")
+    lines.append("names:")
+    for class_id in sorted(class_names):
+        lines.append(f"  {class_id}: {class_names[class_id]}")
+    with open(yaml_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def split_data(images_dir='images', labels_dir='labels', split_ratio=(0.7, 0.2, 0.1), link_mode="copy",
+               seed=None, stratify=False, list_dir='.', classes_file='classes.txt', dedup_distance=None,
+               workers=1):
+    """
+    이미지와 라벨을 train/val/test 로 나눕니다.
+
+    Args:
+        images_dir (str): 이미지 폴더
+        labels_dir (str): 라벨 폴더
+        split_ratio (tuple): (train, val, test) 비율
+        link_mode (str): 파일 배치 방식 ("copy", "hardlink", "reflink", "symlink", "list").
+            "list"면 파일을 옮기지 않고 list_dir 에 train.txt, val.txt, test.txt 이미지 목록과
+            이를 가리키는 data.yaml 만 작성합니다. 라벨은 Ultralytics 가 경로의
+            images -> labels 치환으로 찾습니다.
+        seed (int): 셔플 시드. 지정하면 같은 입력에 대해 항상 같은 분할이 나옵니다.
+        stratify (bool): 라벨의 클래스 분포를 기준으로 층화 분할
+        list_dir (str): "list" 모드에서 목록과 YAML 을 저장할 폴더
+        classes_file (str): "list" 모드 YAML 의 names 에 쓸 클래스 이름 파일 (없으면 class0, class1...)
+        dedup_distance (int): 지정하면 dedup.py 로 지각 해시 거리 이 값 이내의 이미지를 한 그룹으로 묶어
+            그룹 단위로 분할합니다 (동영상 프레임의 train/val 누수 방지)
+        workers (int): dedup_distance 사용 시 해시 계산 병렬 프로세스 수
+    """
     # 비율의 합이 1인지 확인
     assert abs(sum(split_ratio) - 1.0) < 0.001, "분할 비율의 합은 1이어야 합니다."
-    
-    # 이미지 파일 목록 가져오기
-    image_files = [f for f in os.listdir(images_dir) if os.path.isfile(os.path.join(images_dir, f))]
-    
-    # 랜덤하게 섞기
-    random.shuffle(image_files)
-    
-    # 분할 인덱스 계산
-    train_end = int(len(image_files) * split_ratio[0])
-    valid_end = train_end + int(len(image_files) * split_ratio[1])
-    
-    # 세트 분할
-    train_files = image_files[:train_end]
-    valid_files = image_files[train_end:valid_end]
-    test_files = image_files[valid_end:]
-    
+
+    # 이미지 파일 목록 가져오기 (정렬해서 시드가 같으면 결과도 같도록 함)
+    image_files = list_file_names(images_dir, sort=True)
+
+    # 라벨이 없는 이미지는 분할 전에 모두 찾아서 제외 (라벨 폴더는 한 번만 읽음)
+    label_index = basename_index(labels_dir, ('.txt',))
+    label_paths = {f: os.path.join(labels_dir, os.path.splitext(f)[0] + '.txt') for f in image_files}
+    missing = [f for f in image_files if os.path.splitext(f)[0] not in label_index]
+    for file in missing:
+        print(f"경고: {label_paths[file]} 레이블 파일을 찾을 수 없습니다. 제외합니다.")
+    if missing:
+        missing_set = set(missing)
+        image_files = [f for f in image_files if f not in missing_set]
+
+    rng = random.Random(seed)
+
+    groups = None
+    if dedup_distance is not None:
+        from dedup import duplicate_groups, CACHE_NAME
+
+        groups = duplicate_groups(images_dir, dedup_distance, workers=workers, cache_path=CACHE_NAME)
+        grouped = len(image_files) - len({groups.get(f, f) for f in image_files})
+        print(f"근접 중복 그룹으로 묶인 이미지: {grouped}개 (같은 그룹은 같은 세트로 분할)")
+
+    if stratify:
+        file_classes = {f: read_label_classes(label_paths[f]) for f in image_files}
+        train_files, valid_files, test_files = stratified_split(image_files, file_classes, split_ratio, rng, groups)
+    else:
+        # 랜덤하게 섞은 뒤 비율대로 분할 (그룹이 있으면 그룹 단위)
+        train_files, valid_files, test_files = split_units(make_units(image_files, groups), split_ratio, rng)
+
     # 각 세트별 데이터 복사 함수
     def copy_files(files, subset):
         # 이미지 폴더 생성
         img_target_dir = os.path.join(images_dir, subset)
         Path(img_target_dir).mkdir(parents=True, exist_ok=True)
-        
+
         # 레이블 폴더 생성
         label_target_dir = os.path.join(labels_dir, subset)
         Path(label_target_dir).mkdir(parents=True, exist_ok=True)
-        
+
         for file in files:
-            # 이미지 파일 이름에서 확장자 제거
-            file_base = os.path.splitext(file)[0]
-            
             # 이미지 파일 복사
             img_src = os.path.join(images_dir, file)
             img_dst = os.path.join(img_target_dir, file)
-            shutil.copy2(img_src, img_dst)
-            
+            place_file(img_src, img_dst, link_mode)
+
             # 레이블 파일 복사 (txt 확장자로 가정)
-            label_file = file_base + '.txt'
-            label_src = os.path.join(labels_dir, label_file)
-            label_dst = os.path.join(label_target_dir, label_file)
-            
-            # 레이블 파일이 존재하는지 확인
-            if os.path.exists(label_src):
-                shutil.copy2(label_src, label_dst)
-            else:
-                print(f"경고: {label_src} 레이블 파일을 찾을 수 없습니다.")
-                sys.exit(1)
-    
-    # 각 세트별로 파일 복사
-    copy_files(train_files, 'train')
-    copy_files(valid_files, 'valid')
-    copy_files(test_files, 'test')
-    
+            label_src = label_paths[file]
+            label_dst = os.path.join(label_target_dir, os.path.basename(label_src))
+            place_file(label_src, label_dst, link_mode)
+
+    subsets = dict(zip(SUBSET_NAMES, (train_files, valid_files, test_files)))
+
+    if link_mode == "list":
+        # 파일을 옮기지 않고 목록과 YAML 만 작성
+        list_files = {subset: os.path.join(list_dir, f"{subset}.txt") for subset in SUBSET_NAMES}
+        for subset, files in subsets.items():
+            write_file_list(list_files[subset], [os.path.join(images_dir, file) for file in files])
+
+        if os.path.exists(classes_file):
+            class_names = load_class_names(classes_file)
+        else:
+            observed = {c for f in image_files for c in read_label_classes(label_paths[f])}
+            class_names = {c: f"class{c}" for c in observed}
+        yaml_path = os.path.join(list_dir, 'data.yaml')
+        write_data_yaml(yaml_path, list_files, class_names)
+        print(f"파일 목록과 데이터셋 설정을 작성했습니다: '{yaml_path}'")
+    else:
+        # 각 세트별로 파일 복사
+        for subset, files in subsets.items():
+            copy_files(files, subset)
+
     # 결과 출력
     print(f"데이터 분할 완료:")
     print(f"  - 학습 세트: {len(train_files)} 파일")
     print(f"  - 검증 세트: {len(valid_files)} 파일")
     print(f"  - 테스트 세트: {len(test_files)} 파일")
+    if missing:
+        print(f"  - 라벨 없음으로 제외: {len(missing)} 파일")
 
 if __name__ == "__main__":
     # 기본 디렉토리 구조가 존재하는지 확인
     if not os.path.exists('images'):
         print("오류: 'images' 폴더가 존재하지 않습니다.")
         exit(1)
-    
+
     if not os.path.exists('labels'):
         print("오류: 'labels' 폴더가 존재하지 않습니다.")
         exit(1)
-    
+
     # 7:2:1 비율로 데이터 분할
-    split_data(split_ratio=(0.7, 0.2, 0.1))
\ No newline at end of file
+    # 파일 배치 방식: "copy", "hardlink", "reflink", "symlink", "list"
+    # "list" 는 파일 복사 없이 train.txt/val.txt/test.txt 와 data.yaml 만 작성
+    # dedup_distance 를 지정하면 거의 같은 프레임을 같은 세트로 묶음 (예: dedup_distance=6)
+    split_data(split_ratio=(0.7, 0.2, 0.1), link_mode="copy", seed=0, stratify=False)
@@ -1,92 +1,174 @@
 import os
 import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import iter_files
 
-def clean_box_data(labels_dir='labels', images_dir='images'):
+# 유효한 클래스 ID 목록
+VALID_CLASS_IDS = {'0', '1', '2', '3', '7'}
+
+def build_basename_index(directory):
+    """
+    디렉토리를 한 번만 읽어 {확장자 제외 파일 이름: [파일 경로, ...]} 인덱스를 만듭니다.
+    (라벨마다 os.listdir 를 반복하지 않기 위함)
+    """
+    index = defaultdict(list)
+    for entry in iter_files(directory):
+        index[os.path.splitext(entry.name)[0]].append(entry.path)
+    return index
+
+def find_invalid_labels(label_paths, valid_class_ids):
+    """
+    라벨 파일 목록에서 유효하지 않은 클래스가 있는 파일을 찾습니다.
+    병렬 실행 시 워커 프로세스에서 실행되므로 출력 대신 결과를 반환합니다.
+
+    Returns:
+        tuple: (유효하지 않은 라벨 경로 리스트, 오류 메시지 리스트)
+    """
+    invalid = []
+    errors = []
+    for label_path in label_paths:
+        try:
+            with open(label_path, 'r') as f:
+                # 줄이 비어있지 않고 첫 번째 값이 유효한 클래스 ID가 아닌 경우
+                if any(parts and parts[0] not in valid_class_ids for parts in map(str.split, f)):
+                    invalid.append(label_path)
+        except Exception as e:
+            errors.append(f"파일 {os.path.basename(label_path)} 처리 중 오류 발생: {e}")
+    return invalid, errors
+
+def _find_invalid_labels_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return find_invalid_labels(*args)
+
+def find_invalid_labels_from_store(store_dir, labels_dir, valid_class_ids):
+    """
+    label_store.py 로 만든 저장소에서 유효하지 않은 클래스가 있는 라벨을 한 번에 찾습니다.
+    저장소의 클래스는 정수이므로 '0.0' 같은 표기도 0 으로 취급합니다.
+    """
+    from label_store import load_label_store, images_with_invalid_classes
+
+    store = load_label_store(store_dir)
+    mask = images_with_invalid_classes(store, {int(c) for c in valid_class_ids})
+    return [
+        os.path.join(labels_dir, *name.split('/')) + '.txt'
+        for name, invalid in zip(store["names"], mask) if invalid
+    ]
+
+def remove_or_quarantine(paths, quarantine_dir=None):
+    """
+    파일들을 삭제하거나 quarantine_dir 로 옮깁니다.
+
+    Returns:
+        tuple: (처리된 경로 리스트, 오류 메시지 리스트)
+    """
+    if quarantine_dir:
+        os.makedirs(quarantine_dir, exist_ok=True)
+
+    done = []
+    errors = []
+    for path in paths:
+        try:
+            if quarantine_dir:
+                shutil.move(path, os.path.join(quarantine_dir, os.path.basename(path)))
+            else:
+                os.remove(path)
+            done.append(path)
+        except Exception as e:
+            errors.append(f"파일 {os.path.basename(path)} 삭제 중 오류 발생: {e}")
+    return done, errors
+
+def clean_box_data(labels_dir='labels', images_dir='images', valid_class_ids=VALID_CLASS_IDS,
+                   dry_run=False, quarantine_dir=None, workers=1, chunk_size=1000, store_dir=None):
     """
     box-labels 디렉토리 내의 txt 파일들을 검사하여 조건에 맞지 않는 파일과
     해당 파일과 동일한 이름의 이미지 파일을 삭제합니다.
-    
+
     조건: 파일 내 각 줄의 첫 번째 숫자가 0, 1, 2, 3, 7 중 하나여야 함
-    
+
     Args:
         labels_dir (str): 라벨 파일이 있는 디렉토리 경로
         images_dir (str): 이미지 파일이 있는 디렉토리 경로
-    
+        valid_class_ids (set): 유효한 클래스 ID (문자열 또는 정수)
+        dry_run (bool): True면 삭제하지 않고 삭제 대상만 출력
+        quarantine_dir (str): 지정하면 삭제 대신 이 폴더 아래 labels/, images/ 로 이동
+        workers (int): 라벨 검사 병렬 프로세스 수
+        chunk_size (int): 워커 하나가 한 번에 검사할 라벨 파일 수
+        store_dir (str): label_store.py 저장소 경로. 지정하면 라벨 파일을 읽지 않고 저장소로 검사
+
     Returns:
         tuple: 삭제된 라벨 파일 수, 삭제된 이미지 파일 수
     """
-    # 유효한 클래스 ID 목록
-    valid_class_ids = {'0', '1', '2', '3', '7'}
-    
-    # 삭제된 파일 카운터
-    deleted_label_count = 0
-    deleted_image_count = 0
-    
-    # box-labels 디렉토리 내의 모든 txt 파일 검사
-    for filename in os.listdir(labels_dir):
-        if not filename.endswith('.txt'):
-            continue
-            
-        label_path = os.path.join(labels_dir, filename)
-        
-        # 파일 삭제 여부를 결정하는 플래그
-        should_delete = False
-        
-        try:
-            with open(label_path, 'r') as f:
-                for line in f:
-                    # 각 줄을 공백으로 분리
-                    parts = line.strip().split()
-                    
-                    # 줄이 비어있지 않고 첫 번째 값이 유효한 클래스 ID가 아닌 경우
-                    if parts and parts[0] not in valid_class_ids:
-                        should_delete = True
-                        break
-        except Exception as e:
-            print(f"파일 {filename} 처리 중 오류 발생: {e}")
-            continue
-            
-        # 조건에 맞지 않는 경우 파일 삭제
-        if should_delete:
-            # 매칭되는 이미지 파일 이름 생성 (확장자가 다를 수 있음)
-            image_basename = os.path.splitext(filename)[0]
-            
-            # 라벨 파일 삭제
-            try:
-                os.remove(label_path)
-                deleted_label_count += 1
-                print(f"라벨 파일 삭제됨: {filename}")
-            except Exception as e:
-                print(f"라벨 파일 {filename} 삭제 중 오류 발생: {e}")
-            
-            # 매칭되는 이미지 파일 검색 및 삭제
-            for img_file in os.listdir(images_dir):
-                img_basename = os.path.splitext(img_file)[0]
-                if img_basename == image_basename:
-                    try:
-                        img_path = os.path.join(images_dir, img_file)
-                        os.remove(img_path)
-                        deleted_image_count += 1
-                        print(f"이미지 파일 삭제됨: {img_file}")
-                    except Exception as e:
-                        print(f"이미지 파일 {img_file} 삭제 중 오류 발생: {e}")
-    
-    return deleted_label_count, deleted_image_count
+    valid_class_ids = {str(c) for c in valid_class_ids}
+
+    # 1. 삭제할 라벨 찾기
+    if store_dir:
+        invalid_labels = find_invalid_labels_from_store(store_dir, labels_dir, valid_class_ids)
+    else:
+        label_paths = sorted(entry.path for entry in iter_files(labels_dir, ('.txt',)))
+        chunks = [(label_paths[i:i + chunk_size], valid_class_ids) for i in range(0, len(label_paths), chunk_size)]
+
+        invalid_labels = []
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_find_invalid_labels_args, chunks))
+        else:
+            results = map(_find_invalid_labels_args, chunks)
+        for invalid, errors in results:
+            invalid_labels.extend(invalid)
+            for message in errors:
+                print(message)
+
+    # 2. 매칭되는 이미지 파일 찾기 (이미지 폴더는 한 번만 읽음, 확장자가 다를 수 있음)
+    image_index = build_basename_index(images_dir)
+    matching_images = [
+        img_path
+        for label_path in invalid_labels
+        for img_path in image_index.get(os.path.splitext(os.path.basename(label_path))[0], [])
+    ]
+
+    if dry_run:
+        print(f"[DRY-RUN] 삭제 대상 라벨 {len(invalid_labels)}개, 이미지 {len(matching_images)}개")
+        for path in invalid_labels + matching_images:
+            print(f"  {path}")
+        return 0, 0
+
+    # 3. 한 번에 삭제 또는 격리
+    label_quarantine = os.path.join(quarantine_dir, 'labels') if quarantine_dir else None
+    image_quarantine = os.path.join(quarantine_dir, 'images') if quarantine_dir else None
+
+    deleted_labels, label_errors = remove_or_quarantine(invalid_labels, label_quarantine)
+    deleted_images, image_errors = remove_or_quarantine(matching_images, image_quarantine)
+    for message in label_errors + image_errors:
+        print(message)
+
+    action = "격리됨" if quarantine_dir else "삭제됨"
+    for path in deleted_labels:
+        print(f"라벨 파일 {action}: {os.path.basename(path)}")
+    for path in deleted_images:
+        print(f"이미지 파일 {action}: {os.path.basename(path)}")
+
+    return len(deleted_labels), len(deleted_images)
 
 if __name__ == "__main__":
     # 디렉토리가 존재하는지 확인
     if not os.path.exists('labels'):
         print("box-labels 디렉토리가 존재하지 않습니다.")
         exit(1)
-        
+
     if not os.path.exists('images'):
         print("box-images 디렉토리가 존재하지 않습니다.")
         exit(1)
-    
+
     # 함수 실행
-    deleted_labels, deleted_images = clean_box_data()
-    
+    # dry_run=True 로 먼저 삭제 대상을 확인하고, quarantine_dir 를 지정하면 삭제 대신 이동
+    deleted_labels, deleted_images = clean_box_data(
+        dry_run=False,
+        quarantine_dir=None,
+        workers=os.cpu_count() or 1,
+    )
+
     # 결과 출력
     print(f"\n작업 완료:")
     print(f"삭제된 라벨 파일 수: {deleted_labels}")
-    print(f"삭제된 이미지 파일 수: {deleted_images}")
\ No newline at end of file
+    print(f"삭제된 이미지 파일 수: {deleted_images}")
@@ -1,5 +1,6 @@
 import os
-import glob
+from collections import defaultdict
+from dataset_scan import iter_files
 
 def remove_empty_files_and_matching_images():
     """
@@ -18,19 +19,23 @@ def remove_empty_files_and_matching_images():
     removed_txt_count = 0
     removed_img_count = 0
     
+    # 이미지 폴더는 한 번만 읽어 {확장자 제외 이름: [이미지 경로]} 인덱스를 만듦
+    # (빈 라벨마다 확장자별로 os.path.exists 를 호출하지 않기 위함)
+    image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff')
+    image_index = defaultdict(list)
+    for entry in iter_files(images_dir, image_extensions):
+        image_index[os.path.splitext(entry.name)[0]].append(entry.path)
+
     # labels 폴더 내의 모든 txt 파일 처리
-    for txt_path in glob.glob(os.path.join(labels_dir, "*.txt")):
-        # 파일 크기 확인
-        if os.path.getsize(txt_path) == 0:
-            base_name = os.path.basename(txt_path)
-            name_without_ext = os.path.splitext(base_name)[0]
+    for entry in iter_files(labels_dir, ('.txt',)):
+        txt_path = entry.path
+        # 파일 크기 확인 (DirEntry.stat 은 Windows 에서는 디렉토리를 읽을 때 받은 정보를 쓰지만,
+        # POSIX 에서는 파일마다 stat 시스템 콜을 한 번 호출함)
+        if entry.stat().st_size == 0:
+            name_without_ext = os.path.splitext(entry.name)[0]
             
             # 매칭되는 이미지 파일 찾기
-            matching_images = []
-            for ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff']:
-                img_path = os.path.join(images_dir, name_without_ext + ext)
-                if os.path.exists(img_path):
-                    matching_images.append(img_path)
+            matching_images = image_index.get(name_without_ext, [])
             
             # 빈 txt 파일 제거
             try:
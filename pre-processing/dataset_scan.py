@@ -0,0 +1,77 @@
+"""
+전처리 스크립트 공통 디렉토리 스캐너.
+
+os.listdir + os.path.isfile/exists 조합은 파일마다 stat 시스템 콜을 추가로 호출하고,
+전체 목록을 먼저 리스트로 만들어 메모리를 사용합니다. 여기서는 os.scandir 가
+디렉토리를 읽을 때 함께 돌려주는 파일 종류 정보(DirEntry.is_file)를 그대로 사용하고,
+결과를 제너레이터로 하나씩 돌려줍니다.
+
+이미지와 라벨을 짝지을 때는 라벨 폴더를 한 번 읽어 이름 집합만 메모리에 두고,
+이미지 폴더는 스트리밍하면서 집합으로 짝을 찾으므로 파일마다 exists 를 호출하지 않습니다.
+"""
+
+import os
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def iter_files(directory, extensions=None):
+    """
+    directory 의 파일을 os.DirEntry 로 하나씩 반환합니다 (하위 폴더 제외, 순서는 파일시스템 순서).
+
+    Args:
+        directory (str): 폴더 경로
+        extensions (tuple): 소문자 확장자 튜플 (예: (".jpg", ".png")). None이면 모든 파일
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if extensions is not None and not entry.name.lower().endswith(extensions):
+                continue
+            # DirEntry.is_file 은 대부분의 파일시스템에서 추가 stat 없이 동작함
+            if entry.is_file():
+                yield entry
+
+
+def list_file_names(directory, extensions=None, sort=False):
+    """iter_files 의 파일 이름 리스트 (목록이 꼭 필요한 셔플/정렬용)."""
+    names = [entry.name for entry in iter_files(directory, extensions)]
+    if sort:
+        names.sort()
+    return names
+
+
+def basename_index(directory, extensions=None):
+    """
+    {확장자 제외 이름: 경로} 인덱스를 만듭니다. 같은 이름이 여러 개면 먼저 읽힌 것을 사용합니다.
+    """
+    index = {}
+    for entry in iter_files(directory, extensions):
+        index.setdefault(os.path.splitext(entry.name)[0], entry.path)
+    return index
+
+
+def iter_pairs(images_dir, labels_dir, image_extensions=IMAGE_EXTENSIONS, label_extensions=(".txt",),
+               include_unlabeled=False):
+    """
+    이미지와 같은 이름의 라벨을 한 번의 스캔으로 짝지어 (이름, 이미지 경로, 라벨 경로) 를 반환합니다.
+
+    Args:
+        images_dir (str): 이미지 폴더
+        labels_dir (str): 라벨 폴더 (images_dir 와 같아도 됨)
+        image_extensions (tuple): 이미지 확장자
+        label_extensions (tuple): 라벨 확장자. 여러 개면 앞쪽 확장자를 우선 사용
+        include_unlabeled (bool): True면 라벨이 없는 이미지도 라벨 경로 None 으로 반환
+    """
+    labels = {}
+    priority = {ext: i for i, ext in enumerate(label_extensions)}
+    for entry in iter_files(labels_dir, label_extensions):
+        base_name, ext = os.path.splitext(entry.name)
+        current = labels.get(base_name)
+        if current is None or priority[ext.lower()] < priority[os.path.splitext(current)[1].lower()]:
+            labels[base_name] = entry.path
+
+    for entry in iter_files(images_dir, image_extensions):
+        base_name = os.path.splitext(entry.name)[0]
+        label_path = labels.get(base_name)
+        if label_path is not None or include_unlabeled:
+            yield base_name, entry.path, label_path
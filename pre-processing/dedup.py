@@ -0,0 +1,336 @@
+"""
+지각 해시(perceptual hash)로 거의 같은 이미지를 찾고 train/val/test 간 누수를 검사.
+
+동영상에서 뽑은 프레임은 이웃 프레임이 거의 같아서, 6-random-divide.py 가 섞어서 나누면
+같은 장면이 train 과 val/test 에 함께 들어가 검증 지표가 부풀려집니다.
+
+    - 해시 계산: 64비트 pHash (32x32 흑백 DCT 의 저주파 8x8 을 중앙값과 비교) 또는 dHash.
+      워커가 파일을 한 번 읽어 SHA-1 과 지각 해시를 함께 계산하고, SHA-1 을 키로 디스크 캐시에
+      저장합니다. 파일 크기/수정 시각이 같으면 파일을 다시 읽지 않습니다.
+    - 근접 검색: 해밍 거리 BK-tree. 모든 쌍을 비교하는 O(n²) 대신 거리 max_distance 이내
+      후보만 방문합니다.
+    - 그룹: 거리 이내로 이어진 이미지를 union-find 로 묶어 6-random-divide.py 의 그룹 단위 분할에 사용합니다.
+
+사용 예시:
+    python dedup.py leakage datasets/images --max-distance 6
+    python dedup.py groups images --max-distance 6 --report groups.csv
+"""
+
+import os
+import csv
+import json
+import hashlib
+import argparse
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import IMAGE_EXTENSIONS, iter_files
+
+CACHE_NAME = ".phash_cache.json"
+CACHE_VERSION = 1
+HASH_METHODS = ("phash", "dhash")
+
+
+def phash(img):
+    """흑백 이미지의 64비트 pHash 를 정수로 반환합니다."""
+    small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    # DC 성분은 밝기 전체를 나타내므로 중앙값 계산에서 제외
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def dhash(img):
+    """흑백 이미지의 64비트 dHash (가로 방향 밝기 변화) 를 정수로 반환합니다."""
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int(np.packbits(bits.flatten()).view('>u8')[0])
+
+
+def hamming(a, b):
+    """두 해시의 해밍 거리. (노트북 커널이 Python 3.9 라 int.bit_count 대신 사용)"""
+    return bin(a ^ b).count('1')
+
+
+def hash_file(path, method="phash"):
+    """
+    파일을 한 번만 읽어 SHA-1 과 지각 해시를 함께 계산합니다. 워커 프로세스에서 실행됩니다.
+    해시에는 32x32 면 충분하므로 1/4 크기로 바로 흑백 디코딩합니다.
+
+    Returns:
+        tuple: (SHA-1 16진 문자열, 해시 정수 또는 None (읽을 수 없는 이미지))
+    """
+    with open(path, 'rb') as f:
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+    sha1 = hashlib.sha1(data).hexdigest()
+    if not len(data):
+        return sha1, None
+    img = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None:
+        img = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return sha1, None
+    return sha1, phash(img) if method == "phash" else dhash(img)
+
+
+def _hash_file_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return hash_file(*args)
+
+
+def load_cache(cache_path):
+    """해시 캐시를 불러옵니다. 없거나 손상되었으면 빈 캐시를 반환합니다."""
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                return cache
+        except (OSError, ValueError) as e:
+            print(f"[WARN] 해시 캐시를 읽을 수 없습니다. 다시 계산합니다: {e}")
+    return {"version": CACHE_VERSION, "files": {}, "hashes": {}}
+
+
+def save_cache(cache_path, cache):
+    """캐시를 임시 파일에 쓴 뒤 교체합니다."""
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def hash_images(paths, method="phash", workers=1, cache_path=None):
+    """
+    이미지 목록의 지각 해시를 계산합니다.
+
+    캐시는 {"files": {경로: 크기/수정 시각/SHA-1}, "hashes": {"<method>:<SHA-1>": 해시}} 형태로,
+    크기/수정 시각이 같은 파일은 다시 읽지 않습니다. 새 파일은 워커에서 한 번 읽어 SHA-1 과
+    지각 해시를 함께 계산합니다.
+
+    Args:
+        paths (list): 이미지 경로 목록
+        method (str): "phash" 또는 "dhash"
+        workers (int): 병렬 프로세스 수
+        cache_path (str): 캐시 파일 경로 (None이면 캐시 사용 안 함)
+
+    Returns:
+        dict: {경로: 해시 정수}. 읽을 수 없는 이미지는 제외
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"지원하지 않는 해시 방식입니다: {method}")
+
+    cache = load_cache(cache_path)
+    files = {}
+    keys = {}
+    todo = {}  # 절대 경로 -> 경로 (크기/수정 시각이 바뀌었거나 이 방식의 해시가 없는 파일)
+    for path in paths:
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        previous = cache["files"].get(key)
+        if (previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns
+                and f"{method}:{previous['sha1']}" in cache["hashes"]):
+            files[key] = previous
+            keys[path] = f"{method}:{previous['sha1']}"
+        else:
+            files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            todo.setdefault(key, path)
+
+    # SHA-1 과 지각 해시를 워커에서 함께 계산 (파일을 한 번만 읽음)
+    todo = sorted(todo.items())
+    tasks = [(path, method) for _, path in todo]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            values = list(executor.map(_hash_file_args, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        values = [_hash_file_args(task) for task in tasks]
+    for (key, _), (sha1, value) in zip(todo, values):
+        files[key]["sha1"] = sha1
+        cache["hashes"][f"{method}:{sha1}"] = None if value is None else f"{value:016x}"
+    for path in paths:
+        keys.setdefault(path, f"{method}:{files[os.path.abspath(path)]['sha1']}")
+
+    if cache_path:
+        # 다른 폴더를 검사한 기록도 유지해서 train/val/test 를 따로 검사해도 캐시를 공유함
+        cache["files"] = {**cache["files"], **files}
+        save_cache(cache_path, cache)
+
+    hashes = {}
+    for path in paths:
+        value = cache["hashes"].get(keys[path])
+        if value is None:
+            print(f"[WARN] 이미지를 읽을 수 없습니다: '{path}'")
+            continue
+        hashes[path] = int(value, 16)
+    return hashes
+
+
+class BKTree:
+    """해밍 거리 BK-tree. 삼각 부등식으로 거리 범위 밖의 가지를 건너뜁니다."""
+
+    def __init__(self):
+        self.root = None  # [해시, [항목...], {거리: 자식 노드}]
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def query(self, value, max_distance):
+        """value 에서 max_distance 이내인 [(거리, 항목)] 을 반환합니다."""
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in node[2].items() if low <= d <= high)
+        return results
+
+
+def find_near_duplicates(hashes, max_distance=6):
+    """
+    해밍 거리 max_distance 이내인 이미지 쌍을 찾습니다.
+
+    Args:
+        hashes (dict): {경로: 해시}
+        max_distance (int): 64비트 기준 허용 거리 (0이면 해시가 완전히 같은 경우만)
+
+    Returns:
+        list: [(경로 a, 경로 b, 거리)], 각 쌍은 한 번만
+    """
+    tree = BKTree()
+    pairs = []
+    # 트리에 넣기 전에 먼저 검색하면 각 쌍을 한 번씩만 찾음
+    for path in sorted(hashes):
+        for distance, other in tree.query(hashes[path], max_distance):
+            pairs.append((other, path, distance))
+        tree.add(hashes[path], path)
+    return pairs
+
+
+def group_duplicates(paths, pairs):
+    """
+    근접 쌍으로 이어진 이미지를 union-find 로 묶습니다.
+
+    Returns:
+        dict: {경로: 그룹 번호}. 그룹 번호는 그룹에서 이름순으로 가장 앞선 경로의 순서
+    """
+    parent = {path: path for path in paths}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for a, b, _ in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    roots = {}
+    for path in sorted(paths):
+        roots.setdefault(find(path), len(roots))
+    return {path: roots[find(path)] for path in paths}
+
+
+def duplicate_groups(images_dir, max_distance=6, method="phash", workers=1, cache_path=None):
+    """
+    폴더 안 이미지를 근접 중복 그룹으로 묶습니다. 6-random-divide.py 의 그룹 단위 분할용.
+
+    Returns:
+        dict: {파일 이름: 그룹 번호}. 읽을 수 없는 이미지는 각자 다른 그룹
+    """
+    paths = sorted(entry.path for entry in iter_files(images_dir, IMAGE_EXTENSIONS))
+    hashes = hash_images(paths, method, workers, cache_path)
+    groups = group_duplicates(list(hashes), find_near_duplicates(hashes, max_distance))
+    next_group = len(set(groups.values()))
+    result = {}
+    for path in paths:
+        if path in groups:
+            result[os.path.basename(path)] = groups[path]
+        else:
+            result[os.path.basename(path)] = next_group
+            next_group += 1
+    return result
+
+
+def check_leakage(images_root, subsets=("train", "val", "test"), max_distance=6, method="phash",
+                  workers=1, cache_path=None, report_path=None):
+    """
+    images_root/<subset> 폴더 사이에서 거의 같은 이미지(누수)를 찾습니다.
+
+    Args:
+        images_root (str): train/val/test 폴더가 있는 이미지 폴더 (예: datasets/images)
+        subsets (tuple): 검사할 하위 폴더 이름
+        max_distance (int): 근접으로 판단할 해밍 거리
+        report_path (str): 지정하면 누수 쌍을 CSV 로 저장
+
+    Returns:
+        list: [(경로 a, 경로 b, 거리)] 서로 다른 세트에 속한 근접 쌍
+    """
+    subset_of = {}
+    for subset in subsets:
+        folder = os.path.join(images_root, subset)
+        if not os.path.isdir(folder):
+            print(f"경고: '{folder}' 폴더가 존재하지 않습니다. 건너뜁니다.")
+            continue
+        for entry in iter_files(folder, IMAGE_EXTENSIONS):
+            subset_of[entry.path] = subset
+
+    hashes = hash_images(sorted(subset_of), method, workers, cache_path)
+    leaks = [(a, b, d) for a, b, d in find_near_duplicates(hashes, max_distance) if subset_of[a] != subset_of[b]]
+
+    if report_path:
+        with open(report_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["image_a", "subset_a", "image_b", "subset_b", "distance"])
+            writer.writerows((a, subset_of[a], b, subset_of[b], d) for a, b, d in leaks)
+
+    leaked = {path for a, b, _ in leaks for path in (a, b)}
+    print(f"검사 이미지 {len(hashes)}개, 세트 간 근접 쌍 {len(leaks)}개 (거리 {max_distance} 이내)")
+    for subset in subsets:
+        count = sum(1 for path in leaked if subset_of[path] == subset)
+        if count:
+            print(f"  - {subset}: 누수 관련 이미지 {count}개")
+    return leaks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='지각 해시로 근접 중복 이미지와 세트 간 누수를 찾습니다.')
+    parser.add_argument('command', choices=['leakage', 'groups'],
+                        help='leakage: images_dir/train,val,test 간 누수 검사, groups: 폴더 안 중복 그룹')
+    parser.add_argument('images_dir', help='이미지 폴더')
+    parser.add_argument('--max-distance', type=int, default=6, help='근접으로 판단할 해밍 거리 (기본: 6)')
+    parser.add_argument('--method', choices=HASH_METHODS, default='phash', help='해시 방식 (기본: phash)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='병렬 프로세스 수')
+    parser.add_argument('--cache', default=CACHE_NAME, help=f'해시 캐시 파일 (기본: {CACHE_NAME})')
+    parser.add_argument('--report', default=None, help='결과 CSV 경로')
+
+    args = parser.parse_args()
+
+    if args.command == 'leakage':
+        check_leakage(args.images_dir, max_distance=args.max_distance, method=args.method,
+                      workers=args.workers, cache_path=args.cache, report_path=args.report)
+    else:
+        groups = duplicate_groups(args.images_dir, args.max_distance, args.method, args.workers, args.cache)
+        sizes = np.bincount(list(groups.values())) if groups else np.zeros(0, dtype=int)
+        print(f"이미지 {len(groups)}개, 그룹 {len(sizes)}개 (2개 이상인 그룹 {int((sizes > 1).sum())}개)")
+        if args.report:
+            with open(args.report, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["image", "group"])
+                writer.writerows(sorted(groups.items(), key=lambda item: (item[1], item[0])))
@@ -0,0 +1,100 @@
+"""
+파일을 복사하는 대신 링크로 배치하는 함수 모음.
+
+2-separate-image.py, 3-concat-files.py, 6-random-divide.py 는 모든 이미지를
+shutil.copy2 로 복제해서 디스크 사용량이 두 배가 됩니다. link_mode 로
+하드링크/리플링크/심볼릭 링크를 선택하면 바이트를 복사하지 않고 바로 배치하며,
+다른 장치(파일시스템)라서 링크가 불가능하면 복사로 대체합니다.
+
+    copy     : shutil.copy2 (기존 동작)
+    hardlink : os.link, 실패하면 복사
+    reflink  : 파일시스템의 copy-on-write 복제 (Btrfs, XFS 등), 실패하면 복사
+    symlink  : 원본의 절대 경로를 가리키는 심볼릭 링크
+    list     : 파일을 배치하지 않고 경로 목록(.txt)만 작성 (write_file_list 사용)
+
+5-change-class.py 처럼 임시 파일에 쓴 뒤 os.replace 로 교체하는 스크립트는 링크만 새 파일로
+바뀌고 원본은 그대로입니다. 다만 파일을 직접 열어 덮어쓰는 다른 도구로 hardlink/symlink 를
+수정하면 원본도 함께 바뀝니다.
+"""
+
+import os
+import sys
+import errno
+import shutil
+
+LINK_MODES = ("copy", "hardlink", "reflink", "symlink", "list")
+
+# linux/fs.h 의 FICLONE ioctl 번호
+_FICLONE = 0x40049409
+
+# 링크를 만들 수 없어 복사로 대체할 오류: 다른 장치, 파일시스템이 지원하지 않음, 하드링크 수 초과
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOSYS, errno.EMLINK}
+# Windows 에서 개발자 모드/관리자 권한 없이 심볼릭 링크를 만들 때 (ERROR_PRIVILEGE_NOT_HELD)
+_WINERROR_PRIVILEGE_NOT_HELD = 1314
+
+
+def _reflink(src, dst):
+    """copy-on-write 복제를 시도합니다. 지원하지 않으면 OSError 를 발생시킵니다."""
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink 는 현재 Linux 에서만 지원합니다.")
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.remove(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def place_file(src, dst, link_mode="copy"):
+    """
+    src 파일을 dst 위치에 link_mode 방식으로 배치합니다. 이미 dst가 있으면 교체합니다.
+
+    Args:
+        src (str): 원본 파일 경로
+        dst (str): 배치할 경로
+        link_mode (str): "copy", "hardlink", "reflink", "symlink" 중 하나
+
+    Returns:
+        str: 실제로 사용된 방식 (링크가 불가능해 복사했으면 "copy", src와 dst가 같으면 "same")
+    """
+    if link_mode not in LINK_MODES or link_mode == "list":
+        raise ValueError(f"지원하지 않는 link_mode 입니다: {link_mode}")
+
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return "same"
+    # 이전 실행에서 만든 링크를 덮어쓰면 원본이 바뀌므로 먼저 지움
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+    try:
+        if link_mode == "hardlink":
+            os.link(src, dst)
+            return "hardlink"
+        if link_mode == "reflink":
+            _reflink(src, dst)
+            return "reflink"
+        if link_mode == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+            return "symlink"
+    except OSError as e:
+        # 다른 장치(EXDEV), 지원하지 않는 파일시스템 등만 복사로 대체. 권한 오류 등은 그대로 알림
+        if e.errno not in _FALLBACK_ERRNOS and getattr(e, 'winerror', None) != _WINERROR_PRIVILEGE_NOT_HELD:
+            raise
+
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def write_file_list(list_path, paths):
+    """
+    link_mode="list" 일 때 파일을 옮기는 대신 절대 경로 목록을 한 줄에 하나씩 씁니다.
+    Ultralytics 데이터셋 YAML 의 train/val/test 에 이 .txt 파일을 그대로 지정할 수 있습니다.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(list_path)), exist_ok=True)
+    with open(list_path, 'w') as f:
+        for path in paths:
+            f.write(os.path.abspath(path) + '\n')
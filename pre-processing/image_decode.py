@@ -0,0 +1,149 @@
+"""
+letterbox 축소 변환용 빠른 이미지 디코딩.
+
+4000×3000 같은 큰 JPEG를 640으로 줄일 때 전체 해상도로 디코딩하면
+디코딩 시간과 메모리 대부분이 버려집니다. JPEG는 DCT 스케일링으로
+1/2, 1/4, 1/8 크기로 바로 디코딩할 수 있으므로(cv2.IMREAD_REDUCED_COLOR_*),
+최종 크기보다 작아지지 않는 범위에서 가장 큰 축소 비율로 디코딩합니다.
+"""
+
+import struct
+import cv2
+
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+
+# 축소 비율별 imread 플래그 (큰 비율부터 시도)
+REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# 크기 정보가 들어있는 SOF 마커 (DHT/JPG/DAC 인 C4, C8, CC 제외)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _exif_orientation(segment):
+    """APP1 세그먼트 내용에서 EXIF Orientation(1~8) 값을 읽습니다. 없으면 1."""
+    if segment[:6] != b'Exif\x00\x00':
+        return 1
+    tiff = segment[6:]
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None:
+        return 1
+    try:
+        ifd = struct.unpack(order + 'I', tiff[4:8])[0]
+        count = struct.unpack(order + 'H', tiff[ifd:ifd + 2])[0]
+        for k in range(count):
+            entry = ifd + 2 + 12 * k
+            tag, = struct.unpack(order + 'H', tiff[entry:entry + 2])
+            if tag == 0x0112:
+                return struct.unpack(order + 'H', tiff[entry + 8:entry + 10])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def read_jpeg_size(path, apply_orientation=False):
+    """
+    JPEG 헤더만 읽어 (width, height)를 반환합니다. 픽셀은 디코딩하지 않습니다.
+
+    Args:
+        apply_orientation: True면 EXIF Orientation 이 5~8(90도 회전)일 때 가로/세로를 바꿔서
+            cv2.imread 로 디코딩한 이미지와 같은 크기를 반환
+
+    Returns:
+        tuple: (width, height), JPEG가 아니거나 읽을 수 없으면 None
+    """
+    orientation = 1
+    try:
+        with open(path, 'rb') as f:
+            if f.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                byte = f.read(1)
+                while byte and byte != b'\xff':
+                    byte = f.read(1)
+                while byte == b'\xff':
+                    byte = f.read(1)
+                if not byte:
+                    return None
+                marker = byte[0]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    continue
+                if marker == 0xD9:
+                    return None
+                length = struct.unpack('>H', f.read(2))[0]
+                if marker in _SOF_MARKERS:
+                    _, height, width = struct.unpack('>BHH', f.read(5))
+                    if 5 <= orientation <= 8:
+                        return height, width
+                    return width, height
+                if marker == 0xE1 and apply_orientation and orientation == 1:
+                    orientation = _exif_orientation(f.read(length - 2))
+                    continue
+                f.seek(length - 2, 1)
+    except (OSError, struct.error):
+        return None
+
+
+def choose_reduction(original_size, target_size):
+    """
+    원본 크기와 letterbox 목표 크기로 사용할 축소 비율(1, 2, 4, 8)을 고릅니다.
+
+    축소 디코딩 후에도 letterbox 리사이즈 결과보다 커야(=마지막 resize가 항상 축소) 하므로
+    1/k 가 letterbox scale 이상인 가장 큰 k 를 선택합니다. EXIF 회전으로 가로/세로가
+    바뀔 수 있어 두 방향 중 더 큰 scale 을 기준으로 합니다.
+
+    Args:
+        original_size: (width, height) 원본 크기
+        target_size: (height, width) letterbox 목표 크기
+    """
+    w, h = original_size
+    scale = max(
+        min(target_size[0] / h, target_size[1] / w),
+        min(target_size[0] / w, target_size[1] / h),
+    )
+    for factor, _ in REDUCED_FLAGS:
+        if 1 / factor >= scale:
+            return factor
+    return 1
+
+
+def imread_for_letterbox(path, target_size=(640, 640)):
+    """
+    letterbox 목표 크기에 맞춰 가능한 한 작은 해상도로 이미지를 읽습니다.
+
+    JPEG가 아니거나 목표 크기가 원본의 1/2보다 크면 cv2.imread 와 동일하게 동작합니다.
+    축소 디코딩된 이미지는 원본과 같은 영역을 담고 있으므로, 정규화된 YOLO 좌표 변환에는
+    디코딩된 이미지 크기를 원본 크기 대신 그대로 쓰면 됩니다.
+
+    Returns:
+        tuple: (image, original_size, factor)
+            image: 디코딩된 이미지 (실패 시 None)
+            original_size: 헤더 기준 원본 (width, height), 알 수 없으면 디코딩된 크기
+            factor: 적용된 축소 비율 (1이면 전체 해상도)
+    """
+    original_size = None
+    factor = 1
+    if path.lower().endswith(JPEG_EXTENSIONS):
+        original_size = read_jpeg_size(path)
+        if original_size is not None:
+            factor = choose_reduction(original_size, target_size)
+
+    if factor > 1:
+        img = cv2.imread(path, dict(REDUCED_FLAGS)[factor])
+    else:
+        img = cv2.imread(path)
+
+    if img is None:
+        return None, original_size, factor
+
+    h, w = img.shape[:2]
+    if original_size is None:
+        original_size = (w, h)
+    elif (original_size[0] > original_size[1]) != (w > h) and original_size[0] != original_size[1]:
+        # EXIF 회전이 적용된 경우 헤더 크기도 맞춰서 돌려줌
+        original_size = (original_size[1], original_size[0])
+
+    return img, original_size, factor
@@ -0,0 +1,107 @@
+"""
+리사이즈 결과 이미지 저장(인코딩) 설정.
+
+기본값(output_format=None, quality=None)은 기존과 같이 원본 확장자로
+cv2.imwrite 기본 설정을 사용합니다. 학습 중 수백 번 읽히는 데이터셋은
+JPEG 품질/크로마 서브샘플링, PNG/WebP, 또는 디코딩이 필요 없는
+raw .npy(uint8) 저장을 선택해 용량과 디코딩 비용을 조절할 수 있습니다.
+"""
+
+import os
+import cv2
+import numpy as np
+
+OUTPUT_FORMATS = (None, "jpg", "png", "webp", "npy")
+
+# JPEG 크로마 서브샘플링 (OpenCV 4.5.5 이상에서 지원)
+JPEG_SAMPLING_FACTORS = {
+    "444": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_444", None),
+    "422": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_422", None),
+    "420": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_420", None),
+}
+
+
+def output_path_for(path, output_format=None):
+    """저장 형식에 맞게 결과 파일 경로의 확장자를 바꿉니다. None이면 그대로 둡니다."""
+    if output_format is None:
+        return path
+    return os.path.splitext(path)[0] + "." + output_format
+
+
+def needs_reencode(src_path, output_format=None, quality=None, jpeg_sampling=None):
+    """
+    크기가 이미 목표 크기와 같은 이미지를 그대로 복사할 수 있는지 판단합니다.
+    저장 형식이 원본과 같고 인코딩 옵션을 따로 지정하지 않았으면 복사합니다.
+    """
+    if quality is not None or jpeg_sampling is not None:
+        return True
+    if output_format is None:
+        return False
+    src_ext = os.path.splitext(src_path)[1].lower().lstrip(".")
+    if src_ext == "jpeg":
+        src_ext = "jpg"
+    return src_ext != output_format
+
+
+def imwrite_params(path, quality=None, jpeg_sampling=None):
+    """
+    확장자에 맞는 cv2.imwrite 파라미터 목록을 만듭니다.
+
+    Args:
+        path: 저장할 파일 경로 (확장자로 형식 판단)
+        quality: JPEG/WebP 품질(0-100) 또는 PNG 압축 레벨(0-9). None이면 OpenCV 기본값
+        jpeg_sampling: JPEG 크로마 서브샘플링 ("444", "422", "420"). None이면 기본값
+    """
+    ext = os.path.splitext(path)[1].lower()
+    params = []
+    if ext in (".jpg", ".jpeg"):
+        if quality is not None:
+            params += [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        if jpeg_sampling is not None:
+            factor = JPEG_SAMPLING_FACTORS.get(jpeg_sampling)
+            if factor is None:
+                raise ValueError(f"지원하지 않는 JPEG 서브샘플링입니다: {jpeg_sampling}")
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+    elif ext == ".png":
+        if quality is not None:
+            params += [cv2.IMWRITE_PNG_COMPRESSION, int(quality)]
+    elif ext == ".webp":
+        if quality is not None:
+            params += [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+    return params
+
+
+def write_image(path, img, output_format=None, quality=None, jpeg_sampling=None):
+    """
+    이미지를 지정한 형식으로 저장하고 실제 저장 경로와 바이트 수를 반환합니다.
+
+    Args:
+        path: 결과 파일 경로 (output_format이 있으면 확장자가 바뀜)
+        img: 저장할 BGR 이미지 (uint8)
+        output_format: None(원본 확장자), "jpg", "png", "webp", "npy"
+        quality: imwrite_params 참고 (npy에는 사용되지 않음)
+        jpeg_sampling: imwrite_params 참고
+
+    Returns:
+        tuple: (저장 경로, 저장된 바이트 수)
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {output_format}")
+
+    out_path = output_path_for(path, output_format)
+
+    if output_format == "npy":
+        # 학습 캐시용 raw uint8 배열 (np.load(..., mmap_mode='r')로 바로 읽을 수 있음)
+        np.save(out_path, np.ascontiguousarray(img, dtype=np.uint8))
+    elif not cv2.imwrite(out_path, img, imwrite_params(out_path, quality, jpeg_sampling)):
+        raise OSError(f"이미지를 저장하지 못했습니다: {out_path}")
+
+    return out_path, os.path.getsize(out_path)
+
+
+def format_bytes(num_bytes):
+    """바이트 수를 읽기 쉬운 문자열로 바꿉니다."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f}{unit}" if unit != "B" else f"{num_bytes}B"
+        num_bytes /= 1024
@@ -0,0 +1,271 @@
+"""
+라벨 폴더 전체의 박스/클래스/크기 분포 통계.
+
+학습 때마다 다시 그려지는 runs/detect/train*/labels.jpg 대신, 학습 없이 바로 숫자로
+분포를 확인합니다 (imgsz 선택, 앵커 크기, split 간 분포 차이 확인용).
+
+    - 클래스별 박스 수 / 이미지 수 (split 별: datasets/labels/train, val, test)
+    - 이미지당 박스 수 분포
+    - 박스 너비/높이 (imgsz 기준 픽셀), 면적, 가로세로 비율 히스토그램
+    - 범위 밖 박스 (중심이 0~1 밖이거나 박스가 이미지 밖으로 나감), degenerate 박스, 음수/비정수 클래스
+    - (선택) k-means 앵커 크기
+
+라벨은 label_store.py 형식의 캐시에 모아 두고, 다음 실행 때는 크기/수정 시각이 바뀐 파일만
+다시 읽습니다. 통계는 전체 박스 배열에 대해 NumPy 로 한 번에 계산합니다.
+
+사용 예시:
+    python label_stats.py ../datasets/labels --imgsz 300 --classes ../datasets/classes.txt --json stats.json
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from label_store import (
+    iter_label_files, parse_label_text, save_label_store, load_label_store, box_counts, box_image_index,
+)
+
+FILES_RECORD = "files.json"
+RAW_CLASSES_FILE = "raw_classes.npy"
+
+# 히스토그램 구간
+SIZE_BINS = [0, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096]  # imgsz 기준 픽셀
+ASPECT_BINS = [0, 0.125, 0.25, 0.5, 1, 2, 4, 8, float('inf')]  # width / height
+COUNT_BINS = [0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf')]  # 이미지당 박스 수
+
+
+def update_label_cache(labels_dir, cache_dir):
+    """
+    라벨 폴더를 캐시(label_store.py 형식)와 동기화합니다. 크기/수정 시각이 같은 파일은
+    이전 캐시의 배열을 그대로 쓰고, 바뀐 파일만 다시 읽습니다.
+
+    Returns:
+        tuple: (저장소 dict, 다시 읽은 파일 수)
+    """
+    previous_files = {}
+    previous = None
+    records_path = os.path.join(cache_dir, FILES_RECORD)
+    if os.path.exists(records_path):
+        try:
+            with open(records_path, 'r', encoding='utf-8') as f:
+                previous_files = json.load(f)
+            previous = load_label_store(cache_dir, mmap=False)
+            previous["raw_classes"] = np.load(os.path.join(cache_dir, RAW_CLASSES_FILE))
+        except (OSError, ValueError) as e:
+            print(f"[WARN] 통계 캐시를 읽을 수 없습니다. 전체를 다시 읽습니다: {e}")
+            previous_files, previous = {}, None
+    previous_index = {name: i for i, name in enumerate(previous["names"])} if previous else {}
+
+    names = []
+    arrays = []
+    files = {}
+    parsed_count = 0
+    for name, path in iter_label_files(labels_dir):
+        st = os.stat(path)
+        record = [st.st_size, st.st_mtime_ns]
+        i = previous_index.get(name)
+        if i is not None and previous_files.get(name) == record:
+            start, end = previous["offsets"][i], previous["offsets"][i + 1]
+            labels = np.column_stack([previous["raw_classes"][start:end], previous["boxes"][start:end]])
+        else:
+            with open(path, 'r') as f:
+                labels, bad_lines = parse_label_text(f.read())
+            for line in bad_lines:
+                print(f"[WARN] '{path}' 라벨 형식 오류: {line}")
+            parsed_count += 1
+        names.append(name)
+        arrays.append(labels)
+        files[name] = record
+
+    counts = np.array([len(a) for a in arrays], dtype=np.int64)
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    labels = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+    store = {
+        "names": names,
+        "offsets": offsets,
+        "classes": labels[:, 0].astype(np.int32),
+        "boxes": labels[:, 1:].astype(np.float32),
+        # 캐시의 int32 클래스로는 알 수 없는 음수/비정수 클래스 검사용
+        "raw_classes": labels[:, 0],
+    }
+
+    if files != previous_files:
+        save_label_store(store, cache_dir)
+        np.save(os.path.join(cache_dir, RAW_CLASSES_FILE), store["raw_classes"])
+        with open(records_path, 'w', encoding='utf-8') as f:
+            json.dump(files, f)
+    return store, parsed_count
+
+
+def histogram(values, bins):
+    """(구간 목록, 개수 목록) 을 JSON 으로 쓸 수 있는 형태로 반환합니다."""
+    counts, _ = np.histogram(values, bins=bins)
+    return {"bins": [b if np.isfinite(b) else "inf" for b in bins], "counts": counts.tolist()}
+
+
+def kmeans_anchors(wh, k=9, iterations=100, seed=0):
+    """
+    (N, 2) 박스 너비/높이를 1 - IoU 거리로 k 개 앵커로 묶습니다 (YOLOv2/v3 방식).
+
+    Returns:
+        (k, 2) 앵커 (면적 순)
+    """
+    if len(wh) < k:
+        return wh[np.argsort(wh.prod(axis=1))]
+    rng = np.random.default_rng(seed)
+    anchors = wh[rng.choice(len(wh), k, replace=False)]
+    for _ in range(iterations):
+        inter = np.minimum(wh[:, None, 0], anchors[None, :, 0]) * np.minimum(wh[:, None, 1], anchors[None, :, 1])
+        iou = inter / (wh.prod(axis=1)[:, None] + anchors.prod(axis=1)[None, :] - inter)
+        nearest = iou.argmax(axis=1)
+        updated = np.array([
+            np.median(wh[nearest == j], axis=0) if np.any(nearest == j) else anchors[j] for j in range(k)
+        ])
+        if np.allclose(updated, anchors):
+            break
+        anchors = updated
+    return anchors[np.argsort(anchors.prod(axis=1))]
+
+
+def compute_stats(store, imgsz=640, min_box_px=2.0, class_names=None, anchors=0):
+    """
+    저장소 전체의 통계를 계산합니다.
+
+    Args:
+        store (dict): update_label_cache 결과
+        imgsz (int): 픽셀 크기 환산에 쓸 학습 imgsz (letterbox 후 긴 변 기준, 정사각형 이미지 가정)
+        min_box_px (float): imgsz 기준 이 픽셀 이하 너비/높이 박스를 degenerate 로 셈
+        class_names (dict): {ID: 이름}
+        anchors (int): 0보다 크면 imgsz 기준 k-means 앵커 개수
+
+    Returns:
+        dict: JSON 으로 저장할 수 있는 통계
+    """
+    class_names = class_names or {}
+    boxes = np.asarray(store["boxes"], dtype=np.float64)
+    classes = np.asarray(store["classes"])
+    raw_classes = np.asarray(store["raw_classes"])
+    image_index = box_image_index(store)
+    per_image = box_counts(store)
+    splits = np.array([name.split('/')[0] if '/' in name else '.' for name in store["names"]])
+
+    cx, cy, w, h = boxes.T
+    w_px, h_px = w * imgsz, h * imgsz
+    eps = 1e-6
+    center_out = (cx < 0) | (cx > 1) | (cy < 0) | (cy > 1)
+    edge_out = (cx - w / 2 < -eps) | (cx + w / 2 > 1 + eps) | (cy - h / 2 < -eps) | (cy + h / 2 > 1 + eps)
+    degenerate = (w_px <= min_box_px) | (h_px <= min_box_px)
+    bad_class = (raw_classes < 0) | (raw_classes != np.floor(raw_classes))
+    valid_wh = (w > 0) & (h > 0)
+
+    stats = {
+        "images": len(store["names"]),
+        "boxes": int(len(classes)),
+        "empty_images": int((per_image == 0).sum()),
+        "imgsz": imgsz,
+        "issues": {
+            "center_out_of_range": int(center_out.sum()),
+            "box_outside_image": int(edge_out.sum()),
+            "degenerate": int(degenerate.sum()),
+            "bad_class": int(bad_class.sum()),
+        },
+        "boxes_per_image": {
+            "mean": float(per_image.mean()) if len(per_image) else 0.0,
+            "max": int(per_image.max()) if len(per_image) else 0,
+            **histogram(per_image, COUNT_BINS),
+        },
+        "width_px": histogram(w_px, SIZE_BINS),
+        "height_px": histogram(h_px, SIZE_BINS),
+        "area_sqrt_px": histogram(np.sqrt(w_px * h_px), SIZE_BINS),
+        "aspect": histogram(w[valid_wh] / h[valid_wh], ASPECT_BINS),
+        "size_quantiles_px": {
+            f"p{q}": [float(np.percentile(w_px, q)), float(np.percentile(h_px, q))] if len(w_px) else None
+            for q in (1, 5, 25, 50, 75, 95, 99)
+        },
+        "classes": {},
+        "splits": {},
+    }
+
+    # 클래스별 박스 수, 이미지 수 (split 별 포함)
+    box_split = splits[image_index] if len(classes) else np.zeros(0, dtype=splits.dtype)
+    for class_id in np.unique(classes):
+        mask = classes == class_id
+        stats["classes"][int(class_id)] = {
+            "name": class_names.get(int(class_id), str(class_id)),
+            "boxes": int(mask.sum()),
+            "images": int(len(np.unique(image_index[mask]))),
+            "median_wh_px": [float(np.median(w_px[mask])), float(np.median(h_px[mask]))],
+        }
+    for split in np.unique(splits):
+        split_boxes = box_split == split
+        ids, counts = np.unique(classes[split_boxes], return_counts=True)
+        total = max(int(split_boxes.sum()), 1)
+        stats["splits"][str(split)] = {
+            "images": int((splits == split).sum()),
+            "boxes": int(split_boxes.sum()),
+            "class_fraction": {int(c): round(int(n) / total, 4) for c, n in zip(ids, counts)},
+        }
+
+    if anchors > 0 and valid_wh.any():
+        wh = np.column_stack([w_px, h_px])[valid_wh]
+        stats["anchors_px"] = np.round(kmeans_anchors(wh, anchors), 1).tolist()
+    return stats
+
+
+def print_stats(stats):
+    """통계 요약을 출력합니다."""
+    print(f"이미지 {stats['images']}개, 박스 {stats['boxes']}개, 빈 라벨 {stats['empty_images']}개 "
+          f"(이미지당 평균 {stats['boxes_per_image']['mean']:.2f}, 최대 {stats['boxes_per_image']['max']})")
+    issues = stats["issues"]
+    print(f"  - 중심 범위 밖: {issues['center_out_of_range']}, 이미지 밖으로 나간 박스: {issues['box_outside_image']}, "
+          f"degenerate: {issues['degenerate']}, 잘못된 클래스: {issues['bad_class']}")
+
+    print("\n클래스별:")
+    for class_id, info in stats["classes"].items():
+        print(f"  {class_id:>3} {info['name']:<20} 박스 {info['boxes']:>7}  이미지 {info['images']:>6}  "
+              f"중앙 크기 {info['median_wh_px'][0]:.0f}x{info['median_wh_px'][1]:.0f}px")
+
+    if len(stats["splits"]) > 1:
+        print("\nsplit 별 클래스 비율:")
+        for split, info in stats["splits"].items():
+            fractions = ", ".join(f"{c}: {f:.3f}" for c, f in info["class_fraction"].items())
+            print(f"  {split:<6} 이미지 {info['images']:>6}, 박스 {info['boxes']:>7} | {fractions}")
+
+    print(f"\n박스 크기 (imgsz={stats['imgsz']} 기준, sqrt(w*h) px):")
+    area = stats["area_sqrt_px"]
+    for low, high, count in zip(area["bins"][:-1], area["bins"][1:], area["counts"]):
+        if count:
+            print(f"  {low:>5}~{high:<5}: {count}")
+
+    if "anchors_px" in stats:
+        print("\n앵커 (w, h px): " + ", ".join(f"{w:.0f}x{h:.0f}" for w, h in stats["anchors_px"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='라벨 폴더의 박스/클래스/크기 분포 통계를 계산합니다.')
+    parser.add_argument('labels_dir', help='YOLO 라벨 폴더 (하위 폴더 포함, 예: datasets/labels)')
+    parser.add_argument('--cache', default=None, help='통계 캐시 폴더 (기본: <labels_dir>_stats)')
+    parser.add_argument('--imgsz', type=int, default=640, help='픽셀 크기 환산 기준 (기본: 640)')
+    parser.add_argument('--min-box-px', type=float, default=2.0, help='degenerate 기준 픽셀 (기본: 2)')
+    parser.add_argument('--classes', default=None, help='클래스 이름 파일 (classes.txt)')
+    parser.add_argument('--anchors', type=int, default=0, help='k-means 앵커 개수 (0이면 계산 안 함)')
+    parser.add_argument('--json', default=None, help='통계를 저장할 JSON 경로')
+
+    args = parser.parse_args()
+
+    cache_dir = args.cache or os.path.normpath(args.labels_dir) + "_stats"
+    store, parsed_count = update_label_cache(args.labels_dir, cache_dir)
+    print(f"라벨 {len(store['names'])}개 중 {parsed_count}개를 새로 읽었습니다 (캐시: '{cache_dir}')\n")
+
+    class_names = None
+    if args.classes:
+        with open(args.classes, 'r', encoding='utf-8') as f:
+            class_names = dict(enumerate(line.strip() for line in f if line.strip()))
+
+    stats = compute_stats(store, args.imgsz, args.min_box_px, class_names, args.anchors)
+    print_stats(stats)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=1)
+        print(f"\n통계 저장: '{args.json}'")
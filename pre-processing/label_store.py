@@ -0,0 +1,236 @@
+"""
+YOLO 라벨을 하나의 메모리 맵 가능한 저장소로 묶는 모듈.
+
+이미지마다 하나씩 있는 작은 .txt 라벨 파일 수천~수십만 개를 매번 열고 읽는 대신,
+모든 박스를 연속된 배열 몇 개에 담아 한 번에 읽고 배열 연산으로 조회/필터링합니다.
+
+저장소 폴더 구성:
+    boxes.npy    float32 (N, 4)  [center_x, center_y, width, height]
+    classes.npy  int32   (N,)    박스별 클래스 ID
+    offsets.npy  int64   (M+1,)  이미지 i 의 박스는 boxes[offsets[i]:offsets[i+1]]
+    names.json   list    이미지별 라벨 경로 (라벨 폴더 기준 상대 경로, 확장자 제외)
+
+float32 로 저장하므로 텍스트로 다시 내보낼 때 소수점 6번째 자리가 드물게 1 차이 날 수 있습니다.
+
+사용 예시:
+    python label_store.py import labels labels_store
+    python label_store.py export labels_store labels_out
+    python label_store.py info labels_store
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+
+BOXES_FILE = "boxes.npy"
+CLASSES_FILE = "classes.npy"
+OFFSETS_FILE = "offsets.npy"
+NAMES_FILE = "names.json"
+
+
+def parse_label_text(text):
+    """
+    YOLO 라벨 텍스트를 (N, 5) float64 배열로 변환합니다. 형식이 잘못된 줄은 건너뜁니다.
+
+    Returns:
+        tuple: ((N, 5) 배열, 건너뛴 줄 리스트)
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    rows = [line.split() for line in lines]
+    if all(len(row) == 5 for row in rows):
+        try:
+            return np.array(rows, dtype=np.float64).reshape(-1, 5), []
+        except ValueError:
+            pass
+
+    values = []
+    bad_lines = []
+    for line, row in zip(lines, rows):
+        try:
+            row_values = [float(v) for v in row]
+        except ValueError:
+            bad_lines.append(line)
+            continue
+        if len(row_values) != 5:
+            bad_lines.append(line)
+            continue
+        values.append(row_values)
+    return np.array(values, dtype=np.float64).reshape(-1, 5), bad_lines
+
+
+def iter_label_files(labels_dir):
+    """labels_dir 아래의 모든 .txt 라벨을 (상대 이름, 경로) 로 정렬된 순서로 반환합니다."""
+    for root, dirs, files in os.walk(labels_dir):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith('.txt'):
+                path = os.path.join(root, filename)
+                name = os.path.splitext(os.path.relpath(path, labels_dir))[0].replace(os.sep, '/')
+                yield name, path
+
+
+def build_label_store(labels_dir, store_dir):
+    """
+    라벨 폴더(하위 폴더 포함)의 모든 YOLO .txt 파일을 저장소로 변환합니다.
+
+    Args:
+        labels_dir (str): 라벨 폴더
+        store_dir (str): 저장소 폴더 (없으면 생성)
+
+    Returns:
+        dict: load_label_store 와 같은 형식의 저장소
+    """
+    names = []
+    arrays = []
+    for name, path in iter_label_files(labels_dir):
+        with open(path, 'r') as f:
+            labels, bad_lines = parse_label_text(f.read())
+        for line in bad_lines:
+            print(f"[WARN] '{path}' 라벨 형식 오류: {line}")
+        names.append(name)
+        arrays.append(labels)
+
+    counts = np.array([len(a) for a in arrays], dtype=np.int64)
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    labels = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+
+    store = {
+        "names": names,
+        "offsets": offsets,
+        "classes": labels[:, 0].astype(np.int32),
+        "boxes": labels[:, 1:].astype(np.float32),
+    }
+    save_label_store(store, store_dir)
+    return store
+
+
+def save_label_store(store, store_dir):
+    """저장소를 폴더에 저장합니다."""
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, BOXES_FILE), np.ascontiguousarray(store["boxes"], dtype=np.float32))
+    np.save(os.path.join(store_dir, CLASSES_FILE), np.ascontiguousarray(store["classes"], dtype=np.int32))
+    np.save(os.path.join(store_dir, OFFSETS_FILE), np.ascontiguousarray(store["offsets"], dtype=np.int64))
+    with open(os.path.join(store_dir, NAMES_FILE), 'w', encoding='utf-8') as f:
+        json.dump(list(store["names"]), f, ensure_ascii=False)
+
+
+def load_label_store(store_dir, mmap=True):
+    """
+    저장소를 불러옵니다. mmap=True 면 배열을 메모리 맵으로 열어 필요한 부분만 읽습니다.
+
+    Returns:
+        dict: {"names": list, "offsets": (M+1,), "classes": (N,), "boxes": (N, 4)}
+    """
+    mmap_mode = 'r' if mmap else None
+    with open(os.path.join(store_dir, NAMES_FILE), 'r', encoding='utf-8') as f:
+        names = json.load(f)
+    return {
+        "names": names,
+        "offsets": np.load(os.path.join(store_dir, OFFSETS_FILE), mmap_mode=mmap_mode),
+        "classes": np.load(os.path.join(store_dir, CLASSES_FILE), mmap_mode=mmap_mode),
+        "boxes": np.load(os.path.join(store_dir, BOXES_FILE), mmap_mode=mmap_mode),
+    }
+
+
+def box_counts(store):
+    """이미지별 박스 수 (M,)"""
+    return np.diff(store["offsets"])
+
+
+def box_image_index(store):
+    """박스별 이미지 번호 (N,). 박스 단위 조건을 이미지 단위로 모을 때 사용합니다."""
+    return np.repeat(np.arange(len(store["names"])), box_counts(store))
+
+
+def get_labels(store, index):
+    """이미지 하나의 라벨을 (K, 5) float64 배열로 반환합니다."""
+    start, end = store["offsets"][index], store["offsets"][index + 1]
+    labels = np.empty((end - start, 5), dtype=np.float64)
+    labels[:, 0] = store["classes"][start:end]
+    labels[:, 1:] = store["boxes"][start:end]
+    return labels
+
+
+def images_with_invalid_classes(store, valid_class_ids):
+    """
+    valid_class_ids 에 없는 클래스가 하나라도 있는 이미지의 불리언 마스크 (M,) 를 반환합니다.
+    (box-pre-processing.py 의 삭제 조건)
+    """
+    invalid_box = ~np.isin(store["classes"], np.asarray(list(valid_class_ids)))
+    invalid_per_image = np.bincount(box_image_index(store)[invalid_box], minlength=len(store["names"]))
+    return invalid_per_image > 0
+
+
+def empty_images(store):
+    """박스가 하나도 없는 이미지의 불리언 마스크 (M,) 를 반환합니다. (box-pre-processing2.py 의 삭제 조건)"""
+    return box_counts(store) == 0
+
+
+def subset_store(store, image_mask):
+    """image_mask 가 True 인 이미지만 남긴 새 저장소를 만듭니다."""
+    image_mask = np.asarray(image_mask, dtype=bool)
+    box_mask = np.repeat(image_mask, box_counts(store))
+    kept_counts = box_counts(store)[image_mask]
+    offsets = np.zeros(len(kept_counts) + 1, dtype=np.int64)
+    np.cumsum(kept_counts, out=offsets[1:])
+    return {
+        "names": [name for name, keep in zip(store["names"], image_mask) if keep],
+        "offsets": offsets,
+        "classes": np.asarray(store["classes"])[box_mask],
+        "boxes": np.asarray(store["boxes"])[box_mask],
+    }
+
+
+def export_label_store(store, labels_dir):
+    """
+    저장소를 YOLO .txt 라벨 폴더로 내보냅니다.
+
+    Returns:
+        int: 작성한 파일 수
+    """
+    line_format = "%d %.6f %.6f %.6f %.6f"
+    classes = np.asarray(store["classes"]).tolist()
+    boxes = np.asarray(store["boxes"], dtype=np.float64).tolist()
+    offsets = np.asarray(store["offsets"]).tolist()
+
+    for i, name in enumerate(store["names"]):
+        path = os.path.join(labels_dir, *name.split('/')) + '.txt'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rows = range(offsets[i], offsets[i + 1])
+        with open(path, 'w') as f:
+            f.write('\n'.join(line_format % (classes[j], *boxes[j]) for j in rows))
+    return len(store["names"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='YOLO 라벨 폴더와 라벨 저장소를 변환합니다.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='라벨 폴더 -> 저장소')
+    import_parser.add_argument('labels_dir', help='YOLO 라벨 폴더 (하위 폴더 포함)')
+    import_parser.add_argument('store_dir', help='저장소 폴더')
+
+    export_parser = subparsers.add_parser('export', help='저장소 -> 라벨 폴더')
+    export_parser.add_argument('store_dir', help='저장소 폴더')
+    export_parser.add_argument('labels_dir', help='결과 라벨 폴더')
+
+    info_parser = subparsers.add_parser('info', help='저장소 요약 출력')
+    info_parser.add_argument('store_dir', help='저장소 폴더')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        store = build_label_store(args.labels_dir, args.store_dir)
+        print(f"✅ 이미지 {len(store['names'])}개, 박스 {len(store['classes'])}개를 '{args.store_dir}' 에 저장했습니다.")
+    elif args.command == 'export':
+        count = export_label_store(load_label_store(args.store_dir), args.labels_dir)
+        print(f"✅ 라벨 파일 {count}개를 '{args.labels_dir}' 에 작성했습니다.")
+    else:
+        store = load_label_store(args.store_dir)
+        classes, counts = np.unique(store["classes"], return_counts=True)
+        print(f"이미지 수: {len(store['names'])}, 박스 수: {len(store['classes'])}, "
+              f"빈 라벨: {int(empty_images(store).sum())}")
+        for class_id, count in zip(classes, counts):
+            print(f"  클래스 {class_id}: {count}개")
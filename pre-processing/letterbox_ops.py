@@ -0,0 +1,153 @@
+"""
+letterbox 변환과 좌표 역변환 (전처리 스크립트와 inference/ 가 함께 사용).
+
+    - letterbox_params  : 원본 크기 배열로 scale 과 (top, left) padding 을 한 번에 계산
+    - letterbox         : 이미지 하나를 letterbox. out 을 주면 그 버퍼에 바로 씀 (새 배열을 만들지 않음)
+    - letterbox_batch   : 이미지 목록을 미리 할당한 (B, H, W, 3) 버퍼에 letterbox
+    - letterbox_boxes   : 원본 이미지 xyxy 박스 -> letterbox 이미지 좌표
+    - unletterbox_boxes : letterbox 이미지 xyxy 박스 -> 원본 이미지 좌표 (letterbox_boxes 의 역변환)
+
+scale = min(목표 높이 / h, 목표 너비 / w), 리사이즈 크기는 int(w * scale) x int(h * scale) 이고
+남는 픽셀은 위/왼쪽에 절반(내림), 아래/오른쪽에 나머지를 채웁니다. 결과 이미지는 이전의
+cv2.resize + cv2.copyMakeBorder 방식과 픽셀 단위로 같습니다.
+"""
+
+import cv2
+import numpy as np
+
+
+def letterbox_params(original_sizes, target_size):
+    """
+    letterbox 와 같은 방식으로 scale 과 (top, left) padding 을 배열로 계산합니다 (이미지를 리사이즈하지 않음).
+
+    Args:
+        original_sizes: (K, 2) [width, height]
+        target_size: (height, width)
+
+    Returns:
+        tuple: (scale (K,), top (K,), left (K,))
+    """
+    original_sizes = np.asarray(original_sizes).reshape(-1, 2)
+    w = original_sizes[:, 0].astype(np.float64)
+    h = original_sizes[:, 1].astype(np.float64)
+    scale = np.minimum(target_size[0] / h, target_size[1] / w)
+    new_w = (w * scale).astype(np.int64)
+    new_h = (h * scale).astype(np.int64)
+    top = (target_size[0] - new_h) // 2
+    left = (target_size[1] - new_w) // 2
+    return scale, top, left
+
+
+def letterbox(img, target_size=(640, 640), padding_color=(114, 114, 114), out=None):
+    """
+    이미지를 비율을 유지한 채 target_size 에 맞추고 남는 부분을 padding_color 로 채웁니다.
+
+    Args:
+        img: BGR 이미지 또는 (H, W) 흑백 이미지
+        target_size: (height, width)
+        padding_color: 패딩 색 (B, G, R). 흑백 이미지에는 첫 번째 값 사용
+        out: 결과를 쓸 (height, width, 3) uint8 배열 (배치 버퍼의 한 행, 메모리 맵 등).
+            None 이면 새로 만듦
+
+    Returns:
+        tuple: (letterbox 이미지 (out 을 준 경우 out), scale, (top, left))
+    """
+    h, w = img.shape[:2]
+    target_h, target_w = target_size
+    scale = min(target_h / h, target_w / w)
+    new_w, new_h = int(w * scale), int(h * scale)
+    top, left = (target_h - new_h) // 2, (target_w - new_w) // 2
+
+    if out is None:
+        out = np.empty((target_h, target_w) + img.shape[2:], dtype=img.dtype)
+
+    # 패딩 영역만 채우고 가운데는 cv2.resize 가 바로 씀. (B, G, R) 튜플을 직접 대입하면 NumPy 가
+    # 픽셀마다 3개씩 브로드캐스트해서 느리므로, 패딩 색 한 줄을 만들어 행 단위로 복사
+    row = np.empty((target_w,) + img.shape[2:], dtype=out.dtype)
+    if img.ndim == 2 and np.ndim(padding_color):
+        # 흑백 이미지는 cv2.copyMakeBorder 와 같이 패딩 색의 첫 번째 값을 사용
+        padding_color = padding_color[0]
+    row[...] = padding_color
+    out[:top] = row
+    out[top + new_h:] = row
+    out[top:top + new_h, :left] = row[:left]
+    out[top:top + new_h, left + new_w:] = row[left + new_w:]
+    region = out[top:top + new_h, left:left + new_w]
+    resized = cv2.resize(img, (new_w, new_h), dst=region)
+    if resized is not region:
+        # dtype 이 다르면 OpenCV 가 새 배열을 만들므로 복사
+        region[...] = resized
+
+    return out, scale, (top, left)
+
+
+def letterbox_batch(images, target_size=(640, 640), padding_color=(114, 114, 114), out=None):
+    """
+    이미지 목록을 (B, height, width, 3) 버퍼 하나에 letterbox 합니다.
+
+    Args:
+        images: BGR 이미지 목록 (크기가 달라도 됨)
+        out: 미리 할당한 (B 이상, height, width, 3) uint8 버퍼. 반복 호출 시 같은 버퍼를 넘기면
+            배치마다 새로 할당하지 않음. None 이면 새로 만듦
+
+    Returns:
+        tuple: (버퍼 (B, height, width, 3), (B, 5) [원본 width, 원본 height, scale, top, left])
+            두 번째 값은 tensor_cache 의 letterbox.npy 와 같은 형식이고 unletterbox_boxes 에 그대로 쓸 수 있음
+    """
+    if out is None:
+        out = np.empty((len(images), target_size[0], target_size[1], 3), dtype=np.uint8)
+    out = out[:len(images)]
+    info = np.zeros((len(images), 5), dtype=np.float64)
+    for i, img in enumerate(images):
+        _, scale, (top, left) = letterbox(img, target_size, padding_color, out=out[i])
+        info[i] = (img.shape[1], img.shape[0], scale, top, left)
+    return out, info
+
+
+def letterbox_boxes(boxes, scale, padding):
+    """
+    원본 이미지 좌표의 xyxy 박스를 letterbox 이미지 좌표로 변환합니다.
+
+    Args:
+        boxes: (N, 4) 원본 이미지 기준 xyxy 픽셀 좌표
+        scale: letterbox scale (스칼라 또는 박스별 (N,))
+        padding: (top, left) (각각 스칼라 또는 박스별 (N,))
+
+    Returns:
+        (N, 4) letterbox 이미지 기준 xyxy
+    """
+    top, left = padding
+    scale = np.asarray(scale, dtype=np.float64)[..., None]
+    out = np.asarray(boxes, dtype=np.float64).reshape(-1, 4) * scale
+    out[:, [0, 2]] += np.asarray(left, dtype=np.float64)[..., None]
+    out[:, [1, 3]] += np.asarray(top, dtype=np.float64)[..., None]
+    return out
+
+
+def unletterbox_boxes(boxes, scale, padding, original_size=None):
+    """
+    letterbox 이미지 좌표의 xyxy 박스를 원본 이미지 좌표로 변환합니다 (letterbox_boxes 의 역변환).
+
+    scale, padding, original_size 에 박스별 배열 (N,) 을 넘기면 여러 이미지의 박스를 한 번에 변환합니다
+    (예: letterbox_batch 의 info 를 np.repeat 로 박스 수만큼 늘려서).
+
+    Args:
+        boxes: (N, 4) letterbox 이미지 기준 xyxy 픽셀 좌표
+        scale: letterbox scale
+        padding: (top, left)
+        original_size: (width, height) 원본 크기. 주면 결과를 이 범위로 자름
+
+    Returns:
+        (N, 4) 원본 이미지 기준 xyxy
+    """
+    top, left = padding
+    out = np.asarray(boxes, dtype=np.float64).reshape(-1, 4).copy()
+    scale = np.asarray(scale, dtype=np.float64)[..., None]
+    out[:, [0, 2]] -= np.asarray(left, dtype=np.float64)[..., None]
+    out[:, [1, 3]] -= np.asarray(top, dtype=np.float64)[..., None]
+    out /= scale
+    if original_size is not None:
+        width, height = original_size
+        out[:, [0, 2]] = out[:, [0, 2]].clip(0, np.asarray(width, dtype=np.float64)[..., None])
+        out[:, [1, 3]] = out[:, [1, 3]].clip(0, np.asarray(height, dtype=np.float64)[..., None])
+    return out
@@ -0,0 +1,290 @@
+"""
+1~6단계 전처리를 한 번에 수행하는 통합 파이프라인.
+
+기존 스크립트는 단계마다 폴더 전체를 다시 읽고 새 폴더로 복사하지만,
+여기서는 (이미지, 라벨) 한 쌍을 메모리에서 아래 단계에 차례로 통과시킨 뒤
+최종 결과만 한 번 저장합니다.
+
+    1. XML -> YOLO 변환 (4-xml-to-text.py)
+    2. 유효 클래스 필터 (box-pre-processing.py): 허용되지 않은 클래스가 하나라도 있으면 제외
+    3. 클래스 번호 변경 (5-change-class.py)
+    4. 빈 라벨 제거 (box-pre-processing2.py)
+    5. letterbox 리사이즈 (1-2-resize-image-with-label.py)
+    6. train/val/test 분할 (6-random-divide.py)
+
+사용 예시:
+    python pipeline.py images labels dataset_out --keep-classes 0 1 2 3 7 \\
+        --class-map 7:1 --drop-empty --imgsz 640 --split 0.7 0.2 0.1 --workers 8
+    python pipeline.py images labels_xml dataset_out --classes classes.txt   # VOC XML 라벨
+"""
+
+import os
+import cv2
+import random
+import shutil
+import argparse
+import importlib
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import iter_pairs
+from letterbox_ops import letterbox
+
+# 숫자로 시작하는 스크립트 파일은 일반 import 문으로 불러올 수 없어 importlib 사용
+_resize = importlib.import_module("1-2-resize-image-with-label")
+_xml = importlib.import_module("4-xml-to-text")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+SPLIT_NAMES = ("train", "val", "test")
+
+
+def find_pairs(images_dir, labels_dir):
+    """
+    이미지와 같은 이름의 라벨(.txt 우선, 없으면 .xml)을 짝지어 반환합니다.
+
+    Returns:
+        tuple: ([(basename, 이미지 경로, 라벨 경로)], 라벨이 없는 이미지 수)
+    """
+    pairs = []
+    missing_count = 0
+    for base_name, img_path, label_path in iter_pairs(images_dir, labels_dir, IMAGE_EXTENSIONS,
+                                                      ('.txt', '.xml'), include_unlabeled=True):
+        if label_path is None:
+            missing_count += 1
+            continue
+        pairs.append((base_name, img_path, label_path))
+    # 스캔 순서는 파일시스템마다 다르므로 정렬해서 분할 결과가 항상 같도록 함
+    pairs.sort(key=lambda pair: os.path.basename(pair[1]))
+    return pairs, missing_count
+
+
+def load_labels(label_path, class_dict):
+    """
+    라벨 파일을 (N, 5) 배열로 읽습니다. XML이면 YOLO 형식으로 변환합니다.
+
+    Returns:
+        tuple: ((N, 5) 배열, 경고 메시지 목록)
+    """
+    if label_path.lower().endswith('.xml'):
+        messages = []
+        rows = [line.split() for line in _xml.convert_annotation(label_path, class_dict, messages=messages)]
+        return np.array(rows, dtype=np.float64).reshape(-1, 5), [f"[WARN] '{label_path}' {m}" for m in messages]
+    return _resize.load_yolo_labels(label_path)
+
+
+def assign_splits(base_names, split_ratio, seed):
+    """
+    6-random-divide.py와 같은 방식(섞은 뒤 비율로 자르기)으로 분할을 정합니다.
+    seed를 고정하면 같은 입력에 대해 항상 같은 결과가 나옵니다.
+
+    Returns:
+        dict: {basename: "train" | "val" | "test"}
+    """
+    assert abs(sum(split_ratio) - 1.0) < 0.001, "분할 비율의 합은 1이어야 합니다."
+    names = sorted(base_names)
+    random.Random(seed).shuffle(names)
+
+    train_end = int(len(names) * split_ratio[0])
+    val_end = train_end + int(len(names) * split_ratio[1])
+
+    splits = {}
+    for i, name in enumerate(names):
+        splits[name] = SPLIT_NAMES[0] if i < train_end else SPLIT_NAMES[1] if i < val_end else SPLIT_NAMES[2]
+    return splits
+
+
+def process_pair(pair, split, output_dir, options):
+    """
+    (이미지, 라벨) 한 쌍을 모든 단계에 통과시키고 최종 결과만 저장합니다.
+    병렬 실행 시 워커 프로세스에서 실행되므로 출력 대신 메시지를 반환합니다.
+
+    Returns:
+        tuple: (상태, 메시지 목록)
+            상태: 'save', 'copy', 'invalid_class', 'empty', 'bad_image', 'error'
+    """
+    base_name, img_path, label_path = pair
+    messages = []
+
+    # 1. 라벨 읽기 (XML -> YOLO 변환 포함)
+    try:
+        labels, label_messages = load_labels(label_path, options['class_dict'])
+    except Exception as e:
+        return 'error', [f"[WARN] '{label_path}' 라벨을 읽지 못했습니다: {e}"]
+    messages.extend(label_messages)
+
+    classes = labels[:, 0].astype(np.int64)
+
+    # 2. 허용되지 않은 클래스가 있는 쌍은 제외 (box-pre-processing.py 규칙)
+    keep_classes = options['keep_classes']
+    if keep_classes is not None and not np.isin(classes, keep_classes).all():
+        return 'invalid_class', messages
+
+    # 3. 클래스 번호 변경
+    if options['target_class'] is not None:
+        labels[:, 0] = options['target_class']
+    elif options['class_map']:
+        for src, dst in options['class_map'].items():
+            labels[classes == src, 0] = dst
+
+    # 4. 빈 라벨 제외
+    if options['drop_empty'] and len(labels) == 0:
+        return 'empty', messages
+
+    # 5. letterbox 리사이즈 후 6. 분할 폴더에 한 번만 저장
+    img_dir = os.path.join(output_dir, 'images', split) if split else os.path.join(output_dir, 'images')
+    label_dir = os.path.join(output_dir, 'labels', split) if split else os.path.join(output_dir, 'labels')
+    img_out = os.path.join(img_dir, os.path.basename(img_path))
+    label_out = os.path.join(label_dir, base_name + '.txt')
+
+    imgsz = options['imgsz']
+    if not imgsz:
+        shutil.copy(img_path, img_out)
+        _resize.save_yolo_labels(label_out, labels)
+        return 'copy', messages
+
+    target_size = (imgsz, imgsz)
+    img = cv2.imread(img_path)
+    if img is None:
+        messages.append(f"[WARN] '{img_path}' 파일은 이미지가 아닙니다. 건너뜁니다.")
+        return 'bad_image', messages
+
+    h, w = img.shape[:2]
+    if (h, w) == target_size:
+        shutil.copy(img_path, img_out)
+        _resize.save_yolo_labels(label_out, labels)
+        return 'copy', messages
+
+    img_processed, scale, padding = letterbox(img, target_size)
+    cv2.imwrite(img_out, img_processed)
+    labels = _resize.convert_yolo_coordinates_batch(labels, (w, h), scale, padding, target_size)
+    _resize.save_yolo_labels(label_out, labels)
+    return 'save', messages
+
+
+def _process_pair_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return process_pair(*args)
+
+
+def run_pipeline(images_dir, labels_dir, output_dir, keep_classes=None, class_map=None, target_class=None,
+                 drop_empty=False, imgsz=640, split_ratio=None, seed=0, class_dict=None, workers=1):
+    """
+    전처리 단계를 한 번에 수행합니다.
+
+    Args:
+        images_dir (str): 원본 이미지 폴더
+        labels_dir (str): 원본 라벨 폴더 (.txt 또는 .xml)
+        output_dir (str): 결과 폴더 (images/, labels/ 가 생성됨)
+        keep_classes (list): 허용 클래스 ID. 그 외 클래스가 있는 쌍은 제외 (None이면 필터 없음)
+        class_map (dict): 클래스 번호 변경 {원래 ID: 새 ID}
+        target_class (int): 모든 박스의 클래스를 이 값으로 변경 (class_map보다 우선)
+        drop_empty (bool): 박스가 없는 쌍 제외
+        imgsz (int): letterbox 크기. 0 또는 None이면 리사이즈하지 않고 복사
+        split_ratio (tuple): (train, val, test) 비율. None이면 분할하지 않음
+        seed (int): 분할 시 셔플 시드
+        class_dict (dict): XML 클래스 이름 -> ID 매핑 (4-xml-to-text.load_class_dict).
+            XML 라벨이 있는데 None 이면 ValueError
+        workers (int): 병렬 처리 프로세스 수
+    """
+    for folder in (images_dir, labels_dir):
+        if not os.path.exists(folder):
+            print(f"[ERROR] 폴더 '{folder}'가 존재하지 않습니다.")
+            return
+
+    pairs, missing_count = find_pairs(images_dir, labels_dir)
+    if class_dict is None and any(p[2].lower().endswith('.xml') for p in pairs):
+        # 기본값으로 변환하면 다른 클래스의 박스가 모두 빠진 빈 라벨이 조용히 만들어짐
+        raise ValueError("XML 라벨을 변환하려면 클래스 매핑이 필요합니다 (--classes 또는 --notes).")
+    print(f"총 {len(pairs)}개 (이미지, 라벨) 쌍을 처리합니다. 라벨 없는 이미지: {missing_count}개")
+
+    # 필터 전에 분할을 정해야 쌍을 한 번씩만 읽고 바로 저장할 수 있음 (제외된 쌍만큼 비율이 조금 달라짐)
+    splits = assign_splits([p[0] for p in pairs], split_ratio, seed) if split_ratio else {}
+    for split in (SPLIT_NAMES if split_ratio else ('',)):
+        os.makedirs(os.path.join(output_dir, 'images', split), exist_ok=True)
+        os.makedirs(os.path.join(output_dir, 'labels', split), exist_ok=True)
+
+    options = {
+        'keep_classes': None if keep_classes is None else np.array(sorted(keep_classes), dtype=np.int64),
+        'class_map': dict(class_map or {}),
+        'target_class': target_class,
+        'drop_empty': drop_empty,
+        'imgsz': imgsz,
+        'class_dict': class_dict,
+    }
+    tasks = [(pair, splits.get(pair[0], ''), output_dir, options) for pair in pairs]
+
+    if workers > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_process_pair_args, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    else:
+        executor = None
+        results = map(_process_pair_args, tasks)
+
+    counts = Counter()
+    split_counts = Counter()
+    try:
+        for (pair, split, _, _), (status, messages) in zip(tasks, results):
+            counts[status] += 1
+            if status in ('save', 'copy'):
+                split_counts[split] += 1
+            for message in messages:
+                print(message)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"\n✅ 파이프라인 처리가 완료되었습니다. 결과 폴더: '{output_dir}'")
+    print(f"  - 변환 저장: {counts['save']}개, 복사: {counts['copy']}개")
+    print(f"  - 제외: 허용되지 않은 클래스 {counts['invalid_class']}개, 빈 라벨 {counts['empty']}개, "
+          f"이미지 오류 {counts['bad_image']}개, 라벨 오류 {counts['error']}개")
+    if split_ratio:
+        for split in SPLIT_NAMES:
+            print(f"  - {split}: {split_counts[split]}개")
+
+
+def parse_class_map(items):
+    """'원래:새' 형식 문자열 목록을 {int: int} 딕셔너리로 바꿉니다."""
+    class_map = {}
+    for item in items or []:
+        src, dst = item.split(':')
+        class_map[int(src)] = int(dst)
+    return class_map
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='이미지/라벨 전처리 단계를 한 번에 수행하고 결과를 한 번만 저장합니다.')
+    parser.add_argument('images_dir', help='원본 이미지 폴더')
+    parser.add_argument('labels_dir', help='원본 라벨 폴더 (.txt 또는 .xml)')
+    parser.add_argument('output_dir', help='결과 폴더')
+    parser.add_argument('--keep-classes', type=int, nargs='+', help='허용 클래스 ID (예: 0 1 2 3 7)')
+    parser.add_argument('--class-map', nargs='+', help='클래스 번호 변경 (예: 3:0 7:1)')
+    parser.add_argument('--target-class', type=int, help='모든 박스의 클래스를 이 번호로 변경')
+    parser.add_argument('--drop-empty', action='store_true', help='박스가 없는 이미지 제외')
+    parser.add_argument('--imgsz', type=int, default=640, help='letterbox 크기 (0이면 리사이즈 안 함)')
+    parser.add_argument('--split', type=float, nargs=3, metavar=('TRAIN', 'VAL', 'TEST'), help='분할 비율')
+    parser.add_argument('--seed', type=int, default=0, help='분할 셔플 시드')
+    parser.add_argument('--classes', help='XML 라벨용 classes.txt (한 줄에 클래스 이름 하나, 줄 번호가 ID)')
+    parser.add_argument('--notes', help='XML 라벨용 Label Studio notes.json (--classes 보다 우선)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='병렬 처리 프로세스 수')
+
+    args = parser.parse_args()
+
+    class_dict = None
+    if args.classes or args.notes:
+        for path in (args.classes, args.notes):
+            if path and not os.path.exists(path):
+                parser.error(f"클래스 파일 '{path}'가 존재하지 않습니다.")
+        class_dict = _xml.load_class_dict(classes_file=args.classes, notes_file=args.notes)
+
+    run_pipeline(
+        args.images_dir, args.labels_dir, args.output_dir,
+        keep_classes=args.keep_classes,
+        class_map=parse_class_map(args.class_map),
+        target_class=args.target_class,
+        drop_empty=args.drop_empty,
+        imgsz=args.imgsz,
+        split_ratio=tuple(args.split) if args.split else None,
+        seed=args.seed,
+        class_dict=class_dict,
+        workers=args.workers,
+    )
@@ -0,0 +1,149 @@
+"""
+1-1, 1-2 리사이즈 스크립트의 증분(incremental) 처리를 위한 매니페스트.
+
+결과 폴더에 JSON 매니페스트를 저장해 두고, 다시 실행할 때
+원본 크기/수정 시각/해시와 변환 설정(target_size, padding_color)이
+바뀌지 않은 파일은 건너뜁니다. 원본이 사라진 결과 파일은 삭제합니다.
+"""
+
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = ".resize_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """파일 내용의 SHA-1 해시를 계산합니다."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """
+    매니페스트를 불러옵니다. 파일이 없거나 손상되었으면 빈 매니페스트를 반환합니다.
+
+    Args:
+        manifest_path (str): 매니페스트 파일 경로
+
+    Returns:
+        dict: {"version": int, "entries": {key: entry}}
+    """
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                return manifest
+            print(f"[WARN] 매니페스트 버전이 다릅니다. 전체를 다시 처리합니다: {manifest_path}")
+        except (OSError, ValueError) as e:
+            print(f"[WARN] 매니페스트를 읽을 수 없습니다. 전체를 다시 처리합니다: {e}")
+    return {"version": MANIFEST_VERSION, "entries": {}}
+
+
+def save_manifest(manifest_path, manifest):
+    """매니페스트를 임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 손상되지 않게 저장합니다."""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _source_record(path, previous=None):
+    """
+    원본 파일의 크기/수정 시각/해시 기록을 만듭니다.
+    크기와 수정 시각이 이전 기록과 같으면 해시를 다시 계산하지 않습니다.
+    """
+    st = os.stat(path)
+    if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+        return dict(previous)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": file_hash(path)}
+
+
+def is_up_to_date(manifest, key, sources, params, outputs):
+    """
+    key 항목의 결과물이 최신인지 확인합니다.
+
+    크기/수정 시각만 바뀌고 내용(해시)이 같은 경우(예: touch, 복사)에도 최신으로 보고,
+    새 크기/수정 시각을 매니페스트에 반영합니다.
+
+    Args:
+        manifest (dict): load_manifest 결과
+        key (str): 항목 이름 (원본 이미지 파일 이름)
+        sources (list): 원본 파일 경로 목록 (이미지, 라벨 등)
+        params (dict): 변환 설정 (target_size, padding_color 등)
+        outputs (list): 결과 파일 경로 목록
+
+    Returns:
+        bool: 다시 처리할 필요가 없으면 True
+    """
+    entry = manifest["entries"].get(key)
+    if entry is None or entry["params"] != params or entry["outputs"] != list(outputs):
+        return False
+    if sorted(entry["sources"]) != sorted(sources):
+        return False
+    if not all(os.path.exists(p) for p in list(sources) + list(outputs)):
+        return False
+
+    for path in sources:
+        previous = entry["sources"][path]
+        current = _source_record(path, previous)
+        if current["sha1"] != previous["sha1"]:
+            return False
+        entry["sources"][path] = current
+    return True
+
+
+def record_entry(manifest, key, sources, params, outputs):
+    """처리가 끝난 항목을 매니페스트에 기록합니다."""
+    previous = manifest["entries"].get(key, {}).get("sources", {})
+    manifest["entries"][key] = {
+        "sources": {path: _source_record(path, previous.get(path)) for path in sources},
+        "params": params,
+        "outputs": list(outputs),
+    }
+
+
+def drop_entry(manifest, key, outputs=()):
+    """
+    key 항목을 매니페스트에서 지우고 결과 파일을 삭제합니다.
+    이번 실행에서 건너뛴 항목(예: 라벨이 삭제됨)의 이전 결과가 학습에 남지 않도록 사용합니다.
+
+    Args:
+        manifest (dict): load_manifest 결과
+        key (str): 항목 이름
+        outputs (list): 매니페스트 기록과 함께 삭제할 결과 파일 경로 (기록이 없을 때 대비)
+
+    Returns:
+        list: 삭제된 결과 파일 경로 목록
+    """
+    entry = manifest["entries"].pop(key, None)
+    paths = list(entry["outputs"]) if entry else []
+    paths += [p for p in outputs if p not in paths]
+    removed = []
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def prune_manifest(manifest, keep_keys):
+    """
+    원본이 사라진 항목을 매니페스트에서 지우고 해당 결과 파일을 삭제합니다.
+
+    Args:
+        manifest (dict): load_manifest 결과
+        keep_keys (set): 이번 실행에서 원본이 존재하는 항목 이름
+
+    Returns:
+        list: 삭제된 결과 파일 경로 목록
+    """
+    removed = []
+    for key in [k for k in manifest["entries"] if k not in keep_keys]:
+        removed.extend(drop_entry(manifest, key))
+    return removed
@@ -0,0 +1,341 @@
+"""
+학습 입력용 letterbox 이미지 텐서 캐시.
+
+학습은 매 epoch 마다 모든 JPEG 를 다시 디코딩하고 리사이즈합니다 (runs/detect/train15 는
+cache: false, device: cpu). 여기서는 학습 imgsz 로 letterbox 한 이미지를 하나의 uint8 배열
+(M, H, W, 3) 파일에 미리 저장해 두고 메모리 맵으로 읽으므로, 학습 중에는 디코딩 없이 페이지 캐시에서
+바로 복사만 합니다.
+
+캐시 폴더 구성:
+    images.npy     uint8   (M, H, W, 3)  BGR letterbox 이미지 (모든 이미지 크기가 같으므로
+                                          이미지 i 는 헤더 뒤 i * H * W * 3 바이트 위치)
+    letterbox.npy  float64 (M, 5)        [원본 width, 원본 height, scale, top, left]
+    meta.json      dict                  imgsz, padding_color, 원본 이미지 경로 목록
+    boxes.npy, classes.npy, offsets.npy, names.json
+                                          letterbox 좌표로 변환한 라벨 (label_store.py 형식)
+
+사용 예시:
+    python tensor_cache.py build datasets/images/train datasets/labels/train cache/train --imgsz 320 --workers 8
+    python tensor_cache.py info cache/train
+
+노트북에서 Ultralytics 학습에 사용:
+    from tensor_cache import ultralytics_trainer
+    model.train(data="./custom_data.yaml", imgsz=320, trainer=ultralytics_trainer(["cache/train", "cache/val"]))
+"""
+
+import os
+import json
+import argparse
+import importlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataset_scan import IMAGE_EXTENSIONS, list_file_names
+from image_decode import imread_for_letterbox
+from label_store import load_label_store, save_label_store, get_labels
+from letterbox_ops import letterbox
+
+# CachedImageMixin 이 YOLODataset.load_image 의 반환 형식과 buffer 처리를 따라 하므로 확인한 버전 범위로 제한
+# [이상, 미만), 학습에 사용한 8.3.93 에서 확인
+SUPPORTED_ULTRALYTICS = ((8, 1), (9, 0))
+
+# 숫자로 시작하는 스크립트 파일은 일반 import 문으로 불러올 수 없어 importlib 사용
+_resize = importlib.import_module("1-2-resize-image-with-label")
+
+IMAGES_FILE = "images.npy"
+LETTERBOX_FILE = "letterbox.npy"
+META_FILE = "meta.json"
+CACHE_VERSION = 1
+
+
+def fill_rows(cache_dir, start, image_paths, label_paths, target_size, padding_color):
+    """
+    이미지를 letterbox 해서 images.npy 의 start 행부터 직접 씁니다. 워커 프로세스에서 실행됩니다.
+
+    Returns:
+        tuple: ((K, 5) letterbox 정보, [라벨 (n, 5) 배열], 메시지 리스트)
+    """
+    images = np.load(os.path.join(cache_dir, IMAGES_FILE), mmap_mode='r+')
+    info = np.zeros((len(image_paths), 5), dtype=np.float64)
+    labels_list = []
+    messages = []
+    for k, (img_path, label_path) in enumerate(zip(image_paths, label_paths)):
+        row = start + k
+        img, original_size, _ = imread_for_letterbox(img_path, target_size)
+        if img is None:
+            messages.append(f"[WARN] 이미지를 읽을 수 없어 빈 이미지로 저장합니다: '{img_path}'")
+            images[row] = padding_color
+            labels_list.append(np.zeros((0, 5)))
+            continue
+
+        # 축소 디코딩된 이미지도 원본과 같은 영역이므로 정규화 좌표 변환에는 디코딩 크기를 사용
+        decoded_size = (img.shape[1], img.shape[0])
+        # 메모리 맵의 행에 바로 letterbox (중간 이미지 배열을 만들지 않음)
+        _, scale, padding = letterbox(img, target_size, padding_color, out=images[row])
+        info[k] = (*original_size, scale * decoded_size[0] / original_size[0], *padding)
+
+        labels = np.zeros((0, 5))
+        if os.path.exists(label_path):
+            labels, label_messages = _resize.load_yolo_labels(label_path)
+            messages.extend(label_messages)
+            labels = _resize.convert_yolo_coordinates_batch(labels, decoded_size, scale, padding, target_size)
+        labels_list.append(labels)
+    images.flush()
+    return info, labels_list, messages
+
+
+def _fill_rows_args(args):
+    """executor.map 용 인자 풀기 함수 (pickle 가능하도록 최상위에 정의)"""
+    return fill_rows(*args)
+
+
+def build_tensor_cache(images_dir, labels_dir, cache_dir, imgsz=640, padding_color=(114, 114, 114),
+                       workers=1, chunk_size=64):
+    """
+    이미지 폴더를 letterbox 텐서 캐시로 변환합니다.
+
+    Args:
+        images_dir (str): 이미지 폴더
+        labels_dir (str): YOLO 라벨 폴더 (라벨이 없는 이미지는 빈 라벨)
+        cache_dir (str): 캐시 폴더 (없으면 생성, 있으면 덮어씀)
+        imgsz (int 또는 tuple): 학습 imgsz 또는 (height, width)
+        padding_color (tuple): letterbox 패딩 색
+        workers (int): 병렬 프로세스 수
+        chunk_size (int): 워커 하나가 한 번에 처리할 이미지 수
+
+    Returns:
+        int: 저장한 이미지 수
+    """
+    target_size = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+    img_files = list_file_names(images_dir, IMAGE_EXTENSIONS, sort=True)
+    image_paths = [os.path.join(images_dir, f) for f in img_files]
+    label_paths = [os.path.join(labels_dir, os.path.splitext(f)[0] + '.txt') for f in img_files]
+
+    # 전체 배열을 디스크에 먼저 만들고 워커가 각자 맡은 행에 직접 씀 (메모리에 모으지 않음)
+    os.makedirs(cache_dir, exist_ok=True)
+    images = np.lib.format.open_memmap(os.path.join(cache_dir, IMAGES_FILE), mode='w+', dtype=np.uint8,
+                                       shape=(len(img_files), target_size[0], target_size[1], 3))
+    del images
+
+    tasks = [
+        (cache_dir, i, image_paths[i:i + chunk_size], label_paths[i:i + chunk_size], target_size, padding_color)
+        for i in range(0, len(img_files), chunk_size)
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_fill_rows_args, tasks))
+    else:
+        results = [_fill_rows_args(task) for task in tasks]
+
+    infos = []
+    arrays = []
+    for info, labels_list, messages in results:
+        for message in messages:
+            print(message)
+        infos.append(info)
+        arrays.extend(labels_list)
+
+    np.save(os.path.join(cache_dir, LETTERBOX_FILE), np.concatenate(infos) if infos else np.zeros((0, 5)))
+
+    counts = np.array([len(a) for a in arrays], dtype=np.int64)
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    labels = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+    save_label_store({
+        "names": [os.path.splitext(f)[0] for f in img_files],
+        "offsets": offsets,
+        "classes": labels[:, 0].astype(np.int32),
+        "boxes": labels[:, 1:].astype(np.float32),
+    }, cache_dir)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "imgsz": list(target_size),
+        "padding_color": list(padding_color),
+        "sources": [os.path.abspath(p) for p in image_paths],
+    }
+    with open(os.path.join(cache_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    print(f"✅ 텐서 캐시 작성 완료: '{cache_dir}' 이미지 {len(img_files)}개, 박스 {len(labels)}개, "
+          f"{len(img_files) * target_size[0] * target_size[1] * 3 / (1 << 20):.1f}MB")
+    return len(img_files)
+
+
+class TensorCache:
+    """
+    텐서 캐시 로더. 이미지는 메모리 맵에서 필요한 행만 읽습니다.
+
+        cache = TensorCache("cache/train")
+        img, labels = cache[0]              # (H, W, 3) uint8, (K, 5) letterbox 좌표
+        for indices, batch, labels in cache.batches(16, shuffle=True, seed=0):
+            ...                             # batch: (B, H, W, 3) uint8
+    """
+
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, META_FILE), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != CACHE_VERSION:
+            raise ValueError(f"텐서 캐시 버전이 다릅니다. 다시 만들어 주세요: {cache_dir}")
+        self.images = np.load(os.path.join(cache_dir, IMAGES_FILE), mmap_mode='r')
+        self.letterbox = np.load(os.path.join(cache_dir, LETTERBOX_FILE))
+        self.store = load_label_store(cache_dir)
+        self.imgsz = tuple(self.meta["imgsz"])
+        self.sources = self.meta["sources"]
+        self._index = {os.path.realpath(path): i for i, path in enumerate(self.sources)}
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, index):
+        return np.array(self.images[index]), get_labels(self.store, index)
+
+    def index_of(self, image_path):
+        """원본 이미지 경로의 캐시 행 번호. 없으면 None."""
+        return self._index.get(os.path.realpath(image_path))
+
+    def batches(self, batch_size=16, shuffle=False, seed=None):
+        """(행 번호, (B, H, W, 3) 이미지, [라벨]) 배치를 차례로 반환합니다."""
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        for start in range(0, len(order), batch_size):
+            # 행 번호를 정렬해서 읽으면 메모리 맵 접근이 순차적이 됨
+            indices = np.sort(order[start:start + batch_size])
+            yield indices, self.images[indices], [get_labels(self.store, i) for i in indices]
+
+
+class CachedImageMixin:
+    """
+    Ultralytics 데이터셋의 load_image 를 텐서 캐시 읽기로 바꾸는 믹스인.
+
+    캐시의 라벨이 아니라 Ultralytics 가 읽은 라벨 파일을 그대로 쓰므로, 캐시를 학습 imgsz 로 만들었고
+    letterbox 패딩이 없는(정사각형, 예: 1-2 의 결과) 이미지만 캐시에서 읽습니다.
+    그 외 이미지는 기존처럼 디코딩합니다.
+
+    DataLoader 워커(macOS 는 spawn)로 데이터셋이 pickle 되므로 캐시 폴더 경로만 저장하고,
+    메모리 맵은 각 프로세스에서 처음 사용할 때 엽니다.
+    """
+
+    cache_dirs = ()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_tensor_caches", None)
+        return state
+
+    def tensor_caches(self):
+        caches = self.__dict__.get("_tensor_caches")
+        if caches is None:
+            caches = [TensorCache(cache_dir) for cache_dir in self.cache_dirs]
+            self._tensor_caches = caches
+        return caches
+
+    def cache_lookup(self, image_path):
+        """(캐시, 행 번호), 캐시에서 읽을 수 없으면 (None, None)"""
+        for cache in self.tensor_caches():
+            index = cache.index_of(image_path)
+            if index is not None and cache.imgsz == (self.imgsz, self.imgsz):
+                _, _, _, top, left = cache.letterbox[index]
+                if top == 0 and left == 0:
+                    return cache, index
+        return None, None
+
+    def load_image(self, i, rect_mode=True):
+        cache, index = self.cache_lookup(self.im_files[i])
+        if cache is None:
+            return super().load_image(i, rect_mode)
+        im = np.array(cache.images[index])
+        if self.augment:
+            # mosaic 이 buffer 에서 이미지 번호를 고르므로 기존 load_image 와 같이 유지
+            self.buffer.append(i)
+            if len(self.buffer) >= self.max_buffer_length:
+                self.buffer.pop(0)
+        # 원본 크기 (h0, w0) 는 검증 시 예측을 원본 좌표로 되돌리는 데 쓰이므로 캐시에 기록한 값을 반환
+        w0, h0 = cache.letterbox[index][:2]
+        return im, (int(h0), int(w0)), im.shape[:2]
+
+
+def __getattr__(name):
+    # CachedYOLODataset 은 ultralytics 가 필요하므로 처음 사용할 때 만듦. 모듈 속성으로 등록되므로
+    # DataLoader 워커에서 pickle 이 tensor_cache.CachedYOLODataset 을 찾을 때도 여기로 옴
+    if name == "CachedYOLODataset":
+        from ultralytics.data import YOLODataset  # 노트북에서 설치
+
+        class CachedYOLODataset(CachedImageMixin, YOLODataset):
+            pass
+
+        # 함수 안에서 만든 클래스는 qualname 에 <locals> 가 붙어 pickle 이 찾지 못하므로 모듈 이름으로 고정
+        CachedYOLODataset.__qualname__ = name
+        globals()[name] = CachedYOLODataset
+        return CachedYOLODataset
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def ultralytics_supported(version):
+    """CachedImageMixin 이 의존하는 YOLODataset 내부 구조(load_image, buffer)를 확인한 버전인지 여부."""
+    parts = []
+    for part in version.split(".")[:2]:
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return SUPPORTED_ULTRALYTICS[0] <= tuple(parts) < SUPPORTED_ULTRALYTICS[1]
+
+
+def ultralytics_trainer(cache_dirs):
+    """
+    Ultralytics 학습에서 이미지 디코딩 대신 텐서 캐시를 읽는 DetectionTrainer 클래스를 만듭니다
+    (CachedImageMixin 참고). 확인하지 않은 Ultralytics 버전이면 경고 후 기본 DetectionTrainer 를 반환합니다.
+
+        model.train(data="./custom_data.yaml", imgsz=320, trainer=ultralytics_trainer(["cache/train"]))
+    """
+    import ultralytics  # 노트북에서 설치
+    from ultralytics.data import YOLODataset
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    if not ultralytics_supported(ultralytics.__version__):
+        low, high = (".".join(map(str, v)) for v in SUPPORTED_ULTRALYTICS)
+        print(f"[WARN] Ultralytics {ultralytics.__version__} 은(는) 텐서 캐시를 확인한 버전({low} 이상 {high} 미만)이 "
+              f"아니라 캐시 없이 학습합니다.")
+        return DetectionTrainer
+
+    cached_dataset = __getattr__("CachedYOLODataset")
+    cache_dirs = [os.path.abspath(cache_dir) for cache_dir in cache_dirs]
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            dataset = super().build_dataset(img_path, mode, batch)
+            if type(dataset) is not YOLODataset:
+                print(f"[WARN] 지원하지 않는 데이터셋 클래스라 텐서 캐시를 사용하지 않습니다: {type(dataset).__name__}")
+                return dataset
+            # 이미 만들어진 데이터셋의 클래스만 바꿔서 load_image 를 교체 (top-level 클래스라 pickle 가능)
+            dataset.__class__ = cached_dataset
+            dataset.cache_dirs = cache_dirs
+            hits = sum(dataset.cache_lookup(f)[0] is not None for f in dataset.im_files)
+            print(f"텐서 캐시 사용 ({mode}): {hits}/{len(dataset.im_files)} 이미지")
+            return dataset
+
+    return CachedDetectionTrainer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='학습용 letterbox 이미지 텐서 캐시를 만들거나 확인합니다.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='이미지/라벨 폴더로 캐시 작성')
+    build_parser.add_argument('images_dir')
+    build_parser.add_argument('labels_dir')
+    build_parser.add_argument('cache_dir')
+    build_parser.add_argument('--imgsz', type=int, default=640, help='학습 imgsz (기본: 640)')
+    build_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='병렬 프로세스 수')
+
+    info_parser = subparsers.add_parser('info', help='캐시 요약 출력')
+    info_parser.add_argument('cache_dir')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_tensor_cache(args.images_dir, args.labels_dir, args.cache_dir, args.imgsz, workers=args.workers)
+    else:
+        cache = TensorCache(args.cache_dir)
+        padded = int(((cache.letterbox[:, 3] > 0) | (cache.letterbox[:, 4] > 0)).sum())
+        print(f"이미지 {len(cache)}개, imgsz {cache.imgsz}, 박스 {len(cache.store['classes'])}개, "
+              f"패딩이 있는 이미지 {padded}개")
@@ -0,0 +1,55 @@
+"""
+letterbox_ops 검사 (python -m pytest pre-processing/test_letterbox_ops.py).
+
+이전 cv2.resize + cv2.copyMakeBorder 방식과 픽셀 단위로 같은지 확인합니다.
+"""
+
+import cv2
+import numpy as np
+import pytest
+from letterbox_ops import letterbox, letterbox_boxes, unletterbox_boxes
+
+
+def reference_letterbox(img, target_size, padding_color):
+    """이전 1-2-resize-image-with-label.py 의 letterbox 구현"""
+    h, w = img.shape[:2]
+    scale = min(target_size[0] / h, target_size[1] / w)
+    new_w, new_h = int(w * scale), int(h * scale)
+    resized = cv2.resize(img, (new_w, new_h))
+    top = (target_size[0] - new_h) // 2
+    left = (target_size[1] - new_w) // 2
+    padded = cv2.copyMakeBorder(resized, top, target_size[0] - new_h - top, left, target_size[1] - new_w - left,
+                                cv2.BORDER_CONSTANT, value=padding_color)
+    return padded, scale, (top, left)
+
+
+@pytest.mark.parametrize("shape", [(480, 640, 3), (640, 480, 3), (300, 300, 3), (480, 640), (37, 501)])
+@pytest.mark.parametrize("target_size", [(640, 640), (320, 416)])
+def test_matches_reference(shape, target_size):
+    img = np.random.RandomState(0).randint(0, 256, shape, dtype=np.uint8)
+    expected, expected_scale, expected_padding = reference_letterbox(img, target_size, (114, 50, 20))
+    out, scale, padding = letterbox(img, target_size, (114, 50, 20))
+    assert out.shape == expected.shape
+    assert np.array_equal(out, expected)
+    assert scale == expected_scale
+    assert padding == expected_padding
+
+
+def test_grayscale_padding():
+    out, _, (top, _) = letterbox(np.zeros((100, 200), dtype=np.uint8), (64, 64))
+    assert out.shape == (64, 64)
+    assert top > 0 and (out[:top] == 114).all()
+
+
+def test_writes_into_out():
+    buffer = np.zeros((2, 64, 64, 3), dtype=np.uint8)
+    out, _, _ = letterbox(np.full((32, 64, 3), 7, dtype=np.uint8), (64, 64), out=buffer[1])
+    assert np.shares_memory(out, buffer)
+    assert (buffer[1, 16:48] == 7).all() and (buffer[1, :16] == 114).all()
+
+
+def test_boxes_round_trip():
+    boxes = np.array([[10.0, 20.0, 110.0, 90.0], [0.0, 0.0, 640.0, 480.0]])
+    _, scale, padding = letterbox(np.zeros((480, 640, 3), dtype=np.uint8), (320, 320))
+    restored = unletterbox_boxes(letterbox_boxes(boxes, scale, padding), scale, padding, (640, 480))
+    assert np.allclose(restored, boxes)
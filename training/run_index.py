@@ -0,0 +1,417 @@
+"""
+runs/detect/train* 학습 결과를 SQLite 파일 하나에 모아 비교합니다.
+
+각 학습 폴더의 args.yaml (학습 설정)과 results.csv (에폭별 손실/지표)를 읽어
+
+    runs   : 학습 하나당 한 행. 자주 비교하는 설정(imgsz, batch, workers 등)은 열로,
+             나머지 설정은 args_json 열에 그대로 저장 (json_extract 로 조회)
+    epochs : (run, epoch) 한 행. results.csv 의 열 이름을 metrics_map50_95_b 처럼 바꿔서 저장하고,
+             누적 시간(time)의 차이로 에폭 시간(epoch_time)을 계산
+
+에 저장합니다. 다음 실행 때는 크기/수정 시각이 바뀐 파일만 다시 읽으므로 (진행 중인 학습도 포함)
+조회는 파일을 다시 열지 않고 바로 끝납니다.
+
+    index    : 색인 갱신 결과 출력
+    runs     : 학습별 요약 (에폭 수, 최고 mAP50-95 와 에폭, 전체 시간)
+    best     : 설정 값별 최고 mAP50-95 (예: --by imgsz)
+    time     : 설정 값별 평균 에폭 시간 (예: --by workers)
+    plateau  : patience 별 조기 종료 시뮬레이션 (멈췄을 에폭, 잃는 mAP, 아끼는 시간)
+    sql      : 직접 SQL 조회
+
+사용 예시:
+    python run_index.py best --by imgsz
+    python run_index.py time --by workers
+    python run_index.py plateau --patience 10 20 30 --min-delta 0.005
+    python run_index.py sql "SELECT run, epoch, metrics_map50_95_b FROM epochs WHERE run = 'train15' ORDER BY epoch"
+"""
+
+import os
+import re
+import csv
+import json
+import sqlite3
+import argparse
+
+DEFAULT_RUNS_DIR = "./runs/detect"
+DEFAULT_DB = "./runs/runs_index.sqlite"
+
+# runs 테이블에 열로 저장할 설정 (나머지는 args_json 으로 조회)
+ARG_COLUMNS = ("model", "data", "epochs", "patience", "batch", "imgsz", "workers", "device", "cache",
+               "optimizer", "lr0", "seed", "fraction", "close_mosaic")
+
+MAP_COLUMN = "metrics_map50_95_b"
+MAP50_COLUMN = "metrics_map50_b"
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def column_name(header):
+    """results.csv 열 이름을 SQL 열 이름으로 바꿉니다 (metrics/mAP50-95(B) -> metrics_map50_95_b)."""
+    return re.sub(r"[^0-9a-z]+", "_", header.strip().lower()).strip("_")
+
+
+def _file_state(path):
+    """(수정 시각 ns, 크기), 파일이 없으면 (None, None)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None, None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _sql_value(value):
+    """SQLite 에 그대로 넣을 수 없는 값(리스트 등)은 JSON 문자열로 저장합니다."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json.dumps(value)
+
+
+def _number(text):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def connect(db_path=DEFAULT_DB):
+    """DB 를 열고 테이블이 없으면 만듭니다."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    arg_columns = ", ".join(ARG_COLUMNS)
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS runs (
+            run TEXT PRIMARY KEY,
+            path TEXT,
+            args_mtime INTEGER, args_size INTEGER,
+            results_mtime INTEGER, results_size INTEGER,
+            epochs_done INTEGER,
+            args_json TEXT,
+            {arg_columns}
+        );
+        CREATE TABLE IF NOT EXISTS epochs (
+            run TEXT,
+            epoch INTEGER,
+            epoch_time REAL,
+            PRIMARY KEY (run, epoch)
+        );
+    """)
+    return conn
+
+
+def _epoch_columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(epochs)")}
+
+
+def read_results(results_path):
+    """
+    results.csv 를 읽습니다.
+
+    Returns:
+        tuple: (SQL 열 이름 목록, 행 목록 (숫자 또는 None)), epoch_time 열 포함
+    """
+    with open(results_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return [], []
+        columns = [column_name(h) for h in header]
+        rows = [[_number(v) for v in row] for row in reader if row]
+
+    # time 은 학습 시작부터의 누적 시간(초). 이어서 학습(resume)하면 줄어들 수 있으므로 그때는 그 값을 그대로 사용
+    columns.append("epoch_time")
+    if "time" in columns:
+        time_index = columns.index("time")
+        previous = 0.0
+        for row in rows:
+            current = row[time_index]
+            if current is None:
+                row.append(None)
+                continue
+            row.append(current - previous if current >= previous else current)
+            previous = current
+    else:
+        for row in rows:
+            row.append(None)
+    return columns, rows
+
+
+def _index_run(conn, run, run_dir, args_state, results_state):
+    """학습 하나를 다시 읽어서 runs/epochs 를 교체합니다."""
+    import yaml  # ultralytics 설치 시 함께 설치됨
+
+    args = {}
+    args_path = os.path.join(run_dir, "args.yaml")
+    if args_state[0] is not None:
+        with open(args_path, 'r', encoding='utf-8') as f:
+            args = yaml.safe_load(f) or {}
+
+    columns, rows = [], []
+    if results_state[0] is not None:
+        columns, rows = read_results(os.path.join(run_dir, "results.csv"))
+
+    # results.csv 에 새 열이 있으면 epochs 테이블에 추가
+    existing = _epoch_columns(conn)
+    for name in columns:
+        if name not in existing:
+            conn.execute(f'ALTER TABLE epochs ADD COLUMN "{name}" REAL')
+            existing.add(name)
+
+    conn.execute("DELETE FROM epochs WHERE run = ?", (run,))
+    if rows and "epoch" in columns:
+        quoted = ", ".join(f'"{name}"' for name in columns)
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        conn.executemany(f"INSERT OR REPLACE INTO epochs (run, {quoted}) VALUES ({placeholders})",
+                         [[run] + row for row in rows if row[columns.index("epoch")] is not None])
+
+    conn.execute(
+        f"INSERT OR REPLACE INTO runs (run, path, args_mtime, args_size, results_mtime, results_size, epochs_done, "
+        f"args_json, {', '.join(ARG_COLUMNS)}) VALUES ({', '.join('?' for _ in range(8 + len(ARG_COLUMNS)))})",
+        [run, run_dir, *args_state, *results_state, len(rows), json.dumps(args, default=str)]
+        + [_sql_value(args.get(name)) for name in ARG_COLUMNS],
+    )
+
+
+def update_index(conn, runs_dir=DEFAULT_RUNS_DIR):
+    """
+    runs_dir 의 train* 폴더를 색인과 동기화합니다. args.yaml / results.csv 의 크기와 수정 시각이
+    같은 학습은 건너뛰고, 사라진 학습은 색인에서 지웁니다.
+
+    Returns:
+        dict: added, updated, unchanged, removed 학습 이름 목록
+    """
+    previous = {
+        row[0]: (tuple(row[1:3]), tuple(row[3:5]))
+        for row in conn.execute("SELECT run, args_mtime, args_size, results_mtime, results_size FROM runs")
+    }
+    report = {"added": [], "updated": [], "unchanged": [], "removed": []}
+    seen = set()
+    with os.scandir(runs_dir) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_dir() or not entry.name.startswith("train"):
+                continue
+            args_state = _file_state(os.path.join(entry.path, "args.yaml"))
+            results_state = _file_state(os.path.join(entry.path, "results.csv"))
+            if args_state[0] is None and results_state[0] is None:
+                continue
+            seen.add(entry.name)
+            if previous.get(entry.name) == (args_state, results_state):
+                report["unchanged"].append(entry.name)
+                continue
+            _index_run(conn, entry.name, entry.path, args_state, results_state)
+            report["updated" if entry.name in previous else "added"].append(entry.name)
+
+    for run in sorted(set(previous) - seen):
+        conn.execute("DELETE FROM runs WHERE run = ?", (run,))
+        conn.execute("DELETE FROM epochs WHERE run = ?", (run,))
+        report["removed"].append(run)
+    conn.commit()
+    return report
+
+
+def _group_key(conn, key):
+    """--by 값을 SQL 식으로 바꿉니다 (열로 저장한 설정은 열, 나머지는 args_json)."""
+    if not _KEY_PATTERN.match(key):
+        raise ValueError(f"설정 이름이 올바르지 않습니다: {key}")
+    if key in ARG_COLUMNS:
+        return f"r.{key}"
+    # json_type 은 값이 null 인 키는 'null', 없는 키는 NULL 을 반환하므로 오타난 키만 걸러짐
+    found = conn.execute(f"SELECT 1 FROM runs WHERE json_type(args_json, '$.{key}') IS NOT NULL LIMIT 1").fetchone()
+    if found is None:
+        raise ValueError(f"색인된 학습의 args.yaml 에 '{key}' 설정이 없습니다.")
+    return f"json_extract(r.args_json, '$.{key}')"
+
+
+def _require_metric(conn, metric):
+    if metric not in _epoch_columns(conn):
+        raise ValueError(f"epochs 테이블에 '{metric}' 열이 없습니다 (색인된 results.csv 가 없음).")
+
+
+def best_by(conn, key="imgsz", metric=MAP_COLUMN):
+    """
+    설정 값별로 metric 이 가장 높은 학습/에폭을 찾습니다.
+
+    Returns:
+        list: (설정 값, 학습, 에폭, metric, 그 값의 학습 수)
+    """
+    _require_metric(conn, metric)
+    group = _group_key(conn, key)
+    # 학습별 최고 에폭을 먼저 고르고, 그중 설정 값별 최고 학습을 고름
+    return conn.execute(f"""
+        WITH per_run AS (
+            SELECT {group} AS value, e.run, e.epoch, e."{metric}" AS score,
+                   ROW_NUMBER() OVER (PARTITION BY e.run ORDER BY e."{metric}" DESC, e.epoch) AS run_rank
+            FROM epochs e JOIN runs r USING (run)
+            WHERE e."{metric}" IS NOT NULL
+        )
+        SELECT value, run, epoch, score, runs FROM (
+            SELECT value, run, epoch, score, COUNT(*) OVER (PARTITION BY value) AS runs,
+                   ROW_NUMBER() OVER (PARTITION BY value ORDER BY score DESC, run) AS rank
+            FROM per_run WHERE run_rank = 1
+        ) WHERE rank = 1 ORDER BY value
+    """).fetchall()
+
+
+def epoch_time_by(conn, key="workers"):
+    """
+    설정 값별 에폭 시간 통계.
+
+    Returns:
+        list: (설정 값, 학습 수, 에폭 수, 평균, 최소, 최대 에폭 시간(초))
+    """
+    group = _group_key(conn, key)
+    return conn.execute(f"""
+        SELECT {group} AS value, COUNT(DISTINCT e.run), COUNT(*), AVG(e.epoch_time), MIN(e.epoch_time),
+               MAX(e.epoch_time)
+        FROM epochs e JOIN runs r USING (run)
+        WHERE e.epoch_time IS NOT NULL
+        GROUP BY value ORDER BY value
+    """).fetchall()
+
+
+def run_summaries(conn, metric=MAP_COLUMN):
+    """학습별 (이름, imgsz, 설정 에폭, 완료 에폭, 최고 metric, 최고 에폭, 전체 시간(초))"""
+    has_metric = metric in _epoch_columns(conn)
+    best = f'MAX(e."{metric}")' if has_metric else "NULL"
+    best_epoch = (f'(SELECT epoch FROM epochs WHERE run = r.run ORDER BY "{metric}" DESC, epoch LIMIT 1)'
+                  if has_metric else "NULL")
+    return conn.execute(f"""
+        SELECT r.run, r.imgsz, r.epochs, r.epochs_done, {best}, {best_epoch}, SUM(e.epoch_time)
+        FROM runs r LEFT JOIN epochs e USING (run)
+        GROUP BY r.run ORDER BY r.run
+    """).fetchall()
+
+
+def simulate_early_stop(values, patience, min_delta=0.0):
+    """
+    Ultralytics EarlyStopping 과 같은 방식으로, 최고값이 min_delta 보다 크게 좋아지지 않은 채
+    patience 에폭이 지나면 멈춘다고 가정합니다.
+
+    Args:
+        values: 에폭 순서의 지표 값 목록
+
+    Returns:
+        int 또는 None: 멈췄을 에폭 인덱스 (0부터), 끝까지 멈추지 않으면 None
+    """
+    best, best_index = None, 0
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        if best is None or value > best + min_delta:
+            best, best_index = value, i
+        elif i - best_index >= patience:
+            return i
+    return None
+
+
+def plateau_report(conn, patiences=(10, 20, 30), min_delta=0.005, metric=MAP_COLUMN):
+    """
+    학습별로 patience 값마다 조기 종료했다면 몇 에폭에서 멈췄을지, 그때까지의 최고값과
+    끝까지 학습한 최고값의 차이, 아낄 수 있었던 시간 비율을 계산합니다.
+
+    Returns:
+        list: dict (run, patience, epochs_done, stop_epoch, best, best_at_stop, lost, time_saved)
+    """
+    _require_metric(conn, metric)
+    report = []
+    for (run,) in conn.execute("SELECT DISTINCT run FROM epochs ORDER BY run").fetchall():
+        rows = conn.execute(f'SELECT epoch, "{metric}", epoch_time FROM epochs WHERE run = ? ORDER BY epoch',
+                            (run,)).fetchall()
+        epochs = [row[0] for row in rows]
+        values = [row[1] for row in rows]
+        times = [row[2] or 0.0 for row in rows]
+        scored = [v for v in values if v is not None]
+        if not scored:
+            continue
+        best = max(scored)
+        total_time = sum(times)
+        for patience in patiences:
+            stop = simulate_early_stop(values, patience, min_delta)
+            end = len(values) if stop is None else stop + 1
+            best_at_stop = max(v for v in values[:end] if v is not None) if any(
+                v is not None for v in values[:end]) else None
+            report.append({
+                "run": run,
+                "patience": patience,
+                "epochs_done": len(values),
+                "stop_epoch": None if stop is None else int(epochs[stop]),
+                "best": best,
+                "best_at_stop": best_at_stop,
+                "lost": best - best_at_stop if best_at_stop is not None else None,
+                "time_saved": 1 - sum(times[:end]) / total_time if total_time else 0.0,
+            })
+    return report
+
+
+def _format(value, digits=4):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='학습 결과(runs/detect) 색인과 비교')
+    parser.add_argument('--runs-dir', default=DEFAULT_RUNS_DIR, help=f'학습 결과 폴더 (기본: {DEFAULT_RUNS_DIR})')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'색인 파일 (기본: {DEFAULT_DB})')
+    parser.add_argument('--no-update', action='store_true', help='조회 전에 색인을 갱신하지 않음')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('index', help='색인 갱신')
+    runs_parser = subparsers.add_parser('runs', help='학습별 요약')
+    runs_parser.add_argument('--metric', default=MAP_COLUMN)
+    best_parser = subparsers.add_parser('best', help='설정 값별 최고 지표')
+    best_parser.add_argument('--by', default='imgsz', help='비교할 설정 (기본: imgsz)')
+    best_parser.add_argument('--metric', default=MAP_COLUMN, help=f'지표 열 (기본: {MAP_COLUMN})')
+    time_parser = subparsers.add_parser('time', help='설정 값별 에폭 시간')
+    time_parser.add_argument('--by', default='workers', help='비교할 설정 (기본: workers)')
+    plateau_parser = subparsers.add_parser('plateau', help='조기 종료 시뮬레이션')
+    plateau_parser.add_argument('--patience', type=int, nargs='+', default=[10, 20, 30])
+    plateau_parser.add_argument('--min-delta', type=float, default=0.005, help='개선으로 볼 최소 증가량 (기본: 0.005)')
+    plateau_parser.add_argument('--metric', default=MAP_COLUMN)
+    sql_parser = subparsers.add_parser('sql', help='SQL 직접 조회')
+    sql_parser.add_argument('query')
+
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if not args.no_update or args.command == 'index':
+        report = update_index(conn, args.runs_dir)
+        if args.command == 'index':
+            for key in ("added", "updated", "removed"):
+                for run in report[key]:
+                    print(f"[{key.upper()}] {run}")
+            print(f"✅ 색인 완료: 추가 {len(report['added'])}, 갱신 {len(report['updated'])}, "
+                  f"변경 없음 {len(report['unchanged'])}, 삭제 {len(report['removed'])} ('{args.db}')")
+
+    if args.command == 'runs':
+        print(f"{'run':<10} {'imgsz':>6} {'epochs':>7} {'done':>5} {'best':>8} {'@':>4} {'time(s)':>9}")
+        for run, imgsz, epochs, done, best, best_epoch, total in run_summaries(conn, args.metric):
+            print(f"{run:<10} {_format(imgsz):>6} {_format(epochs):>7} {_format(done):>5} {_format(best):>8} "
+                  f"{_format(best_epoch):>4} {_format(total, 1):>9}")
+    elif args.command == 'best':
+        print(f"{args.by}별 최고 {args.metric}")
+        for value, run, epoch, score, count in best_by(conn, args.by, args.metric):
+            print(f"  {args.by}={_format(value)}: {score:.4f} ({run}, epoch {int(epoch)}, 학습 {count}개)")
+    elif args.command == 'time':
+        print(f"{args.by}별 에폭 시간 (초)")
+        for value, runs, epochs, mean, low, high in epoch_time_by(conn, args.by):
+            print(f"  {args.by}={_format(value)}: 평균 {mean:.2f}, 최소 {low:.2f}, 최대 {high:.2f} "
+                  f"(학습 {runs}개, 에폭 {epochs}개)")
+    elif args.command == 'plateau':
+        print(f"조기 종료 시뮬레이션 ({args.metric}, min_delta {args.min_delta})")
+        for row in plateau_report(conn, args.patience, args.min_delta, args.metric):
+            stop = "끝까지" if row["stop_epoch"] is None else f"epoch {row['stop_epoch']}"
+            print(f"  {row['run']:<10} patience {row['patience']:>3}: {stop:<10} "
+                  f"최고 {_format(row['best_at_stop'])} / {_format(row['best'])} (손실 {_format(row['lost'])}), "
+                  f"시간 {row['time_saved'] * 100:.0f}% 절약")
+    elif args.command == 'sql':
+        cursor = conn.execute(args.query)
+        if cursor.description:
+            print("\t".join(d[0] for d in cursor.description))
+            for row in cursor:
+                print("\t".join(_format(v) for v in row))
+    conn.close()